@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Performance benchmarks
+Benchmarks de rendimiento
+
+Usage / Uso:
+    python benchmark.py            (run all / ejecuta todos)
+    python benchmark.py pool       (run one / ejecuta uno)
+    python benchmark.py large_file (writes a 100 MB temp file / escribe 100 MB)
+    python benchmark.py journal    (recovery journal / diario de recuperación)
+    python benchmark.py encoding   (encoding detection on 8 MB files / detección de codificación)
+    python benchmark.py i18n       (t() lookups, language loading / búsquedas de t(), carga de idiomas)
+    python benchmark.py language_switch (opens the editor window: needs a display / abre la ventana)
+    python benchmark.py startup    (-X importtime, time to first paint; uses xvfb-run without a display)
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import sys
+import json
+import time
+import codecs
+import hashlib
+import shutil
+import tempfile
+import subprocess
+
+import markdown
+
+from modules import i18n
+from modules.renderer import MARKDOWN_EXTENSIONS, ConverterPool
+from modules.large_file import MappedDocument, LargeFileView
+from modules.recovery import RecoveryJournal, load_recovery
+from modules.text_encoding import read_text, StreamDecoder
+from modules.snippets import get_example_document
+
+
+def _timeit(func, repeat):
+    """Average seconds per call / Segundos medios por llamada"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def _report(label, seconds):
+    print(f"  {label:<40} {seconds * 1000:9.3f} ms")
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def bench_pool(repeat=200):
+    """Converter construction vs pooled converters / Construcción vs pool"""
+    small = "# Note\n\nSome **bold** text and a [link](https://example.com).\n"
+    example = get_example_document()
+    pool = ConverterPool()
+    
+    for name, text in (("small note", small), ("example document", example)):
+        print(f"{name} ({len(text)} chars):")
+        fresh = _timeit(lambda: markdown.Markdown(extensions=MARKDOWN_EXTENSIONS).convert(text), repeat)
+        pooled = _timeit(lambda: pool.convert(text), repeat)
+        _report("new markdown.Markdown per call", fresh)
+        _report("ConverterPool.convert", pooled)
+        _report("per-call overhead saved", fresh - pooled)
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process, or None / Memoria residente máxima"""
+    try:
+        import resource
+    except ImportError:
+        return None     # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _large_file_child(mode, path):
+    """
+    Open a file like FileManager does, in a fresh process, and print JSON
+    with the open time and the peak RSS growth
+    """
+    base = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "read":
+        # Whole-file path: text in Python + digest for the dirty flag
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        hashlib.sha1(text.encode("utf-8")).digest()
+    else:
+        document = MappedDocument(path)
+        document.build_index()
+        text = document.lines(0, min(document.line_count, LargeFileView.WINDOW_LINES))
+    read_seconds = time.perf_counter() - start
+    
+    # Tk insert, when a display is available / Inserción Tk si hay pantalla
+    tk_seconds = None
+    try:
+        import tkinter
+        root = tkinter.Tk()
+        widget = tkinter.Text(root)
+        tk_start = time.perf_counter()
+        widget.insert("1.0", text)
+        root.update_idletasks()
+        tk_seconds = time.perf_counter() - tk_start
+        root.destroy()
+    except Exception:
+        pass
+    
+    peak = _peak_rss_mb()
+    print(json.dumps({"read": read_seconds, "tk": tk_seconds,
+                      "rss": None if peak is None else peak - base}))
+
+
+def bench_large_file(size_mb=100):
+    """Whole-file load vs mapped viewer for a huge file / Carga completa vs visor mapeado"""
+    line = "| 2025-01-01 | server-{:05d} | OK | generated report line with some details |\n"
+    fd, path = tempfile.mkstemp(suffix=".md")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            written = i = 0
+            while written < size_mb * 1024 * 1024:
+                chunk = "".join((f"\n## Section {i}\n\n" if i % 500 == 0 else "") + line.format(i % 99999)
+                                for i in range(i, i + 1000))
+                i += 1000
+                f.write(chunk)
+                written += len(chunk)
+        print(f"file: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        
+        for mode, label in (("read", "read whole file"), ("mapped", "mmap + line index + window")):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--large-child", mode, path],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out)
+            _report(f"{label}: open", result["read"])
+            if result["tk"] is None:
+                print(f"  {label + ': Tk insert':<40}       n/a (no display)")
+            else:
+                _report(f"{label}: Tk insert", result["tk"])
+            rss = "n/a" if result["rss"] is None else f"{result['rss']:9.1f} MB"
+            print(f"  {label + ': peak RSS growth':<40} {rss}")
+    finally:
+        os.remove(path)
+
+
+def bench_journal(keystrokes=20000):
+    """Recovery journal cost per keystroke / Coste del diario por pulsación"""
+    folder = tempfile.mkdtemp()
+    journal = RecoveryJournal(folder)
+    try:
+        journal.reset(None, b"", text=get_example_document())
+        start = time.perf_counter()
+        for i in range(keystrokes):
+            journal.record(("i", f"{i // 80 + 1}.{i % 80}", "x"))
+        tk_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        journal.flush()
+        flush_seconds = time.perf_counter() - start
+        stats = journal.stats()
+        
+        print(f"{keystrokes} single-char inserts:")
+        _report("Tk thread per keystroke (mean)", tk_seconds / keystrokes)
+        _report("record() max", stats["record_max_us"] / 1e6)
+        _report("flusher: serialize + write + fsync", flush_seconds)
+        _report("flusher per keystroke", flush_seconds / keystrokes)
+        print(f"  {'journal size':<40} {journal.journal_bytes / 1024:9.1f} KB")
+        
+        start = time.perf_counter()
+        recovery = load_recovery(folder)
+        _report(f"load_recovery ({len(recovery.ops)} ops)", time.perf_counter() - start)
+    finally:
+        journal.close()     # Also removes the folder / También borra la carpeta
+
+
+def bench_encoding(size_mb=8, repeat=5):
+    """
+    Encoding and newline detection vs a plain UTF-8 read
+    Detección de codificación y saltos frente a una lectura UTF-8 simple
+    """
+    line = "Título con acentos — café, ñandú y € en **Markdown**\n"
+    text = line * (size_mb * 1024 * 1024 // len(line.encode("utf-8")))
+    variants = [
+        ("UTF-8, LF", text.encode("utf-8"), "utf-8"),
+        ("UTF-8 BOM, CRLF", codecs.BOM_UTF8 + text.replace("\n", "\r\n").encode("utf-8"), "utf-8-sig"),
+        ("Windows-1252, CRLF", text.replace("\n", "\r\n").encode("cp1252"), "cp1252"),
+        ("UTF-16 LE BOM, LF", codecs.BOM_UTF16_LE + text.encode("utf-16-le"), "utf-16"),
+    ]
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "doc.md")
+    try:
+        print(f"{size_mb} MB of text, best of {repeat}:")
+        for label, data, known in variants:
+            with open(path, 'wb') as f:
+                f.write(data)
+            
+            def plain():
+                # Known encoding, universal newlines: what a fixed decoder costs
+                with open(path, 'r', encoding=known) as f:
+                    f.read()
+            
+            def detected():
+                read_text(path)
+            
+            def streamed():
+                decoder = StreamDecoder()
+                with open(path, 'rb') as f:
+                    while True:
+                        chunk = f.read(256 * 1024)
+                        decoder.decode(chunk, final=not chunk)
+                        if not chunk:
+                            break
+            
+            base = min(_timeit(plain, 1) for _ in range(repeat))
+            whole = min(_timeit(detected, 1) for _ in range(repeat))
+            stream = min(_timeit(streamed, 1) for _ in range(repeat))
+            print(f"  {label}")
+            _report("    open(encoding=known).read()", base)
+            _report(f"    read_text() ({(whole - base) / base * 100:+.0f}%)", whole)
+            _report(f"    StreamDecoder, 256 KB chunks ({(stream - base) / base * 100:+.0f}%)", stream)
+    finally:
+        os.remove(path)
+        os.rmdir(folder)
+
+
+def _nested_t(tree, key, **kwargs):
+    """t() before the flat catalog: walk the nested file on every call"""
+    value = tree
+    for part in key.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return key
+    if not isinstance(value, str):
+        return key
+    if kwargs:
+        try:
+            return value.format(**kwargs)
+        except Exception:
+            return value
+    return value
+
+
+def bench_i18n(repeat=200):
+    """Flat catalog vs nested dict walk / Catálogo plano vs recorrido anidado"""
+    lang = i18n.get_current_language()
+    tree = i18n._load_language(lang)
+    keys = list(i18n._catalog)
+    formatted = [
+        ("status.saving", {"filename": "notes.md"}),
+        ("find_in_files.searching", {"done": 120, "total": 4000}),
+        ("dialog.encoding_changed", {"filename": "notes.md", "encoding": "UTF-8"}),
+    ]
+    missing = [f"menu.missing_{i}" for i in range(20)]
+    
+    def calls(lookup):
+        def run():
+            for key in keys:
+                lookup(key)
+            for key, kwargs in formatted:
+                lookup(key, **kwargs)
+            for key in missing:
+                lookup(key)
+        return run
+    
+    for key, kwargs in formatted:
+        assert i18n.t(key, **kwargs) == _nested_t(tree, key, **kwargs), key
+    count = len(keys) + len(formatted) + len(missing)
+    print(f"language {lang}: {len(keys)} keys, {len(formatted)} formatted, {len(missing)} missing per pass")
+    nested = _timeit(calls(lambda key, **kw: _nested_t(tree, key, **kw)), repeat)
+    flat = _timeit(calls(i18n.t), repeat)
+    _report("nested walk + str.format (per pass)", nested)
+    _report("flat catalog + parsed templates", flat)
+    print(f"  {count / nested / 1e6:.2f} M -> {count / flat / 1e6:.2f} M calls/s")
+    
+    plain = _timeit(lambda: _nested_t(tree, "status.saving", filename="notes.md"), repeat * 100)
+    parsed = _timeit(lambda: i18n.t("status.saving", filename="notes.md"), repeat * 100)
+    print(f"  t(\"status.saving\", filename=...): {1 / plain / 1e6:.2f} M -> {1 / parsed / 1e6:.2f} M calls/s")
+    
+    # Startup scan and language switches / Escaneo inicial y cambios de idioma
+    saved_manifest = i18n.MANIFEST_FILE
+    folder = tempfile.mkdtemp()
+    i18n.MANIFEST_FILE = os.path.join(folder, "languages.json")
+    try:
+        def scan():
+            i18n._catalogs.clear()
+            i18n._load_available_languages()
+        
+        before = i18n.stats["files_parsed"]
+        cold = _timeit(scan, 1)
+        cold_parsed = i18n.stats["files_parsed"] - before
+        before = i18n.stats["files_parsed"]
+        warm = min(_timeit(scan, 1) for _ in range(5))
+        warm_parsed = (i18n.stats["files_parsed"] - before) // 5
+        _report(f"language scan, no manifest ({cold_parsed} files parsed)", cold)
+        _report(f"language scan, manifest ({warm_parsed} files parsed)", warm)
+        
+        others = [code for code in i18n.get_available_languages() if code != lang][:2]
+        before = i18n.stats["files_parsed"]
+        switches = 0
+        for _ in range(10):
+            for code in [*others, lang]:
+                i18n._set_catalogs(code)     # set_language() without saving config.json
+                switches += 1
+        print(f"  {switches} language switches: {i18n.stats['files_parsed'] - before} files parsed")
+    finally:
+        i18n._set_catalogs(lang)
+        i18n.MANIFEST_FILE = saved_manifest
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _widget_paths(widget):
+    """Tk path names of widget and every descendant (menus included)"""
+    paths = {str(widget)}
+    for child in widget.winfo_children():
+        paths |= _widget_paths(child)
+    return paths
+
+
+def bench_language_switch(switches=12):
+    """
+    Language switch latency and widget churn in the real editor window
+    Latencia del cambio de idioma y widgets recreados en la ventana real
+    
+    Churn counts the Tk widgets (menus included) created or destroyed by
+    a switch. Needs a display; the language in config.json is restored.
+    """
+    import tkinter
+    try:
+        from modules.app import MarkdownEditor
+        app = MarkdownEditor()
+    except tkinter.TclError as e:
+        print(f"  skipped, no display: {e}")
+        return
+    original = i18n.get_current_language()
+    codes = [code for code in i18n.get_available_languages() if code != original][:2] + [original]
+    try:
+        app.update()
+        times, created, destroyed = [], 0, 0
+        for i in range(switches):
+            before = _widget_paths(app)
+            start = time.perf_counter()
+            i18n.set_language(codes[i % len(codes)])
+            app.update_idletasks()
+            times.append(time.perf_counter() - start)
+            after = _widget_paths(app)
+            created += len(after - before)
+            destroyed += len(before - after)
+        print(f"{switches} switches among {', '.join(codes)}, {len(_widget_paths(app))} widgets:")
+        _report("mean switch + idle redraw", sum(times) / len(times))
+        _report("slowest switch", max(times))
+        print(f"  widgets created/destroyed per switch: {created / switches:.1f} / {destroyed / switches:.1f}")
+        texts = getattr(app, "texts", None)
+        if texts is not None:
+            print(f"  registered texts: {texts.checked} checked, {texts.updated} updated in the last pass")
+    finally:
+        i18n.set_language(original)
+        app.destroy()
+
+
+# Runs in a fresh interpreter: this file imports markdown and the renderer
+_STARTUP_CHILD = """
+import sys, time, json
+start = time.perf_counter()
+from modules.app import MarkdownEditor
+marks = {"import": time.perf_counter() - start}
+heavy = ("markdown", "pygments", "tkinterweb", "modules.exporter",
+         "modules.style_editor", "modules.recent_manager")
+loaded = [name for name in heavy if name in sys.modules]
+app = MarkdownEditor()
+marks["init"] = time.perf_counter() - start
+
+def on_map(e):
+    if e.widget is app and "map" not in marks:
+        marks["map"] = time.perf_counter() - start
+        app.after_idle(lambda: marks.setdefault("paint", time.perf_counter() - start))
+
+def poll():
+    doc = app.docs.active
+    if app.preview is not None and app._pending_html is None and doc.html is not None:
+        marks["preview"] = time.perf_counter() - start
+    elif time.perf_counter() - start < 30:
+        app.after(5, poll)
+        return
+    print(json.dumps({"marks": marks, "loaded_at_import": loaded}))
+    app._on_close()
+
+app.bind("<Map>", on_map, add="+")
+app.after(5, poll)
+app.mainloop()
+"""
+
+
+def _import_times():
+    """-X importtime of modules.app: (total seconds, [(seconds, top-level module)])"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import modules.app"],
+                         cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, check=True).stderr
+    total, top = 0, []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            seconds = int(cumulative) / 1e6
+        except ValueError:
+            continue    # Header line / Línea de cabecera
+        if name.strip() == "modules.app":
+            total = seconds
+        elif name.startswith("   ") and not name.startswith("    "):
+            top.append((seconds, name.strip()))    # Imported directly by modules.app
+    return total, sorted(top, reverse=True)
+
+
+def bench_startup(repeat=5):
+    """
+    Import time of the application and time to first paint
+    Tiempo de importación de la aplicación y hasta el primer pintado
+    
+    The window run needs a display; without one it goes through xvfb-run
+    when available. Times are from the start of the import.
+    """
+    runs = [_import_times() for _ in range(repeat)]
+    total, top = min(runs)
+    print(f"-X importtime, best of {repeat}:")
+    _report("import modules.app", total)
+    for seconds, name in top[:8]:
+        _report(f"  {name}", seconds)
+    
+    command = [sys.executable, "-c", _STARTUP_CHILD]
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        if not shutil.which("xvfb-run"):
+            print("  window: skipped, no display and no xvfb-run")
+            return
+        command = ["xvfb-run", "-a"] + command
+    try:
+        out = subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, timeout=60, check=True).stdout
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"  window: failed ({e})")
+        return
+    result = json.loads(out.strip().splitlines()[-1])
+    marks = result["marks"]
+    print("window (from process start of the import):")
+    for key, label in (("import", "modules.app imported"), ("init", "MarkdownEditor() built"),
+                       ("map", "window mapped"), ("paint", "first paint (idle after map)"),
+                       ("preview", "preview filled")):
+        if key in marks:
+            _report(label, marks[key])
+        else:
+            print(f"  {label:<40}       n/a")
+    print(f"  heavy modules loaded by the import: {', '.join(result['loaded_at_import']) or 'none'}")
+
+
+BENCHMARKS = {
+    "pool": bench_pool,
+    "large_file": bench_large_file,
+    "journal": bench_journal,
+    "encoding": bench_encoding,
+    "i18n": bench_i18n,
+    "language_switch": bench_language_switch,
+    "startup": bench_startup,
+}
+
+
+def main(names):
+    i18n.init("en")
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} ({', '.join(BENCHMARKS)})")
+            continue
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--large-child"]:
+        _large_file_child(*sys.argv[2:4])
+    else:
+        main(sys.argv[1:])
@@ -12,34 +12,41 @@ Licensed under MIT License
 """
 
 import os
+import itertools
 import customtkinter as ctk
 from tkinter import messagebox, Menu, PanedWindow, HORIZONTAL
 
 from .config import (APP_NAME, APP_VERSION, UI_FONT_FAMILY, UI_FONT_SIZE, 
                      UI_FONT_SIZE_HEADER, EDITOR_FONT_SIZE,
-                     get_recent_files, add_recent_file, remove_recent_file)
-from .snippets import get_snippets, get_example_document
+                     RECOVERY_DIR, get_recent_files, remove_recent_file,
+                     flush_config, config_store)
+from .config_store import SECTION_RECENT
+from .snippets import SNIPPET_ORDER, get_example_document
 from .styles import load_all_styles, save_style, get_default_style, get_style_names
-from .style_editor import StyleEditorWindow
 from .renderer import render_full_html
-from .exporter import open_html_in_browser, export_to_pdf
+from .render_worker import RenderWorker
+from .preview_scheduler import AdaptiveDebounce
+from .edit_tracker import EditTracker
 from .dnd_support import setup_window_drop
 from .zoom import ZoomManager
 from .file_ops import FileManager
+from .save_worker import SaveWorker
+from .file_watcher import FileWatcher
+from .documents import Document, DocumentSet
+from .tab_bar import TabBar
+from .recovery import RecoveryJournal, find_recoveries, discard_recovery
 from .icons import get_icon_text, init_icons
 from .find_replace import FindReplaceBar
+from .find_in_files import FindInFilesWindow
 from .tooltips import TooltipManager
-from .recent_manager import RecentFilesManager
 from .menu import create_menu_bar, update_styles_menu, update_recent_menu
-from .toolbar import create_toolbar, update_toolbar_texts
+from .toolbar import create_toolbar
+from .text_registry import TextRegistry
 from . import i18n
 from .i18n import t
 
-try:
-    from tkinterweb import HtmlFrame
-    HTMLFRAME_AVAILABLE = True
-except ImportError:
-    HTMLFRAME_AVAILABLE = False
+# Imported on first use to keep startup short / Se importan al usarse:
+# style_editor, recent_manager, exporter, and tkinterweb once the window shows
 
 
 class MarkdownEditor(ctk.CTk):
@@ -48,6 +55,8 @@ class MarkdownEditor(ctk.CTk):
     Clase principal del editor con vista dividida (editor + preview)
     """
     
+    JOURNAL_CHECK_MS = 5000     # Recovery journal compaction check
+    
     def __init__(self):
         super().__init__()
         
@@ -59,7 +68,13 @@ class MarkdownEditor(ctk.CTk):
         self.geometry("1400x900")
         
         self.is_dark_mode = ctk.BooleanVar(value=True)
-        self.update_job = None
+        self.renders_avoided = 0
+        self._seen_generation = 0
+        self._style_version = 0
+        self._doc_ids = itertools.count(1)
+        self._preview_generation = None
+        self._preview_stale = False
+        self.find_in_files = None
         self.current_style = None
         self.available_styles = {}
         
@@ -70,7 +85,8 @@ class MarkdownEditor(ctk.CTk):
         ctk.set_default_color_theme("blue")
         
         self.tooltip_mgr = TooltipManager(self)
-        self.recent_mgr = RecentFilesManager(self, self._update_recent_menu)
+        self.texts = TextRegistry()
+        self.recent_mgr = None
         
         self._load_styles()
         self._create_ui()
@@ -79,8 +95,8 @@ class MarkdownEditor(ctk.CTk):
         
         self.dnd_enabled = setup_window_drop(self, self._on_drop)
         
-        self._init_document()
         self._update_status_dnd()
+        self._init_document()
     
     def _load_styles(self):
         """Load available CSS styles"""
@@ -102,59 +118,335 @@ class MarkdownEditor(ctk.CTk):
         self._create_status_bar()
     
     def _setup_managers(self):
-        """Initialize zoom and file managers"""
+        """Initialize zoom, workers and the document set"""
         from .config import get_ui_config
         
-        self.zoom = ZoomManager(self.editor, lambda m: self.status_label.configure(text=m))
-        self.file_mgr = FileManager(
-            self.editor,
-            on_file_change=self._on_file_change,
-            on_status=lambda m: self.status_label.configure(text=m)
+        ui_config = get_ui_config()
+        self.zoom = ZoomManager(None, lambda m: self.status_label.configure(text=m))
+        self.preview_scheduler = AdaptiveDebounce(self, self._update_preview)
+        self.render_worker = RenderWorker(
+            self, self._on_preview_rendered,
+            on_timing=self.preview_scheduler.record_render
         )
+        # Shared by every open document / Compartidos por todos los documentos
+        self.saver = SaveWorker(self, on_recent_change=self._update_recent_menu)
+        self.watcher = FileWatcher(self, self._on_disk_change)
+        # Another instance may change the list: rebuild when the menu opens
+        self._recent_stale = False
+        config_store.on_change(self._on_recent_config_change, sections=(SECTION_RECENT,))
+        self.docs = DocumentSet(ui_config.get("tab_memory_mb", 64))
         
-        ui_config = get_ui_config()
         self.zoom_label.configure(text=self.zoom.get_preview_zoom_text())
         self.editor_zoom_label.configure(text=f"{self.zoom.editor_size}px")
         self.preview_frozen.set(ui_config.get("preview_frozen", False))
     
     def _init_document(self):
-        """Load example document"""
-        example = get_example_document()
-        self.editor.insert("1.0", example)
-        self.file_mgr.mark_saved(example)
-        self.file_label.configure(text=self.file_mgr.get_filename())
+        """Load example document, or replay the journals of a crashed session"""
+        doc = self._recover_session()
+        if doc is None:
+            doc = self._add_document()
+            example = get_example_document()
+            doc.editor.insert("1.0", example)
+            doc.file_mgr.mark_saved(example)
+            self._reset_journal(doc)
+        self._activate(doc)
+        self.after(self.JOURNAL_CHECK_MS, self._check_journal)
+    
+    # Active document / Documento activo
+    
+    @property
+    def editor(self):
+        return self.docs.active.editor
+    
+    @property
+    def edit_tracker(self):
+        return self.docs.active.edit_tracker
+    
+    @property
+    def file_mgr(self):
+        return self.docs.active.file_mgr
+    
+    
+    # =========================================================================
+    # CRASH RECOVERY / RECUPERACIÓN
+    # =========================================================================
+    
+    def _recover_session(self):
+        """
+        Offer the unsaved edits of the previous session, one tab per
+        document. Returns the first recovered document, or None.
+        """
+        first = None
+        for folder, recovery in find_recoveries():
+            if recovery is not None:
+                doc = self._recover_document(recovery)
+                if doc is not None:
+                    doc.journal.flush()     # Journaled again before the old one goes
+                    first = first or doc
+            discard_recovery(folder)
+        return first
+    
+    def _recover_document(self, recovery):
+        """Replay one journal into a new tab (None if declined or failed)"""
+        name = os.path.basename(recovery.filepath) if recovery.filepath else FileManager.DEFAULT_NAME
+        if not messagebox.askyesno(t("dialog.recover_title"), t("dialog.recover_msg", filename=name)):
+            return None
+        try:
+            text = recovery.base_text()
+        except (OSError, ValueError) as e:
+            messagebox.showerror(t("dialog.error"), f"{t('dialog.recover_failed')}:\n{e}")
+            return None
+        
+        doc = self._add_document()
+        doc.editor.insert("1.0", text)
+        doc.editor.edit_modified(False)
+        # Same base as the old journal: the replayed edits are journaled again
+        doc.journal.reset(recovery.filepath, recovery.saved_digest, text=recovery.text,
+                          text_format=recovery.text_format)
+        recovery.replay(doc.editor._textbox)
+        doc.editor.edit_reset()
+        doc.file_mgr.restore(recovery.filepath, recovery.saved_digest, recovery.text_format)
+        
+        self._update_tab(doc)
+        self.status_label.configure(text=t("status.recovered", count=len(recovery.ops)))
+        return doc
+    
+    def _reset_journal(self, doc=None):
+        """New journal base: the file on disk if clean, else a text snapshot"""
+        doc = doc or self.docs.active
+        if doc.is_spilled() or doc.file_mgr.is_loading():
+            return  # Spilled: the journal is still valid / Cargando: al terminar
+        file_mgr = doc.file_mgr
+        path = file_mgr.get_filepath()
+        digest = file_mgr.saved_digest
+        if file_mgr.is_read_only() or (path and not file_mgr.is_dirty()):
+            doc.journal.reset(path, digest, text_format=file_mgr.text_format)
+        else:
+            doc.journal.reset(path, digest, text=doc.editor.get("1.0", "end-1c"),
+                              text_format=file_mgr.text_format)
+    
+    def _check_journal(self):
+        """Periodic compaction of the recovery journals / Compactación periódica"""
+        for doc in self.docs:
+            if not doc.is_spilled() and doc.journal.needs_compaction():
+                self._reset_journal(doc)
+        self.after(self.JOURNAL_CHECK_MS, self._check_journal)
+    
+    # =========================================================================
+    # DOCUMENTS (TABS) / DOCUMENTOS (PESTAÑAS)
+    # =========================================================================
+    
+    def _build_editor(self):
+        """Create an editor widget and its tracker (hidden until activated)"""
+        editor = ctk.CTkTextbox(self.editor_frame, wrap="word",
+            font=("Consolas", self.zoom.editor_size), undo=True)
+        edit_tracker = EditTracker(editor._textbox)
+        editor.bind("<Control-MouseWheel>", self._on_editor_wheel)
+        editor.bind("<KeyRelease>", lambda e: self._on_key_release())
+        editor.bind("<Button-3>", lambda e: self.ctx_menu.tk_popup(e.x_root, e.y_root))
+        # Before the Text class bindings (focus traversal) / Antes de los de la clase Text
+        editor.bind("<Control-Tab>", lambda e: self._cycle_document(1))
+        editor.bind("<Control-Shift-Tab>", lambda e: self._cycle_document(-1))
+        try:
+            editor.bind("<Control-ISO_Left_Tab>", lambda e: self._cycle_document(-1))  # X11
+        except Exception:
+            pass
+        return editor, edit_tracker
+    
+    def _add_document(self):
+        """New empty tab after the active one (not activated) / Pestaña nueva"""
+        doc = Document(next(self._doc_ids))
+        doc.editor, doc.edit_tracker = self._build_editor()
+        doc.file_mgr = FileManager(
+            doc.editor,
+            on_file_change=lambda path, content: self._on_file_change(doc, path, content),
+            on_status=lambda m: self.status_label.configure(text=m),
+            edit_tracker=doc.edit_tracker,
+            on_view_change=lambda: doc is self.docs.active and self._schedule_update(),
+            on_saved=lambda path, ok: self._on_saved(doc, path, ok),
+            on_external_change=lambda path, deleted: self._on_external_change(doc, path, deleted),
+            saver=self.saver,
+            watcher=self.watcher
+        )
+        doc.journal = RecoveryJournal(
+            folder=os.path.join(RECOVERY_DIR, f"{os.getpid()}-{doc.id}"),
+            paused=lambda: doc.file_mgr.is_loading() or doc.file_mgr.is_read_only()
+        )
+        doc.edit_tracker.add_op_listener(doc.journal.record)
+        
+        after = self.docs.active
+        self.docs.add(doc, after=after)
+        self.tab_bar.add(doc.id, doc.file_mgr.get_filename(), after=after.id if after else None)
+        return doc
+    
+    def _activate(self, doc):
+        """
+        Show doc in the editor pane. A warm tab only swaps widgets and
+        shows its cached preview; a spilled one is rebuilt from its snapshot.
+        Muestra doc; una pestaña en memoria solo cambia de widget.
+        """
+        old = self.docs.active
+        if old is not None and old is not doc:
+            old.save_view()
+            old.preview_scroll = self._get_preview_scroll()
+            old.editor.pack_forget()
+            old.measure()
+        hydrated = doc.is_spilled()
+        if hydrated:
+            self._hydrate(doc)
+        self.docs.touch(doc)
+        
+        doc.editor.pack(fill="both", expand=True, padx=5, pady=5)
+        if hydrated:
+            self.after_idle(lambda: doc.editor is not None and doc.restore_view())
+        self.zoom.attach(doc.editor)
+        self.find_bar.attach(doc.editor, doc.edit_tracker)
+        self.tab_bar.select(doc.id)
+        self._seen_generation = doc.edit_tracker.generation
+        self.file_label.configure(text=doc.file_mgr.get_filename())
         self._update_title()
-        self._force_update_preview()
+        self._show_document_preview(doc)
+        self._spill_inactive()
+        
+        if doc.pending_prompt is not None:
+            path, deleted = doc.pending_prompt
+            doc.pending_prompt = None
+            self._on_external_change(doc, path, deleted)
+    
+    def _hydrate(self, doc):
+        """Rebuild a spilled document's widget / Reconstruye el widget de un documento"""
+        editor, edit_tracker = self._build_editor()
+        doc.hydrate(editor, edit_tracker)
+        edit_tracker.add_op_listener(doc.journal.record)  # After the refill: not an edit
+        self.docs.hydrations += 1
+        if doc.pending_disk_change is not None:
+            path, signature = doc.pending_disk_change
+            doc.pending_disk_change = None
+            doc.file_mgr.disk_changed(path, signature)
+    
+    def _spill_inactive(self):
+        """Compress least recently used tabs beyond the memory budget"""
+        if not self.saver.is_idle():
+            return  # Save callbacks need the widget / Los callbacks usan el widget
+        for doc in self.docs.spill_candidates():
+            doc.spill().destroy()
+            self.docs.spills += 1
+    
+    def _close_document(self, doc=None, then=None):
+        """
+        Close a tab, asking to save unsaved edits, and show then (default:
+        its neighbour) / Cierra una pestaña y muestra then (o la vecina)
+        """
+        doc = doc or self.docs.active
+        if doc.is_dirty():
+            self._activate(doc)
+            if not doc.file_mgr.check_unsaved():
+                return "break"
+        doc.file_mgr.shutdown()
+        doc.journal.close()
+        if not doc.is_spilled():
+            doc.edit_tracker.close()
+            doc.editor.destroy()
+        self.tab_bar.remove(doc.id)
+        following = self.docs.remove(doc)
+        if then is not None and then is not doc:
+            following = then
+        if following is None:
+            following = self._add_document()
+            following.file_mgr.new(get_example_document())
+        self._activate(following)
+        return "break"
+    
+    def _cycle_document(self, step):
+        """Ctrl+Tab / Ctrl+Shift+Tab"""
+        if len(self.docs) > 1:
+            self._activate(self.docs.neighbour(self.docs.active, step))
+        return "break"
+    
+    def _select_document(self, doc_id):
+        """Tab clicked / Pestaña pulsada"""
+        for doc in self.docs:
+            if doc.id == doc_id:
+                if doc is not self.docs.active:
+                    self._activate(doc)
+                return
+    
+    def _close_document_id(self, doc_id):
+        for doc in self.docs:
+            if doc.id == doc_id:
+                self._close_document(doc)
+                return
+    
+    def _update_tab(self, doc):
+        """Tab label: file name and unsaved mark / Nombre y marca de cambios"""
+        dirty = " *" if doc.is_dirty() else ""
+        self.tab_bar.set_text(doc.id, f"{doc.file_mgr.get_filename()}{dirty}")
+    
+    def _dirty_files(self):
+        """Paths of open documents with unsaved edits (Find in Files)"""
+        paths = []
+        for doc in self.docs:
+            path = doc.file_mgr.get_filepath()
+            dirty = doc.modified if doc.is_spilled() else doc.file_mgr.is_dirty(exact=True)
+            if path and dirty:
+                paths.append(path)
+        return paths
+    
+    def _find_document(self, filepath):
+        return self.docs.find(os.path.normcase(os.path.abspath(filepath)))
+    
+    def _open_path(self, filepath, on_loaded=None):
+        """
+        Show filepath: its tab if already open, else load it into the active
+        tab when that is an untouched unnamed document, or into a new tab.
+        on_loaded(doc) runs once the content is in the editor.
+        """
+        doc = self._find_document(filepath)
+        if doc is not None:
+            self._activate(doc)
+            if on_loaded:
+                on_loaded(doc)
+            return True
+        
+        active = self.docs.active
+        reuse = (active.file_mgr.get_filepath() is None and not active.file_mgr.is_loading()
+                 and not active.file_mgr.is_dirty(exact=True))
+        doc = active if reuse else self._add_document()
+        if not reuse:
+            self._activate(doc)
+        loaded = (lambda: on_loaded(doc)) if on_loaded else None
+        if doc.file_mgr.load(filepath, on_loaded=loaded):
+            self._schedule_update()
+            return True
+        if not reuse:
+            self._close_document(doc, then=active)
+        return False
     
     # =========================================================================
     # LANGUAGE CHANGE
     # =========================================================================
     
     def _on_language_change(self):
-        """Rebuild UI when language changes"""
-        self.menu_bar.destroy()
-        self.menu_bar = create_menu_bar(self)
-        self._update_recent_menu()
-        update_styles_menu(self)
-        self._create_context_menu()
-        update_toolbar_texts(self)
-        self._update_panel_texts()
+        """Retranslate registered texts when language changes (nothing is rebuilt)"""
+        self.language_var.set(i18n.get_current_language())
+        self.texts.retranslate()
+        self._recent_stale = True   # Rebuilt when the menu opens
         self._update_status_dnd()
-        
-        if hasattr(self, 'lang_btn'):
-            self.lang_btn.configure(text=i18n.get_current_flag())
-    
-    def _update_panel_texts(self):
-        """Update panel header labels"""
-        if hasattr(self, 'editor_title_label'):
-            self.editor_title_label.configure(text=t("panel.editor"))
-        if hasattr(self, 'preview_title_label'):
-            self.preview_title_label.configure(text=t("panel.preview"))
     
     def _update_recent_menu(self):
         """Rebuild recent files menu"""
+        self._recent_stale = False
         update_recent_menu(self)
     
+    def _on_recent_config_change(self, section, value):
+        """Any thread: only flag the menu / Cualquier hilo: solo marca el menú"""
+        self._recent_stale = True
+    
+    def _refresh_recent_menu(self):
+        """Menu postcommand: rebuild if the list changed meanwhile"""
+        if self._recent_stale:
+            self._update_recent_menu()
+    
     # =========================================================================
     # MAIN AREA
     # =========================================================================
@@ -181,6 +473,7 @@ class MarkdownEditor(ctk.CTk):
         eh.pack(fill="x")
         
         self.editor_title_label = ctk.CTkLabel(eh, text=t("panel.editor"), font=self.ui_font_bold)
+        self.texts.widget(self.editor_title_label, "panel.editor")
         self.editor_title_label.pack(side="left", padx=10)
         
         self.editor_collapse_btn = ctk.CTkButton(
@@ -202,11 +495,13 @@ class MarkdownEditor(ctk.CTk):
             command=lambda: self.zoom.editor_out() or self._update_editor_zoom_label(),
             font=self.ui_font).pack(side="right", padx=2)
         
-        self.editor = ctk.CTkTextbox(self.editor_frame, wrap="word", 
-            font=("Consolas", EDITOR_FONT_SIZE), undo=True)
-        self.editor.pack(fill="both", expand=True, padx=5, pady=5)
+        # Document tabs; each document packs its own editor below
+        self.tab_bar = TabBar(self.editor_frame, on_select=self._select_document,
+                              on_close=self._close_document_id)
+        self.tab_bar.pack(fill="x", padx=5)
         
-        self.find_bar = FindReplaceBar(self.editor_frame, self.editor, on_close=self._on_find_close)
+        self.find_bar = FindReplaceBar(self.editor_frame, None, on_close=self._on_find_close,
+                                       on_status=lambda m: self.status_label.configure(text=m))
         self._create_context_menu()
         
         # Preview panel
@@ -223,6 +518,7 @@ class MarkdownEditor(ctk.CTk):
         self.preview_collapse_btn.pack(side="left", padx=5)
         
         self.preview_title_label = ctk.CTkLabel(ph, text=t("panel.preview"), font=self.ui_font_bold)
+        self.texts.widget(self.preview_title_label, "panel.preview")
         self.preview_title_label.pack(side="left", padx=5)
         
         # Frozen controls
@@ -252,42 +548,60 @@ class MarkdownEditor(ctk.CTk):
         ctk.CTkButton(zf, text="A-", width=30, height=24,
             command=self._preview_zoom_out, font=self.ui_font).pack(side="right", padx=2)
         
-        pc = ctk.CTkFrame(self.preview_frame)
-        pc.pack(fill="both", expand=True, padx=5, pady=5)
+        # The preview widget itself is built once the window is on screen
+        self.preview_container = ctk.CTkFrame(self.preview_frame)
+        self.preview_container.pack(fill="both", expand=True, padx=5, pady=5)
+        self.preview = None
+        self.preview_is_html = False
+        self._pending_html = None
+    
+    def _create_preview(self):
+        """
+        Create the preview widget and show the HTML that waited for it
+        Crea el widget de preview y muestra el HTML que lo esperaba
         
-        if HTMLFRAME_AVAILABLE:
-            self.preview = HtmlFrame(pc, messages_enabled=False)
+        tkinterweb (and its Tkhtml engine) is imported here rather than at
+        startup, so the window appears before the preview engine loads.
+        """
+        if self.preview is not None:
+            return
+        try:
+            from tkinterweb import HtmlFrame
+        except ImportError:
+            HtmlFrame = None
+        self.preview_is_html = HtmlFrame is not None
+        if self.preview_is_html:
+            self.preview = HtmlFrame(self.preview_container, messages_enabled=False)
         else:
-            self.preview = ctk.CTkTextbox(pc, wrap="word")
+            self.preview = ctk.CTkTextbox(self.preview_container, wrap="word")
         self.preview.pack(fill="both", expand=True)
+        
+        pending, self._pending_html = self._pending_html, None
+        if pending:
+            self._show_html(*pending)
     
     def _create_context_menu(self):
         """Create right-click menu"""
-        if hasattr(self, 'ctx_menu') and self.ctx_menu:
-            try:
-                self.ctx_menu.destroy()
-            except:
-                pass
-        
-        self.ctx_menu = Menu(self.editor, tearoff=0)
-        self.ctx_menu.add_command(label=t("menu.undo"), command=self._undo, accelerator="Ctrl+Z")
-        self.ctx_menu.add_command(label=t("menu.redo"), command=self._redo, accelerator="Ctrl+Y")
+        texts = self.texts
+        self.ctx_menu = Menu(self, tearoff=0)
+        texts.add(self.ctx_menu, "command", "menu.undo", command=self._undo, accelerator="Ctrl+Z")
+        texts.add(self.ctx_menu, "command", "menu.redo", command=self._redo, accelerator="Ctrl+Y")
         self.ctx_menu.add_separator()
-        self.ctx_menu.add_command(label=t("menu.cut"), command=self._cut, accelerator="Ctrl+X")
-        self.ctx_menu.add_command(label=t("menu.copy"), command=self._copy, accelerator="Ctrl+C")
-        self.ctx_menu.add_command(label=t("menu.paste"), command=self._paste, accelerator="Ctrl+V")
+        texts.add(self.ctx_menu, "command", "menu.cut", command=self._cut, accelerator="Ctrl+X")
+        texts.add(self.ctx_menu, "command", "menu.copy", command=self._copy, accelerator="Ctrl+C")
+        texts.add(self.ctx_menu, "command", "menu.paste", command=self._paste, accelerator="Ctrl+V")
         self.ctx_menu.add_separator()
         
         snippets_menu = Menu(self.ctx_menu, tearoff=0)
-        self.ctx_menu.add_cascade(label=t("menu.insert_snippet"), menu=snippets_menu)
+        texts.add(self.ctx_menu, "cascade", "menu.insert_snippet", menu=snippets_menu)
         
-        for label, snippet in get_snippets().items():
-            if snippet is None:
+        # Content is translated on click, so it follows language changes
+        for key in SNIPPET_ORDER:
+            if key is None:
                 snippets_menu.add_separator()
             else:
-                snippets_menu.add_command(label=label, command=lambda s=snippet: self._insert(s))
-        
-        self.editor.bind("<Button-3>", lambda e: self.ctx_menu.tk_popup(e.x_root, e.y_root))
+                texts.add(snippets_menu, "command", f"snippet.{key}.label",
+                          command=lambda k=key: self._insert(t(f"snippet.{k}.content")))
     
     def _create_status_bar(self):
         """Create status bar"""
@@ -315,6 +629,9 @@ class MarkdownEditor(ctk.CTk):
         self.bind("<Control-s>", lambda e: self._save())
         self.bind("<Control-Shift-s>", lambda e: self._save_as())
         self.bind("<Control-Shift-S>", lambda e: self._save_as())
+        self.bind("<Control-w>", lambda e: self._close_document())
+        self.bind("<Control-Tab>", lambda e: self._cycle_document(1))
+        self.bind("<Control-Shift-Tab>", lambda e: self._cycle_document(-1))
         self.bind("<Control-z>", lambda e: self._undo())
         self.bind("<Control-y>", lambda e: self._redo())
         self.bind("<Control-plus>", lambda e: (self.zoom.editor_in(), self._update_editor_zoom_label()))
@@ -322,11 +639,12 @@ class MarkdownEditor(ctk.CTk):
         self.bind("<Control-0>", lambda e: (self.zoom.editor_reset(), self._update_editor_zoom_label()))
         self.bind("<Control-f>", lambda e: self._show_find())
         self.bind("<Control-h>", lambda e: self._show_replace())
+        self.bind("<Control-Shift-f>", lambda e: self._show_find_in_files())
+        self.bind("<Control-Shift-F>", lambda e: self._show_find_in_files())
         self.bind("<F3>", lambda e: self._find_next())
         self.bind("<Shift-F3>", lambda e: self._find_prev())
-        self.bind("<Escape>", lambda e: self._close_find())
-        self.editor.bind("<Control-MouseWheel>", self._on_editor_wheel)
-        self.editor.bind("<KeyRelease>", lambda e: self._on_edit())
+        self.bind("<Escape>", lambda e: self._on_escape())
+        self.bind("<Map>", self._on_map, add="+")
     
     def _on_editor_wheel(self, e):
         """Handle Ctrl+wheel zoom"""
@@ -347,7 +665,15 @@ class MarkdownEditor(ctk.CTk):
             self.zoom_label.configure(text=self.zoom.get_preview_zoom_text())
             self._force_update_preview()
     
+    def _on_key_release(self):
+        """Navigation and modifier keys do not change the content / Las teclas de navegación no editan"""
+        if self.edit_tracker.generation == self._seen_generation:
+            self.renders_avoided += 1
+            return
+        self._on_edit()
+    
     def _on_edit(self):
+        self._seen_generation = self.edit_tracker.generation
         self._schedule_update()
         self._update_title()
     
@@ -426,6 +752,13 @@ class MarkdownEditor(ctk.CTk):
             self.find_bar._find_prev()
         return "break"
     
+    def _on_escape(self):
+        """Cancel a file load, or close the find bar"""
+        if self.file_mgr.is_loading():
+            self.file_mgr.cancel_load()
+            return "break"
+        return self._close_find()
+    
     def _close_find(self):
         if self.find_bar.is_visible():
             self.find_bar.hide()
@@ -434,27 +767,61 @@ class MarkdownEditor(ctk.CTk):
     def _on_find_close(self):
         self.editor.focus_set()
     
+    def _show_find_in_files(self):
+        """Open (or raise) the Find in Files window"""
+        if self.find_in_files is not None and self.find_in_files.winfo_exists():
+            self.find_in_files.lift()
+            self.find_in_files.find_entry.focus_set()
+            return "break"
+        self.find_in_files = FindInFilesWindow(self, self.file_mgr.get_directory(), self._dirty_files,
+                                               on_open=self._open_location,
+                                               on_files_changed=self._on_files_replaced)
+        return "break"
+    
+    def _open_location(self, filepath, line, col, length):
+        """Open a file (if needed) and select a match / Abre un archivo y selecciona"""
+        def select(doc):
+            index = f"{line}.{col}"
+            textbox = doc.editor._textbox
+            textbox.tag_remove("sel", "1.0", "end")
+            textbox.tag_add("sel", index, f"{index} + {length} chars")
+            textbox.mark_set("insert", index)
+            textbox.see(index)
+            doc.editor.focus_set()
+        
+        self._open_path(filepath, on_loaded=select)
+    
+    def _on_files_replaced(self, paths):
+        """Reload open files that Replace in Files rewrote"""
+        for path in paths:
+            doc = self._find_document(path)
+            # Spilled tabs get the watcher's change on activation
+            if doc is not None and not doc.is_spilled() and not doc.file_mgr.is_dirty(exact=True):
+                doc.file_mgr.load(doc.file_mgr.get_filepath())
+                if doc is self.docs.active:
+                    self._schedule_update()
+    
     # =========================================================================
     # FILE ACTIONS
     # =========================================================================
     
     def _new(self):
-        if self.file_mgr.new(get_example_document()):
-            self._schedule_update()
+        """New document in a new tab / Documento nuevo en una pestaña nueva"""
+        doc = self._add_document()
+        doc.file_mgr.new(get_example_document())
+        self._activate(doc)
     
     def _open(self):
-        if self.file_mgr.open():
-            self._update_recent_menu()
-            self._schedule_update()
+        path = self.file_mgr.choose_file()
+        if path:
+            self._open_path(path)
     
     def _save(self):
-        if self.file_mgr.save():
-            self._update_recent_menu()
+        self.file_mgr.save()
         self._update_title()
     
     def _save_as(self):
-        if self.file_mgr.save_as():
-            self._update_recent_menu()
+        self.file_mgr.save_as()
         self._update_title()
     
     def _open_recent(self, filepath):
@@ -468,43 +835,104 @@ class MarkdownEditor(ctk.CTk):
                 self._update_recent_menu()
             return
         
-        if not self.file_mgr.check_unsaved():
-            return
-        
-        self.file_mgr.load(filepath)
-        add_recent_file(filepath)
-        self._update_recent_menu()
-        self._schedule_update()
+        self._open_path(filepath)
     
     def _manage_recent(self):
         """Open recent files manager"""
+        if self.recent_mgr is None:
+            from .recent_manager import RecentFilesManager
+            self.recent_mgr = RecentFilesManager(self, self._update_recent_menu)
         self.recent_mgr.show()
     
     def _on_drop(self, path):
         if not self.file_mgr.is_valid_extension(path):
             messagebox.showwarning(t("dialog.error"), t("dialog.error_extension"))
             return
-        if self.file_mgr.check_unsaved():
-            if self.file_mgr.load(path):
-                self._update_recent_menu()
-            self._schedule_update()
+        self._open_path(path)
     
     def _insert(self, snippet):
         self.editor.insert("insert", snippet)
         self._schedule_update()
     
-    def _on_file_change(self, filepath, content):
-        self.file_label.configure(text=self.file_mgr.get_filename())
-        self._update_title()
+    def _on_file_change(self, doc, filepath, content):
+        self._update_tab(doc)
+        self._reset_journal(doc)
+        if doc is self.docs.active:
+            self.file_label.configure(text=doc.file_mgr.get_filename())
+            self._update_title()
+            self._schedule_update()
+    
+    def _on_saved(self, doc, filepath, ok):
+        self._update_tab(doc)
+        if doc is self.docs.active:
+            self._update_title()
+        if not ok:
+            self._reset_journal(doc)    # The disk base of that save is not on disk
+    
+    def _on_disk_change(self, filepath, signature):
+        """Shared watcher: route a change to the tab of that file"""
+        doc = self._find_document(filepath)
+        if doc is None:
+            return
+        if doc.is_spilled():
+            doc.pending_disk_change = (filepath, signature)
+        else:
+            doc.file_mgr.disk_changed(filepath, signature)
+    
+    def _on_external_change(self, doc, filepath, deleted):
+        """
+        Another program changed or deleted an open file: reload silently
+        when there are no unsaved edits, ask otherwise (a background tab
+        asks when it is shown again)
+        """
+        name = os.path.basename(filepath)
+        self._update_tab(doc)
+        if deleted:
+            if doc is self.docs.active:
+                self._update_title()
+                self.status_label.configure(text=t("status.file_deleted", filename=name))
+            return
+        if doc.file_mgr.is_dirty(exact=True):
+            if doc is not self.docs.active:
+                doc.pending_prompt = (filepath, deleted)
+                return
+            if not messagebox.askyesno(t("dialog.changed_title"), t("dialog.changed_msg", filename=name)):
+                return  # Keep the edits; saving will overwrite / Conservar; guardar sobrescribe
+        
+        doc.save_view()
+        
+        def restore_view():
+            if doc.editor is None:
+                return
+            doc.restore_view()
+            if doc is self.docs.active:
+                self.status_label.configure(text=t("status.reloaded", filename=name))
+        
+        doc.file_mgr.load(filepath, on_loaded=restore_view)
     
     def _update_title(self):
         dirty = " *" if self.file_mgr.is_dirty() else ""
         name = self.file_mgr.get_filename()
+        self.tab_bar.set_text(self.docs.active.id, f"{name}{dirty}")
+        if self.file_mgr.is_read_only():
+            name += f" [{t('status.read_only')}, {self.file_mgr.text_format.label()}]"
         self.title(f"{APP_NAME} v{APP_VERSION} - {name}{dirty}")
     
     def _on_close(self):
-        if self.file_mgr.check_unsaved():
-            self.destroy()
+        for doc in self.docs:
+            if doc.is_dirty():
+                self._activate(doc)
+                if not doc.file_mgr.check_unsaved():
+                    return
+        self.render_worker.stop()
+        for doc in self.docs:
+            doc.file_mgr.shutdown()
+            doc.journal.close()
+        self.saver.stop()     # May add recent files / Puede añadir recientes
+        self.watcher.stop()
+        config_store.remove_callback(self._on_recent_config_change)
+        flush_config()
+        self.destroy()
     
     # =========================================================================
     # PREVIEW
@@ -513,35 +941,105 @@ class MarkdownEditor(ctk.CTk):
     def _schedule_update(self):
         if self.preview_frozen.get():
             return
-        if self.update_job:
-            self.after_cancel(self.update_job)
-        self.update_job = self.after(300, self._update_preview)
+        if self.file_mgr.is_loading():
+            return  # Rendered once the load finishes / Se renderiza al terminar la carga
+        if not self._is_preview_visible():
+            # Render lazily when shown again / Renderizar al volver a mostrarse
+            self._preview_stale = True
+            self.renders_avoided += 1
+            return
+        self.preview_scheduler.trigger()
+    
+    def _is_preview_visible(self):
+        """Is the preview pane shown and the window not minimized? / ¿Preview visible?"""
+        return self.preview_expanded and self.state() != "iconic"
+    
+    def _on_map(self, e):
+        """Resume a paused preview when the window is restored / Reanuda al restaurar"""
+        if e.widget is not self:
+            return
+        if self.preview is None:
+            # First show: build the preview once the layout has painted
+            self.after_idle(self._create_preview)
+        if self._preview_stale:
+            self._schedule_update()
     
     def _update_preview(self):
+        """Send a snapshot of the buffer to the render worker / Envía snapshot al worker"""
+        if not self._is_preview_visible():
+            self._preview_stale = True
+            self.renders_avoided += 1
+            return
+        if self.edit_tracker.generation == self._preview_generation:
+            self.renders_avoided += 1
+            return
+        self._preview_stale = False
+        self._preview_generation = self.edit_tracker.generation
+        doc = self.docs.active
         md = self.editor.get("1.0", "end-1c")
         zoom_css = self.zoom.get_zoom_css()
-        html = render_full_html(md, self.current_style, zoom_css)
-        
-        try:
-            if HTMLFRAME_AVAILABLE:
-                self.preview.load_html(html)
-            else:
-                self.preview.delete("1.0", "end")
-                self.preview.insert("1.0", html)
-        except Exception as e:
-            print(f"Error preview: {e}")
-    
-    def _force_update_preview(self):
-        if self.update_job:
-            self.after_cancel(self.update_job)
+        self.render_worker.submit(md, self.current_style, zoom_css,
+                                  context=(doc, self._preview_key(doc), None))
+    
+    def _force_update_preview(self, scroll_pos=None):
+        """
+        Render now; the preview keeps its scroll position (or goes to scroll_pos)
+        Renderiza ya, conservando el scroll del preview (o yendo a scroll_pos)
+        """
+        self.preview_scheduler.reset()
+        if not self._is_preview_visible():
+            self._preview_stale = True
+            self._preview_generation = None
+            self.renders_avoided += 1
+            return
+        self._preview_stale = False
+        self._preview_generation = self.edit_tracker.generation
         
+        doc = self.docs.active
+        if scroll_pos is None:
+            scroll_pos = self._get_preview_scroll()
         md = self.editor.get("1.0", "end-1c")
         zoom_css = self.zoom.get_zoom_css()
-        html = render_full_html(md, self.current_style, zoom_css)
-        
+        self.render_worker.submit(md, self.current_style, zoom_css,
+                                  context=(doc, self._preview_key(doc), scroll_pos))
+    
+    def _preview_key(self, doc):
+        """What a cached preview depends on: content, style and zoom"""
+        return (doc.edit_tracker.generation, self._style_version, self.zoom.preview_size)
+    
+    def _show_document_preview(self, doc):
+        """
+        Preview of a tab being shown: its cached HTML when still current
+        (no Markdown rendering), else a render
+        """
+        if doc.html is not None and doc.html_key == self._preview_key(doc):
+            self.preview_scheduler.reset()
+            self._preview_generation = doc.edit_tracker.generation
+            self._preview_stale = False
+            self.docs.cache_hits += 1
+            self._show_html(doc.html, doc.preview_scroll)
+        else:
+            self._force_update_preview(scroll_pos=doc.preview_scroll)
+    
+    def _on_preview_rendered(self, html, context):
+        """Cache worker output in its document and show it if active (Tk thread)"""
+        doc, key, scroll_pos = context
+        if doc.is_spilled() or doc not in self.docs.documents:
+            return
+        doc.html, doc.html_key = html, key
+        if doc is self.docs.active:
+            self._show_html(html, scroll_pos)
+    
+    def _show_html(self, html, scroll_pos=None):
+        """Load HTML in the preview / Carga HTML en el preview"""
+        if self.preview is None:
+            # Window not shown yet: keep the newest HTML for _create_preview
+            self._pending_html = (html, scroll_pos)
+            if self.winfo_ismapped():
+                self._create_preview()
+            return
         try:
-            if HTMLFRAME_AVAILABLE:
-                scroll_pos = self._get_preview_scroll()
+            if self.preview_is_html:
                 self.preview.load_html(html)
                 if scroll_pos is not None and scroll_pos > 0:
                     self.after(100, lambda: self._set_preview_scroll(scroll_pos))
@@ -552,8 +1050,11 @@ class MarkdownEditor(ctk.CTk):
             print(f"Error preview: {e}")
     
     def _get_preview_scroll(self):
+        if self.preview is None:
+            pending = self._pending_html
+            return (pending[1] or 0) if pending else 0
         try:
-            if HTMLFRAME_AVAILABLE:
+            if self.preview_is_html:
                 if hasattr(self.preview, 'html') and hasattr(self.preview.html, 'yview'):
                     yview = self.preview.html.yview()
                     if yview:
@@ -568,7 +1069,7 @@ class MarkdownEditor(ctk.CTk):
     
     def _set_preview_scroll(self, pos):
         try:
-            if HTMLFRAME_AVAILABLE and pos is not None and pos > 0:
+            if self.preview_is_html and pos is not None and pos > 0:
                 try:
                     pixels = int(pos * 10000)
                     self.preview.run_javascript(f"window.scrollTo(0, {pixels});")
@@ -596,6 +1097,7 @@ class MarkdownEditor(ctk.CTk):
     
     def _apply_style(self, style):
         self.current_style = style
+        self._style_version += 1
         self.style_combo.set(style.get('name', 'Custom'))
         self._force_update_preview()
     
@@ -606,10 +1108,12 @@ class MarkdownEditor(ctk.CTk):
                 break
     
     def _edit_style(self):
+        from .style_editor import StyleEditorWindow
         StyleEditorWindow(self, self.current_style, self._on_style_saved)
     
     def _on_style_saved(self, data, save=True):
         self.current_style = data
+        self._style_version += 1
         if save and '_filepath' in data:
             try:
                 save_style(data)
@@ -630,6 +1134,7 @@ class MarkdownEditor(ctk.CTk):
     def _copy_html(self):
         md = self.editor.get("1.0", "end-1c")
         html = render_full_html(md, self.current_style)
+        from .exporter import open_html_in_browser
         open_html_in_browser(
             html, 
             suggested_name=self.file_mgr.get_base_name(),
@@ -640,6 +1145,7 @@ class MarkdownEditor(ctk.CTk):
     def _export_pdf(self):
         md = self.editor.get("1.0", "end-1c")
         html = render_full_html(md, self.current_style)
+        from .exporter import export_to_pdf
         export_to_pdf(
             html,
             suggested_name=self.file_mgr.get_base_name(),
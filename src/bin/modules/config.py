@@ -13,7 +13,9 @@ Licensed under MIT License
 
 import os
 import sys
-import json
+import atexit
+
+from .config_store import ConfigStore, SECTION_UI, SECTION_RECENT
 
 # =============================================================================
 # VERSION
@@ -40,6 +42,8 @@ STYLES_DIR = os.path.join(APP_DIR, "styles")
 WKHTMLTOPDF_DIR = os.path.join(APP_DIR, "wkhtmltopdf")
 WKHTMLTOPDF_EXE = os.path.join(WKHTMLTOPDF_DIR, "bin", "wkhtmltopdf.exe")
 CONFIG_FILE = os.path.join(APP_DIR, "config.json")
+CACHE_DIR = os.path.join(APP_DIR, "cache")
+RECOVERY_DIR = os.path.join(CACHE_DIR, "recovery")
 
 # =============================================================================
 # URLs
@@ -62,7 +66,8 @@ DEFAULT_UI_CONFIG = {
     "preview_font_size": 16,
     "preview_frozen": False,
     "editor_collapsed": False,
-    "preview_collapsed": False
+    "preview_collapsed": False,
+    "tab_memory_mb": 64     # Inactive tabs beyond this are compressed
 }
 
 # Shortcuts / Atajos
@@ -73,47 +78,36 @@ PREVIEW_FONT_SIZE = DEFAULT_UI_CONFIG["preview_font_size"]
 # UI CONFIG - Load / Save
 # =============================================================================
 
-_ui_config = None
-
-def _load_full_config():
-    """Load full config.json / Carga config.json completo"""
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError, OSError):
-            pass  # Return empty config on error / Retorna config vacía en error
-    return {}
-
-def _save_full_config(config):
-    """Save full config.json / Guarda config.json completo"""
-    try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-        return True
-    except (IOError, OSError, TypeError):
-        return False
+config_store = ConfigStore(CONFIG_FILE)
+atexit.register(config_store.flush)
+
+def flush_config():
+    """
+    Write pending config changes now (call before exiting)
+    Escribe ya los cambios de config pendientes (llamar antes de salir)
+    """
+    return config_store.flush()
 
 def load_ui_config():
     """
     Load UI configuration from config.json
     Carga configuración UI desde config.json
     
+    Read from the config store every time, so changes another editor
+    instance wrote are seen.
+    
     Returns:
-        dict: UI config with defaults applied
+        dict: UI config with defaults applied (a copy)
     """
-    global _ui_config
-    
-    full_config = _load_full_config()
-    stored_ui = full_config.get("ui", {})
+    stored_ui = config_store.get(SECTION_UI) or {}
     
     # Merge with defaults / Fusionar con valores por defecto
-    _ui_config = DEFAULT_UI_CONFIG.copy()
+    ui_config = DEFAULT_UI_CONFIG.copy()
     for key in DEFAULT_UI_CONFIG:
         if key in stored_ui:
-            _ui_config[key] = stored_ui[key]
+            ui_config[key] = stored_ui[key]
     
-    return _ui_config
+    return ui_config
 
 def save_ui_config(ui_config):
     """
@@ -123,35 +117,35 @@ def save_ui_config(ui_config):
     Args:
         ui_config: dict with UI settings
     """
-    global _ui_config
-    _ui_config = ui_config
-    
-    full_config = _load_full_config()
-    full_config["ui"] = ui_config
-    _save_full_config(full_config)
+    config_store.set(SECTION_UI, dict(ui_config))
 
 def get_ui_config():
     """
-    Get current UI config (load if not loaded)
-    Obtiene config UI actual (carga si no está cargada)
+    Get current UI config
+    Obtiene config UI actual
     """
-    global _ui_config
-    if _ui_config is None:
-        load_ui_config()
-    return _ui_config
+    return load_ui_config()
 
 def update_ui_config(**kwargs):
     """
-    Update specific UI config values and save
-    Actualiza valores específicos de config UI y guarda
+    Update specific UI config values and save (the write is debounced)
+    Actualiza valores específicos de config UI y guarda (escritura diferida)
+    
+    Only the given keys change, also when another instance changed
+    other keys meanwhile.
     
     Example: update_ui_config(editor_font_size=16, preview_frozen=True)
     """
-    config = get_ui_config()
-    for key, value in kwargs.items():
-        if key in config:
-            config[key] = value
-    save_ui_config(config)
+    changes = {key: value for key, value in kwargs.items() if key in DEFAULT_UI_CONFIG}
+    
+    def apply(stored_ui):
+        ui_config = dict(stored_ui or {})
+        if all(key in ui_config and ui_config[key] == value for key, value in changes.items()):
+            return None     # Already stored / Ya guardado
+        ui_config.update(changes)
+        return ui_config
+    
+    config_store.update(SECTION_UI, apply)
 
 
 # =============================================================================
@@ -168,8 +162,7 @@ def get_recent_files():
     Returns:
         list: List of file paths (most recent first)
     """
-    full_config = _load_full_config()
-    return full_config.get("recent_files", [])
+    return list(config_store.get(SECTION_RECENT, []))
 
 
 def add_recent_file(filepath):
@@ -180,28 +173,37 @@ def add_recent_file(filepath):
     Args:
         filepath: Full path to the file
     """
-    if not filepath:
-        return
+    add_recent_files([filepath])
+
+
+def add_recent_files(filepaths):
+    """
+    Add several files to recent files list with a single write
+    Añade varios ficheros a la lista de recientes con una sola escritura
     
+    Args:
+        filepaths: Paths in the order they were used (last = most recent)
+    """
     # Normalize path / Normalizar ruta
-    filepath = os.path.normpath(filepath)
-    
-    full_config = _load_full_config()
-    recent = full_config.get("recent_files", [])
-    
-    # Remove if already exists (will re-add at top)
-    # Quitar si ya existe (se re-añadirá arriba)
-    if filepath in recent:
-        recent.remove(filepath)
-    
-    # Add at beginning / Añadir al principio
-    recent.insert(0, filepath)
+    filepaths = [os.path.normpath(p) for p in filepaths if p]
+    if not filepaths:
+        return
     
-    # Keep only MAX / Mantener solo MAX
-    recent = recent[:MAX_RECENT_FILES]
+    def add(recent):
+        recent = list(recent or [])
+        for filepath in filepaths:
+            # Remove if already exists (will re-add at top)
+            # Quitar si ya existe (se re-añadirá arriba)
+            if filepath in recent:
+                recent.remove(filepath)
+            
+            # Add at beginning / Añadir al principio
+            recent.insert(0, filepath)
+        
+        # Keep only MAX / Mantener solo MAX
+        return recent[:MAX_RECENT_FILES]
     
-    full_config["recent_files"] = recent
-    _save_full_config(full_config)
+    config_store.update(SECTION_RECENT, add)
 
 
 def remove_recent_file(filepath):
@@ -214,13 +216,12 @@ def remove_recent_file(filepath):
     """
     filepath = os.path.normpath(filepath)
     
-    full_config = _load_full_config()
-    recent = full_config.get("recent_files", [])
+    def remove(recent):
+        if recent and filepath in recent:
+            return [p for p in recent if p != filepath]
+        return None     # Not listed: nothing to write / No está: nada que escribir
     
-    if filepath in recent:
-        recent.remove(filepath)
-        full_config["recent_files"] = recent
-        _save_full_config(full_config)
+    config_store.update(SECTION_RECENT, remove)
 
 
 def clear_recent_files():
@@ -228,6 +229,4 @@ def clear_recent_files():
     Clear all recent files
     Limpia todos los ficheros recientes
     """
-    full_config = _load_full_config()
-    full_config["recent_files"] = []
-    _save_full_config(full_config)
+    config_store.set(SECTION_RECENT, [])
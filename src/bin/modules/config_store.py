@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - config.json store shared by every module
+Almacén de config.json compartido por todos los módulos
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+from .file_watcher import file_signature, signature_of
+
+
+# Sections in config.json / Secciones de config.json
+SECTION_UI = "ui"
+SECTION_LANGUAGE = "language"
+SECTION_RECENT = "recent_files"
+VERSION_KEY = "_version"    # Bumped by every write / Se incrementa en cada escritura
+
+
+def _read_umask():
+    """Process umask, read once at import / umask del proceso, leída al importar"""
+    # os.umask() can only read it by setting it: doing that at import time
+    # keeps other threads from creating files under a zero umask
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+def atomic_write(filepath, data):
+    """
+    Write bytes atomically (temp file, fsync, os.replace), keeping permissions
+    Escribe bytes de forma atómica, conservando los permisos
+    
+    Returns:
+        os.stat_result of the written file
+    """
+    folder = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".part", dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = os.stat(filepath).st_mode & 0o7777
+        except OSError:
+            mode = 0o666 & ~_UMASK
+        try:
+            os.chmod(tmp_path, mode)
+        except OSError:
+            pass
+        os.replace(tmp_path, filepath)
+        return os.stat(filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class FileLock:
+    """
+    Advisory lock on "<path>.lock", held across processes
+    Bloqueo consultivo sobre "<path>.lock", entre procesos
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+    
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            else:
+                # Retries for about 10 s, then raises OSError
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        except OSError:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        return self
+    
+    def __exit__(self, *exc):
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ConfigStore:
+    """
+    config.json held in memory, written in the background
+    config.json en memoria, escrito en segundo plano
+    
+    set()/update() mark a section dirty; a writer thread writes after
+    WRITE_DELAY (MAX_DELAY at most) under a FileLock, replaying pending
+    update() operations on what other instances wrote. Listeners are
+    called on the thread that saw the change.
+    """
+    
+    WRITE_DELAY = 0.5
+    MAX_DELAY = 2.0
+    RETRY_DELAY = 5.0
+    REFRESH_INTERVAL = 2.0
+    
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self.requests = 0
+        self.writes = 0
+        self.failures = 0
+        self.external = 0
+        self._data = None
+        self._dirty = {}            # section -> [fn(value) -> new value or None]
+        self._first_change = None
+        self._last_change = None
+        self._retry_at = 0.0
+        self._signature = None      # config.json last read or written / último leído o escrito
+        self._checked_at = 0.0
+        self._listeners = []        # (callback, sections or None)
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()     # One writer at a time / Un escritor a la vez
+        self._thread = None
+    
+    @property
+    def coalesced(self):
+        return self.requests - self.writes
+    
+    # =========================================================================
+    # SECTIONS / SECCIONES
+    # =========================================================================
+    
+    def get(self, section, default=None):
+        """Section value from memory, not a copy / Valor de una sección, sin copiar"""
+        self._refresh()
+        with self._lock:
+            return self._loaded().get(section, default)
+    
+    def set(self, section, value):
+        """Change a section and schedule a write / Cambia una sección y programa la escritura"""
+        # Replaces whatever is pending: earlier operations no longer matter
+        self._change(section, value, [lambda current: value])
+    
+    def update(self, section, fn):
+        """
+        Read-modify-write of a section (fn may be replayed: no mutation)
+        Lee-modifica-escribe una sección (fn puede repetirse: sin mutar)
+        
+        Args:
+            fn: Callback(current value or None) -> new value or None
+        """
+        self._refresh()
+        with self._lock:
+            value = fn(self._loaded().get(section))
+            if value is not None:
+                self._change(section, value, self._dirty.get(section, []) + [fn])
+    
+    def _change(self, section, value, ops):
+        with self._lock:
+            self._loaded()[section] = value
+            self._dirty[section] = ops
+            self.requests += 1
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._start()
+            self._changed.notify()
+            listeners = list(self._listeners)
+        self._notify(listeners, section, value)
+    
+    def on_change(self, callback, sections=None):
+        """
+        Register callback(section, value) for changes to sections (all if None)
+        Registra callback(section, value) para cambios en sections (todas si None)
+        """
+        with self._lock:
+            self._listeners.append((callback, frozenset(sections) if sections else None))
+            self._start()    # Its timer looks for other instances / Su temporizador vigila otras instancias
+    
+    def remove_callback(self, callback):
+        """Remove a registered callback / Elimina un callback registrado"""
+        with self._lock:
+            self._listeners = [l for l in self._listeners if l[0] is not callback]
+    
+    def _notify(self, listeners, section, value):
+        for callback, sections in listeners:
+            if sections is None or section in sections:
+                try:
+                    callback(section, value)
+                except Exception:
+                    pass
+    
+    # =========================================================================
+    # FILE / ARCHIVO
+    # =========================================================================
+    
+    def _read_file(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except (json.JSONDecodeError, IOError, OSError, UnicodeDecodeError):
+                pass  # Empty config on error / Config vacía en error
+        return {}
+    
+    def _loaded(self):
+        if self._data is None:
+            self._signature = file_signature(self.path)
+            self._data = self._read_file()
+            self.version = self._data.pop(VERSION_KEY, 0)
+        return self._data
+    
+    def flush(self):
+        """
+        Write pending changes now, on the calling thread
+        Escribe ahora los cambios pendientes, en el hilo que llama
+        
+        Returns:
+            bool: False if the write failed
+        """
+        with self._write_lock:
+            return self._write_dirty()
+    
+    def _start(self):
+        """Start the writer thread (store lock held) / Arranca el hilo escritor"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        """Writer thread: wait for the debounce delay, then write; idle, refresh"""
+        while True:
+            with self._lock:
+                while True:
+                    if not self._dirty:
+                        if self._changed.wait(self.REFRESH_INTERVAL) or self._dirty:
+                            continue
+                        break
+                    now = time.monotonic()
+                    due = min(self._last_change + self.WRITE_DELAY,
+                              self._first_change + self.MAX_DELAY)
+                    due = max(due, self._retry_at)
+                    if now >= due:
+                        break
+                    self._changed.wait(due - now)
+                write = bool(self._dirty)
+            if write:
+                self.flush()
+            else:
+                self._refresh(force=True)
+    
+    def _refresh(self, force=False):
+        """
+        Merge config.json if another instance replaced it (stat every REFRESH_INTERVAL)
+        Integra config.json si otra instancia lo reemplazó
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._data is None or (not force and now - self._checked_at < self.REFRESH_INTERVAL):
+                return
+            self._checked_at = now
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return
+        # A write in progress merges on its own / Una escritura en curso ya integra
+        if not self._write_lock.acquire(blocking=False):
+            return
+        notify = []
+        try:
+            config = self._read_file()
+            version = config.pop(VERSION_KEY, 0)
+            with self._lock:
+                self._signature = signature
+                listeners = list(self._listeners)
+                if version != self.version:
+                    notify = self._merge_external(config, version)
+        finally:
+            self._write_lock.release()
+        for section, value in notify:
+            self._notify(listeners, section, value)
+    
+    def _write_dirty(self):
+        with self._lock:
+            if not self._dirty:
+                return True
+        
+        notify = []
+        listeners = ()
+        try:
+            with FileLock(self.path + ".lock"):
+                config = self._read_file()
+                version = config.pop(VERSION_KEY, 0)
+                with self._lock:
+                    listeners = list(self._listeners)
+                    if version != self.version:
+                        notify = self._merge_external(config, version)
+                    # Serialize under the lock: callers may change the objects later
+                    written = {section: ops for section, ops in list(self._dirty.items())
+                               if self._serializable(section)}
+                    for section in written:
+                        config[section] = self._data[section]
+                    config[VERSION_KEY] = version + 1
+                    data = json.dumps(config, indent=2, ensure_ascii=False).encode("utf-8")
+                stat = atomic_write(self.path, data)
+        except (IOError, OSError) as e:
+            print(f"Error saving config: {e}")
+            with self._lock:
+                self.failures += 1
+                self._retry_at = time.monotonic() + self.RETRY_DELAY
+            return False
+        finally:
+            for section, value in notify:
+                self._notify(listeners, section, value)
+        
+        with self._lock:
+            self.version = version + 1
+            self._signature = signature_of(stat)
+            self.writes += 1
+            self._retry_at = 0.0
+            for section, ops in written.items():
+                # Keep operations recorded while writing / Conserva las
+                # operaciones registradas durante la escritura
+                pending = self._dirty.get(section)
+                if pending is ops:
+                    del self._dirty[section]
+                elif pending is not None and pending[:len(ops)] == ops:
+                    self._dirty[section] = pending[len(ops):]
+            if not self._dirty:
+                self._first_change = self._last_change = None
+            else:
+                self._first_change = time.monotonic()
+        return True
+    
+    def _serializable(self, section):
+        """False (and the change dropped) if a section cannot go to JSON"""
+        try:
+            json.dumps(self._data[section])
+            return True
+        except (TypeError, ValueError) as e:
+            print(f"Error saving config section {section!r}: {e}")
+            del self._dirty[section]
+            self.failures += 1
+            return False
+    
+    def _merge_external(self, config, version):
+        """
+        Take another instance's sections, replaying our pending operations
+        Toma las secciones de otra instancia, repitiendo las operaciones pendientes
+        
+        Returns:
+            list of (section, value) that changed in memory
+        """
+        notify = []
+        self.version = version
+        for section in set(config) | set(self._dirty):
+            if section in self._dirty:
+                value = config.get(section)
+                for fn in self._dirty[section]:
+                    try:
+                        new = fn(value)
+                    except Exception:
+                        new = None
+                    if new is not None:
+                        value = new
+                if value is None:
+                    continue
+            else:
+                value = config[section]
+            if self._data.get(section) != value:
+                self._data[section] = value
+                notify.append((section, value))
+                if section not in self._dirty:
+                    self.external += 1
+        return notify
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Open documents (tabs) and their memory budget
+Documentos abiertos (pestañas) y su presupuesto de memoria
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import zlib
+from tkinter import TclError
+
+
+class Document:
+    """
+    One open document: its editor widget and everything tied to it
+    Un documento abierto: su widget de editor y todo lo asociado
+    
+    While hydrated the document owns a CTkTextbox (with its own undo
+    history), an EditTracker and a FileManager bound to that textbox. A
+    spilled document keeps only a zlib snapshot of its text, the cursor
+    and scroll position and the modified flag; the FileManager object
+    stays (file name, saved digest) but must not be used until hydrate().
+    Only documents with nothing to undo are spilled.
+    """
+    
+    def __init__(self, doc_id):
+        self.id = doc_id
+        self.editor = None
+        self.edit_tracker = None
+        self.file_mgr = None
+        self.journal = None
+        
+        self.html = None            # Last rendered preview / Último preview renderizado
+        self.html_key = None        # (generation, style, zoom) of that render
+        self.preview_scroll = 0
+        self.view = None            # (insert index, first visible fraction)
+        
+        self.snapshot = None        # Compressed text while spilled / Texto comprimido
+        self.modified = False       # Modified flag while spilled
+        self.size_estimate = 0
+        self.last_used = 0
+        self.pending_disk_change = None     # (path, signature) seen while spilled
+        self.pending_prompt = None          # (path, deleted) to handle on activation
+    
+    def is_spilled(self):
+        return self.editor is None
+    
+    def is_dirty(self):
+        """Unsaved changes (cheap check) / Cambios sin guardar (comprobación rápida)"""
+        if self.is_spilled():
+            return self.modified
+        return self.file_mgr.is_dirty()
+    
+    def can_spill(self):
+        """
+        Loading, mapped read-only and documents with undo history stay in
+        their widget (a snapshot cannot keep the undo stack)
+        """
+        return (not self.is_spilled() and not self.file_mgr.is_loading()
+                and not self.file_mgr.is_read_only() and not self.has_undo())
+    
+    def has_undo(self):
+        """Would Ctrl+Z change something? / ¿Hay algo que deshacer?"""
+        text = getattr(self.editor, "_textbox", self.editor)
+        try:
+            return text.tk.getboolean(text.tk.call(text._w, "edit", "canundo"))
+        except (TclError, AttributeError):
+            return bool(self.editor.edit_modified())    # Tk without "edit canundo"
+    
+    def save_view(self):
+        """Remember cursor and scroll before hiding / Recuerda cursor y scroll"""
+        self.view = (self.editor.index("insert"), self.editor.yview()[0])
+    
+    def restore_view(self):
+        if self.view:
+            insert, top = self.view
+            self.editor.mark_set("insert", insert)
+            self.editor.yview_moveto(top)
+    
+    def measure(self):
+        """
+        Rough memory held by the document: Tk stores text as UTF-8 plus
+        per-line overhead, and the undo stack and the cached HTML come on top
+        Memoria aproximada del documento
+        """
+        if self.is_spilled():
+            self.size_estimate = len(self.snapshot)
+        else:
+            text = self.editor._textbox
+            counted = text.count("1.0", "end", "chars")
+            chars = counted[0] if counted else 0
+            lines = int(text.index("end").split(".")[0])
+            self.size_estimate = 2 * chars + 64 * lines + len(self.html or "")
+        return self.size_estimate
+    
+    def spill(self):
+        """
+        Replace the widget by a compressed snapshot (frees Tk memory and
+        the undo history). Returns the detached editor, to be destroyed.
+        """
+        self.save_view()
+        text = self.editor.get("1.0", "end-1c")
+        self.snapshot = zlib.compress(text.encode("utf-8"), 1)
+        self.modified = bool(self.editor.edit_modified())
+        editor, tracker = self.editor, self.edit_tracker
+        self.editor = self.edit_tracker = None
+        self.html = self.html_key = None
+        self.measure()
+        tracker.close()
+        return editor
+    
+    def hydrate(self, editor, edit_tracker):
+        """
+        Fill a fresh editor from the snapshot and bind it again
+        Rellena un editor nuevo desde el snapshot y lo vuelve a enlazar
+        """
+        text = zlib.decompress(self.snapshot).decode("utf-8")
+        editor.insert("1.0", text)
+        editor.edit_reset()
+        editor.edit_modified(self.modified)
+        self.snapshot = None
+        self.editor, self.edit_tracker = editor, edit_tracker
+        self.file_mgr.rebind(editor, edit_tracker)
+
+
+class DocumentSet:
+    """
+    Ordered open documents with LRU spilling beyond a memory budget
+    Documentos abiertos, ordenados, con descarga LRU por presupuesto de memoria
+    
+    Budget checks use each inactive document's size measured when it was
+    deactivated, so enforcing the budget never walks large buffers. The
+    KEEP_WARM most recently used inactive documents are never spilled:
+    switching back to them only swaps widgets.
+    """
+    
+    KEEP_WARM = 1
+    
+    def __init__(self, budget_mb=64):
+        self.budget = budget_mb * 1024 * 1024
+        self.documents = []
+        self.active = None
+        self._clock = 0
+        # Counters / Contadores
+        self.switches = 0
+        self.cache_hits = 0     # Tab shown with its cached preview
+        self.spills = 0
+        self.hydrations = 0
+    
+    def __iter__(self):
+        return iter(list(self.documents))
+    
+    def __len__(self):
+        return len(self.documents)
+    
+    def add(self, doc, after=None):
+        index = self.documents.index(after) + 1 if after in self.documents else len(self.documents)
+        self.documents.insert(index, doc)
+    
+    def remove(self, doc):
+        """Remove doc; returns the neighbour to activate (or None)"""
+        index = self.documents.index(doc)
+        self.documents.remove(doc)
+        if self.active is doc:
+            self.active = None
+        if not self.documents:
+            return None
+        return self.documents[min(index, len(self.documents) - 1)]
+    
+    def touch(self, doc):
+        """Mark doc as the active, most recently used document"""
+        self._clock += 1
+        doc.last_used = self._clock
+        if self.active is not doc:
+            self.switches += 1
+        self.active = doc
+    
+    def find(self, normalized_path):
+        """Document whose file is normalized_path (os.path.normcase/abspath)"""
+        for doc in self.documents:
+            path = doc.file_mgr.get_filepath() if doc.file_mgr else None
+            if path and os.path.normcase(os.path.abspath(path)) == normalized_path:
+                return doc
+        return None
+    
+    def neighbour(self, doc, step):
+        """Document step places after doc, wrapping / Documento a step posiciones"""
+        index = self.documents.index(doc)
+        return self.documents[(index + step) % len(self.documents)]
+    
+    def spill_candidates(self):
+        """
+        Inactive documents to spill, least recently used first, until the
+        total estimate fits the budget
+        """
+        inactive = sorted((d for d in self.documents if d is not self.active),
+                          key=lambda d: d.last_used)
+        warm = inactive[len(inactive) - self.KEEP_WARM:] if self.KEEP_WARM else []
+        total = sum(d.size_estimate for d in self.documents if d is not self.active)
+        if self.active is not None:
+            total += self.active.size_estimate
+        candidates = []
+        for doc in inactive:
+            if total <= self.budget:
+                break
+            if doc in warm or not doc.can_spill():
+                continue
+            candidates.append(doc)
+            total -= doc.size_estimate
+        return candidates
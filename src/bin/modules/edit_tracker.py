@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Edit generation counter for the editor Text widget
+Contador de generación de ediciones para el widget Text del editor
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+
+class EditTracker:
+    """
+    Counts real content changes of a Tk Text widget
+    Cuenta los cambios reales de contenido de un widget Text de Tk
+    
+    The widget command is wrapped by a Tcl proc that forwards everything to
+    the original command and, only after a successful insert, delete, replace
+    or undo/redo, bumps the generation and notifies listeners. Cursor moves,
+    selections and scrolling never change the generation.
+    El comando del widget se envuelve con un proc Tcl; solo las ediciones
+    incrementan la generación.
+    
+    Edits of a normal-state widget are also described as operations with
+    indices resolved to line.col before they run, so they can be replayed
+    on another Text: ("i", index, text), ("d", first, last) or
+    ("r", first, last, text). Tk's undo/redo goes through the same command,
+    so it is captured as plain operations too. A multi-range delete is
+    reported as ("x",): it cannot be described, only snapshotted.
+    """
+    
+    _PROXY = """proc %(widget)s {cmd args} {
+    set op {}
+    if {$cmd in {insert delete replace} && [%(orig)s cget -state] eq "normal"} {
+        if {$cmd eq "insert"} {
+            set text ""
+            foreach {chars tags} [lrange $args 1 end] {append text $chars}
+            set op [list i [%(orig)s index [lindex $args 0]] $text]
+        } elseif {$cmd eq "replace"} {
+            set text ""
+            foreach {chars tags} [lrange $args 2 end] {append text $chars}
+            set op [list r [%(orig)s index [lindex $args 0]] [%(orig)s index [lindex $args 1]] $text]
+        } elseif {[llength $args] == 1} {
+            set first [%(orig)s index [lindex $args 0]]
+            set op [list d $first [%(orig)s index "$first +1c"]]
+        } elseif {[llength $args] == 2} {
+            set op [list d [%(orig)s index [lindex $args 0]] [%(orig)s index [lindex $args 1]]]
+        } else {
+            set op x
+        }
+    }
+    set result [uplevel 1 [list %(orig)s $cmd {*}$args]]
+    if {$cmd in {insert delete replace} ||
+        ($cmd eq "edit" && [lindex $args 0] in {undo redo})} {
+        %(callback)s $cmd $op
+    }
+    return $result
+}"""
+    
+    def __init__(self, text_widget):
+        """
+        Args:
+            text_widget: tk.Text to track (CTkTextbox._textbox)
+        """
+        self.widget = text_widget
+        self.generation = 0
+        self._listeners = []
+        self._op_listeners = []
+        
+        widget = str(text_widget)
+        orig = f"{widget}_orig"
+        callback = text_widget.register(self._on_change)
+        self._callback = callback
+        text_widget.tk.call("rename", widget, orig)
+        text_widget.tk.eval(self._PROXY % {"widget": widget, "orig": orig, "callback": callback})
+    
+    def add_listener(self, callback):
+        """
+        Register callback(generation) called after each edit
+        Registra callback(generación) llamado tras cada edición
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def add_op_listener(self, callback):
+        """
+        Register callback(op) called with each captured edit operation
+        Registra callback(op) llamado con cada operación de edición capturada
+        """
+        if callback not in self._op_listeners:
+            self._op_listeners.append(callback)
+    
+    def close(self):
+        """
+        Remove the proxy before the widget is destroyed
+        Quita el proxy antes de destruir el widget
+        """
+        if self._callback is None:
+            return
+        widget = str(self.widget)
+        self.widget.tk.call("rename", widget, "")
+        self.widget.tk.call("rename", f"{widget}_orig", widget)
+        self.widget.deletecommand(self._callback)
+        self._callback = None
+        self._listeners.clear()
+        self._op_listeners.clear()
+    
+    def _on_change(self, cmd, op=""):
+        if op and self._op_listeners:
+            op = self.widget.tk.splitlist(op)
+            for callback in self._op_listeners:
+                try:
+                    callback(op)
+                except Exception as e:
+                    print(f"Error edit op listener: {e}")
+        self.generation += 1
+        for callback in self._listeners:
+            try:
+                callback(self.generation)
+            except Exception as e:
+                print(f"Error edit listener: {e}")
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Chunked background loading of big files
+Carga por bloques en segundo plano de archivos grandes
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import time
+import queue
+import hashlib
+import threading
+
+from .text_encoding import StreamDecoder
+
+
+class ChunkedLoader:
+    """
+    Streams a text file into a Tk Text widget without blocking the UI
+    Vuelca un archivo de texto en un widget Text de Tk sin bloquear la interfaz
+    
+    A reader thread decodes the file incrementally (encoding detected on the
+    first block, newlines turned into "\n") in CHUNK_BYTES blocks; the
+    detected format is in text_format once the load is done. The Tk thread
+    inserts the decoded text in after() slices of at most SLICE_MS, keeping the widget
+    read-only and without undo history until the load finishes. The SHA-1
+    of the inserted text is computed on the way, so the caller does not
+    need a second copy of the content.
+    Un hilo lee y decodifica por bloques; el hilo Tk inserta por tramos.
+    """
+    
+    CHUNK_BYTES = 256 * 1024
+    INSERT_CHARS = 64 * 1024
+    SLICE_MS = 15
+    POLL_MS = 10
+    QUEUE_CHUNKS = 16       # Read-ahead limit / Límite de lectura anticipada
+    
+    def __init__(self, text_widget, filepath, on_progress=None, on_done=None, on_error=None):
+        """
+        Args:
+            text_widget: tk.Text to fill (already empty) / tk.Text a rellenar (vacío)
+            filepath: File to load / Archivo a cargar
+            on_progress: Callback(percent) on the Tk thread
+            on_done: Callback(sha1_digest) when every chunk is inserted
+            on_error: Callback(exception) if reading or decoding fails
+        """
+        self.widget = text_widget
+        self.filepath = filepath
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.total_bytes = os.path.getsize(filepath)
+        self.inserted_bytes = 0
+        self.text_format = None
+        
+        self._queue = queue.Queue(maxsize=self.QUEUE_CHUNKS)
+        self._cancel = threading.Event()
+        self._digest = hashlib.sha1()
+        self._pending = ""
+        self._state = (text_widget.cget("state"), text_widget.cget("undo"))
+        
+        text_widget.configure(state="disabled", undo=False)
+        self._thread = threading.Thread(target=self._read, name="file-loader", daemon=True)
+        self._thread.start()
+        self._job = text_widget.after(self.POLL_MS, self._pump)
+    
+    def cancel(self):
+        """Stop loading; the widget keeps what was inserted / Detiene la carga"""
+        self._cancel.set()
+        if self._job:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._restore()
+    
+    # =========================================================================
+    # READER THREAD / HILO LECTOR
+    # =========================================================================
+    
+    def _read(self):
+        decoder = StreamDecoder()
+        try:
+            with open(self.filepath, 'rb') as f:
+                while not self._cancel.is_set():
+                    chunk = f.read(self.CHUNK_BYTES)
+                    text = decoder.decode(chunk, final=not chunk)
+                    if text:
+                        self._put(("text", text))
+                    if not chunk:
+                        break
+            self.text_format = decoder.format
+            self._put(("done", None))
+        except Exception as e:
+            self._put(("error", e))
+    
+    def _put(self, item):
+        """Blocking put that gives up when cancelled"""
+        while not self._cancel.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+    
+    # =========================================================================
+    # TK THREAD / HILO TK
+    # =========================================================================
+    
+    def _pump(self):
+        """Insert decoded text for one time slice / Inserta texto durante un tramo"""
+        self._job = None
+        deadline = time.perf_counter() + self.SLICE_MS / 1000
+        
+        self.widget.configure(state="normal")
+        try:
+            while time.perf_counter() < deadline:
+                if not self._pending:
+                    try:
+                        kind, value = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == "done":
+                        self._restore()
+                        if self.on_done:
+                            self.on_done(self._digest.digest())
+                        return
+                    if kind == "error":
+                        self._restore()
+                        if self.on_error:
+                            self.on_error(value)
+                        return
+                    self._pending = value
+                
+                piece = self._pending[:self.INSERT_CHARS]
+                self._pending = self._pending[self.INSERT_CHARS:]
+                data = piece.encode("utf-8")
+                self._digest.update(data)
+                self.inserted_bytes += len(data)
+                self.widget.insert("end-1c", piece)
+        finally:
+            if self._state is not None:
+                self.widget.configure(state="disabled")
+        
+        if self.on_progress and self.total_bytes:
+            self.on_progress(min(100, self.inserted_bytes * 100 // self.total_bytes))
+        delay = 1 if self._pending or not self._queue.empty() else self.POLL_MS
+        self._job = self.widget.after(delay, self._pump)
+    
+    def _restore(self):
+        """Give the widget back its state and a clean undo stack"""
+        if self._state is None:
+            return
+        state, undo = self._state
+        self._state = None
+        self.widget.configure(state=state, undo=undo)
+        self.widget.edit_reset()
@@ -12,9 +12,15 @@ Licensed under MIT License
 """
 
 import os
+import hashlib
+from collections import deque
 from tkinter import filedialog, messagebox
 from .i18n import t
-from .config import add_recent_file
+from .file_loader import ChunkedLoader
+from .text_encoding import DEFAULT_FORMAT, read_text
+from .save_worker import SaveWorker
+from .file_watcher import FileWatcher, signature_of
+from .large_file import MappedLoader, LargeFileView
 
 
 class FileManager:
@@ -30,38 +36,125 @@ class FileManager:
     ]
     VALID_EXTENSIONS = ('.md', '.txt', '.markdown')
     DEFAULT_NAME = "noname.md"
+    STREAM_THRESHOLD = 2 * 1024 * 1024     # Bigger files load in chunks
+    LARGE_FILE_THRESHOLD = 64 * 1024 * 1024  # Bigger files open read-only, mapped
     
-    def __init__(self, editor_widget, on_file_change=None, on_status=None):
+    def __init__(self, editor_widget, on_file_change=None, on_status=None,
+                 edit_tracker=None, on_view_change=None, on_saved=None,
+                 on_recent_change=None, on_external_change=None, saver=None, watcher=None):
         """
         Initialize file manager
         
         Args:
             editor_widget: Text widget to manage
             on_file_change: Callback(filepath, content) on file change
+                            (content is None after a streamed load)
             on_status: Callback(message) for status updates
+            edit_tracker: EditTracker of the widget, to cache exact checks
+            on_view_change: Callback() when a large file shows another window
+            on_saved: Callback(filepath, ok) when a background save finishes
+            on_recent_change: Callback() after the recent files list is written
+            on_external_change: Callback(filepath, deleted) when another
+                                program changes or deletes the open file
+            saver: SaveWorker shared by several managers (one is created if None)
+            watcher: FileWatcher shared by several managers (one is created if
+                     None); a shared watcher's owner routes its changes to
+                     disk_changed()
         """
         self.editor = editor_widget
         self.on_file_change = on_file_change
         self.on_status = on_status
+        self.edit_tracker = edit_tracker
+        self.on_view_change = on_view_change
+        self.on_saved = on_saved
+        self.on_external_change = on_external_change
         self.current_file = None
-        self.last_saved = ""
+        self.text_format = DEFAULT_FORMAT      # Encoding and newlines on disk
+        self.saved_digest = self._digest("")
+        self._checked_generation = None
         self.last_directory = None
+        self.loader = None
+        self.large_view = None
+        self._owns_saver = saver is None
+        self._owns_watcher = watcher is None
+        self.saver = saver or SaveWorker(editor_widget, on_recent_change=on_recent_change)
+        self.watcher = watcher or FileWatcher(editor_widget, self.disk_changed)
+        self._watched = None
+        self._own_signatures = deque(maxlen=16)    # Of our recent saves / De nuestros guardados
+        self._deferred_change = None
+        # Reload in progress: (content, text_format, saved_digest, modified)
+        # to put back if it fails or is cancelled; () when that is not possible
+        self._reload_backup = None
     
     # =========================================================================
     # DIRTY FLAG
     # =========================================================================
     
-    def is_dirty(self):
-        """Are there unsaved changes?"""
-        return self.editor.get("1.0", "end-1c") != self.last_saved
+    def is_dirty(self, exact=False):
+        """
+        Are there unsaved changes?
+        
+        Reads the widget's modified flag (Tk clears it when undo returns to
+        the saved state). exact=True also compares a digest of the content,
+        to catch text edited back by hand; use it for prompts, not per key.
+        A file still loading, or a read-only large file, is not dirty.
+        """
+        if self.loader is not None or self.large_view is not None:
+            return False
+        if not self.editor.edit_modified():
+            return False
+        if not exact:
+            return True
+        
+        generation = self.edit_tracker.generation if self.edit_tracker else None
+        if generation is not None and generation == self._checked_generation:
+            return True
+        if self._digest(self.editor.get("1.0", "end-1c")) == self.saved_digest:
+            self.editor.edit_modified(False)
+            return False
+        self._checked_generation = generation
+        return True
+    
+    def mark_saved(self, content=None, digest=None):
+        """Mark current content (or the content with this digest) as saved"""
+        if digest is None:
+            if content is None:
+                content = self.editor.get("1.0", "end-1c")
+            digest = self._digest(content)
+        self.saved_digest = digest
+        self._checked_generation = None
+        self.editor.edit_modified(False)
     
-    def mark_saved(self, content=None):
-        """Mark current content as saved"""
-        self.last_saved = content if content else self.editor.get("1.0", "end-1c")
+    def restore(self, filepath, saved_digest, text_format=None):
+        """
+        Take over a recovered document already in the editor: its file,
+        the digest of that file on disk and its format. The modified flag
+        is kept.
+        Adopta un documento recuperado que ya está en el editor.
+        """
+        self.current_file = filepath
+        self.saved_digest = saved_digest
+        self.text_format = text_format or DEFAULT_FORMAT
+        self._checked_generation = None
+        if filepath:
+            self.last_directory = os.path.dirname(filepath)
+        self._watch(filepath)
+    
+    def rebind(self, editor_widget, edit_tracker=None):
+        """
+        Manage another widget holding the same document (tab rehydrated)
+        Gestiona otro widget con el mismo documento (pestaña rehidratada)
+        """
+        self.editor = editor_widget
+        self.edit_tracker = edit_tracker
+        self._checked_generation = None
+    
+    def _digest(self, content):
+        return hashlib.sha1(content.encode("utf-8")).digest()
     
     def check_unsaved(self):
         """Ask before losing changes. Returns True to continue."""
-        if not self.is_dirty():
+        if not self.is_dirty(exact=True):
             return True
         
         result = messagebox.askyesnocancel(
@@ -72,8 +165,8 @@ class FileManager:
         if result is None:  # Cancel
             return False
         if result:  # Yes - save first
-            self.save()
-            return not self.is_dirty()
+            self.save(wait=True)
+            return not self.is_dirty(exact=True)
         return True  # No - discard changes
     
     # =========================================================================
@@ -84,11 +177,14 @@ class FileManager:
         """New file - sets name to noname.md"""
         if not self.check_unsaved():
             return False
+        self._stop_loader()
         
         self.editor.delete("1.0", "end")
         self.editor.insert("1.0", default_content)
         self.current_file = None
-        self.last_saved = default_content
+        self.text_format = DEFAULT_FORMAT
+        self.mark_saved(default_content)
+        self._watch(None)
         
         if self.on_file_change:
             self.on_file_change(None, default_content)
@@ -101,6 +197,13 @@ class FileManager:
         if not self.check_unsaved():
             return False
         
+        path = self.choose_file()
+        if path:
+            return self.load(path)
+        return False
+    
+    def choose_file(self):
+        """Ask for a file to open (path or None) / Pide un archivo a abrir"""
         initial_dir = self.last_directory
         if not initial_dir and self.current_file:
             initial_dir = os.path.dirname(self.current_file)
@@ -109,42 +212,192 @@ class FileManager:
             filetypes=self.FILETYPES,
             initialdir=initial_dir
         )
-        if path:
-            return self.load(path)
-        return False
+        return path or None
     
-    def load(self, filepath):
-        """Load a specific file"""
+    def load(self, filepath, on_loaded=None):
+        """
+        Load a specific file
+        
+        Files above STREAM_THRESHOLD load in the background: this returns
+        at once and on_loaded() runs when the content is in the editor.
+        Files above LARGE_FILE_THRESHOLD open in the read-only mapped view.
+        The encoding (BOM, UTF-8, or a sampled guess) and newline style are
+        detected and kept in text_format, so saving writes them back.
+        """
+        reload = filepath == self.current_file
+        was_mapped = self.large_view is not None
+        self._stop_loader()
+        self._reload_backup = None
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            size = os.path.getsize(filepath)
+            if size > self.STREAM_THRESHOLD and reload:
+                self._reload_backup = () if was_mapped else (
+                    self.editor.get("1.0", "end-1c"), self.text_format,
+                    self.saved_digest, self.editor.edit_modified())
+            if size > self.LARGE_FILE_THRESHOLD:
+                return self._load_mapped(filepath, on_loaded)
+            if size > self.STREAM_THRESHOLD:
+                return self._load_streamed(filepath, on_loaded)
+            
+            content, text_format = read_text(filepath)
             
             self.editor.delete("1.0", "end")
             self.editor.insert("1.0", content)
-            self.current_file = filepath
-            self.last_saved = content
-            self.last_directory = os.path.dirname(filepath)
-            
-            if self.on_file_change:
-                self.on_file_change(filepath, content)
-            if self.on_status:
-                self.on_status(f"{t('status.opened')}: {os.path.basename(filepath)}")
-            
-            # Add to recent files / Añadir a recientes
-            add_recent_file(filepath)
-            return True
         except Exception as e:
             messagebox.showerror(t("dialog.error"), f"{t('dialog.error_open')}:\n{e}")
             return False
+        
+        self._loaded(filepath, content, text_format=text_format)
+        if on_loaded:
+            on_loaded()
+        return True
+    
+    def _load_streamed(self, filepath, on_loaded):
+        """Start a chunked load / Inicia una carga por bloques"""
+        name = os.path.basename(filepath)
+        
+        def progress(percent):
+            if self.on_status:
+                self.on_status(t("status.loading", filename=name, percent=percent))
+        
+        def done(digest):
+            text_format = self.loader.text_format
+            self.loader = None
+            self._loaded(filepath, digest=digest, text_format=text_format)
+            if on_loaded:
+                on_loaded()
+        
+        def failed(error):
+            self.loader = None
+            self._abort_load()
+            messagebox.showerror(t("dialog.error"), f"{t('dialog.error_open')}:\n{error}")
+        
+        self.editor.delete("1.0", "end")
+        self.loader = ChunkedLoader(getattr(self.editor, "_textbox", self.editor), filepath,
+                                    on_progress=progress, on_done=done, on_error=failed)
+        progress(0)
+        return True
+    
+    def _load_mapped(self, filepath, on_loaded):
+        """Map and index a huge file, then show it read-only"""
+        name = os.path.basename(filepath)
+        
+        def progress(percent):
+            if self.on_status:
+                self.on_status(t("status.indexing", filename=name, percent=percent))
+        
+        def done(document):
+            self.loader = None
+            self.large_view = LargeFileView(self.editor, document, on_window_change=self.on_view_change)
+            self._loaded(filepath, digest=b"", text_format=document.text_format)
+            if on_loaded:
+                on_loaded()
+        
+        def failed(error):
+            self.loader = None
+            self._abort_load()
+            messagebox.showerror(t("dialog.error"), f"{t('dialog.error_open')}:\n{error}")
+        
+        self.editor.delete("1.0", "end")
+        self.loader = MappedLoader(self.editor, filepath, on_progress=progress,
+                                   on_done=done, on_error=failed)
+        progress(0)
+        return True
+    
+    def _loaded(self, filepath, content=None, digest=None, text_format=None):
+        """Common end of a load / Final común de una carga"""
+        self._reload_backup = None
+        self.current_file = filepath
+        self.text_format = text_format or DEFAULT_FORMAT
+        self.mark_saved(content, digest)
+        self.last_directory = os.path.dirname(filepath)
+        self._watch(filepath)
+        
+        if self.on_file_change:
+            self.on_file_change(filepath, content)
+        if self.on_status:
+            self.on_status(f"{t('status.opened')}: {os.path.basename(filepath)}")
+        
+        # Add to recent files / Añadir a recientes
+        self.saver.add_recent(filepath)
+    
+    def is_loading(self):
+        """Is a file still streaming into the editor? / ¿Se está cargando un archivo?"""
+        return self.loader is not None
+    
+    def is_read_only(self):
+        """Is a huge file shown in the mapped view? / ¿Se muestra un archivo enorme?"""
+        return self.large_view is not None
+    
+    def cancel_load(self):
+        """
+        Cancel a streamed load: an open leaves an empty document, a reload
+        the previous content / Cancela la carga
+        """
+        if self.loader is None or self._reload_backup == ():
+            return  # A huge read-only file being reloaded has nothing to go back to
+        self._stop_loader()
+        self._abort_load()
+        if self.on_status:
+            self.on_status(t("status.load_cancelled"))
+    
+    def _stop_loader(self):
+        """Stop any load and leave the mapped view / Detiene cargas y sale del visor"""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+        if self.large_view is not None:
+            self.large_view.close()
+            self.large_view = None
     
-    def save(self):
-        """Save (or save as if no file)"""
+    def _abort_load(self):
+        """
+        After a failed or cancelled load: the previous content of a
+        reloaded file, or an empty, unnamed document
+        Tras una carga fallida o cancelada
+        """
+        backup, self._reload_backup = self._reload_backup, None
+        if not backup:
+            self._reset_document()
+            return
+        content, text_format, saved_digest, modified = backup
+        self.editor.delete("1.0", "end")
+        self.editor.insert("1.0", content)
+        self.editor.edit_reset()
+        self.text_format = text_format
+        self.saved_digest = saved_digest
+        self._checked_generation = None
+        self.editor.edit_modified(modified)
+        if self.on_file_change:
+            self.on_file_change(self.current_file, content)
+    
+    def _reset_document(self):
+        """Empty, unnamed document (after a failed or cancelled open)"""
+        self.editor.delete("1.0", "end")
+        self.current_file = None
+        self.text_format = DEFAULT_FORMAT
+        self.mark_saved("")
+        self._watch(None)
+        if self.on_file_change:
+            self.on_file_change(None, "")
+    
+    def save(self, wait=False):
+        """
+        Save (or save as if no file)
+        
+        The write runs in the background; wait=True blocks until it is on
+        disk (used before discarding the document).
+        """
+        if self.loader is not None or self.large_view is not None:
+            return False    # Never save a partial file / Nunca guardar un archivo parcial
         if self.current_file:
-            return self._do_save(self.current_file)
-        return self.save_as()
+            return self._do_save(self.current_file, wait)
+        return self.save_as(wait)
     
-    def save_as(self):
+    def save_as(self, wait=False):
         """Save as, suggesting current filename or noname.md"""
+        if self.loader is not None or self.large_view is not None:
+            return False
         initial_dir = self.last_directory
         if not initial_dir and self.current_file:
             initial_dir = os.path.dirname(self.current_file)
@@ -160,31 +413,130 @@ class FileManager:
             initialfile=initial_file
         )
         if path:
-            return self._do_save(path)
+            return self._do_save(path, wait)
         return False
     
-    def _do_save(self, filepath):
-        """Execute save operation"""
+    def _do_save(self, filepath, wait=False):
+        """
+        Execute save operation
+        
+        The content is snapshotted and marked as saved at once; the atomic
+        write happens on the I/O worker. If it fails, the previous file name
+        and saved state come back, so the document shows as unsaved again.
+        The file keeps its encoding and newlines; text the encoding cannot
+        hold is saved as UTF-8 instead.
+        """
+        content = self.editor.get("1.0", "end-1c")
         try:
-            content = self.editor.get("1.0", "end-1c")
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            self.current_file = filepath
-            self.last_saved = content
-            self.last_directory = os.path.dirname(filepath)
-            
-            if self.on_file_change:
-                self.on_file_change(filepath, content)
+            data = self.text_format.encode(content)
+        except UnicodeEncodeError:
+            old_encoding = self.text_format.label()
+            self.text_format = self.text_format.with_encoding("utf-8")
+            data = self.text_format.encode(content)
+            messagebox.showwarning(t("dialog.error"), t("dialog.encoding_changed",
+                                   filename=os.path.basename(filepath), encoding=old_encoding))
+        # The saved digest is of the text, whatever the bytes on disk
+        digest = hashlib.sha1(data).digest() if self.text_format.is_plain() else self._digest(content)
+        previous = (self.current_file, self.saved_digest)
+        
+        self.current_file = filepath
+        self.mark_saved(digest=digest)
+        self.last_directory = os.path.dirname(filepath)
+        digest = self.saved_digest
+        
+        if self.on_file_change:
+            self.on_file_change(filepath, content)
+        if self.on_status:
+            self.on_status(t("status.saving", filename=os.path.basename(filepath)))
+        
+        def done(error, seconds, stat):
+            self._save_done(filepath, digest, previous, error, stat)
+        
+        self.saver.save(filepath, data, on_done=done)
+        self.saver.add_recent(filepath)
+        if wait:
+            self.saver.flush()
+        return True
+    
+    def _save_done(self, filepath, digest, previous, error, stat):
+        """Background save finished (Tk thread) / Guardado terminado (hilo Tk)"""
+        name = os.path.basename(filepath)
+        if error is None:
+            if self.current_file == filepath:
+                signature = signature_of(stat)
+                self._own_signatures.append(signature)
+                self._watch(filepath, signature)
             if self.on_status:
-                self.on_status(f"{t('status.saved')}: {os.path.basename(filepath)}")
-            
-            # Add to recent files / Añadir a recientes
-            add_recent_file(filepath)
-            return True
-        except Exception as e:
-            messagebox.showerror(t("dialog.error"), f"{t('dialog.error_save')}:\n{e}")
-            return False
+                self.on_status(f"{t('status.saved')}: {name}")
+        else:
+            # Still showing the content of that save: it is unsaved again
+            if self.current_file == filepath and self.saved_digest == digest:
+                self.current_file, self.saved_digest = previous
+                self._checked_generation = None
+                self.editor.edit_modified(True)
+                if self.current_file != filepath and self.on_file_change:
+                    self.on_file_change(self.current_file, None)
+            messagebox.showerror(t("dialog.error"), f"{t('dialog.error_save')}:\n{error}")
+        
+        if self.on_saved:
+            self.on_saved(filepath, error is None)
+        if self._deferred_change is not None and self.saver.is_idle():
+            path, signature = self._deferred_change
+            self._deferred_change = None
+            self.disk_changed(path, signature)
+    
+    # =========================================================================
+    # EXTERNAL CHANGES / CAMBIOS EXTERNOS
+    # =========================================================================
+    
+    def _watch(self, filepath, signature=None):
+        """Watch the open file only / Vigila solo el archivo abierto"""
+        if filepath != self._watched:
+            if self._watched:
+                self.watcher.unwatch(self._watched)
+            self._own_signatures.clear()
+            self._deferred_change = None
+        self._watched = filepath
+        if filepath:
+            self.watcher.watch(filepath, signature)
+    
+    def disk_changed(self, filepath, signature):
+        """
+        The watcher saw the open file change (Tk thread)
+        
+        Our own saves also change the file: while a save is in flight the
+        change is kept until it ends, then compared with the signatures our
+        recent saves reported (events of earlier saves may arrive late).
+        """
+        if filepath != self._watched or filepath != self.current_file:
+            return
+        if not self.saver.is_idle():
+            self._deferred_change = (filepath, signature)
+            return
+        if signature is not None and signature in self._own_signatures:
+            return
+        if signature is None:
+            # Gone from disk: saving again is the only way to keep it
+            self.saved_digest = b""
+            self._checked_generation = None
+            self.editor.edit_modified(True)
+        if self.on_external_change:
+            self.on_external_change(filepath, signature is None)
+    
+    def shutdown(self):
+        """
+        Finish pending writes and stop watching; workers this manager
+        created are stopped, shared ones keep running for the others
+        Termina escrituras y deja de vigilar; detiene solo sus propios hilos
+        """
+        self._stop_loader()
+        if self._owns_saver:
+            self.saver.stop()
+        else:
+            self.saver.flush()
+        self._watch(None)
+        if self._owns_watcher:
+            self.watcher.stop()
     
     # =========================================================================
     # UTILITIES
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Detection of external changes to open files
+Detección de cambios externos en los archivos abiertos
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import queue
+import select
+import struct
+import threading
+import time
+
+
+def file_signature(path):
+    """
+    (mtime_ns, size, inode) of a file, or None if it does not exist
+    (mtime_ns, tamaño, inodo) de un archivo, o None si no existe
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def signature_of(stat_result):
+    """Signature from an os.stat_result / Firma a partir de un os.stat_result"""
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class _Inotify:
+    """
+    Minimal inotify binding with ctypes (Linux only)
+    Enlace mínimo a inotify con ctypes (solo Linux)
+    
+    Directories are watched, not files: tools that save by writing a temp
+    file and renaming it replace the inode, which a file watch would lose.
+    """
+    
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+            | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    _EVENT = struct.Struct("iIII")
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._ctypes = ctypes
+        self._dirs = {}         # wd -> directory
+    
+    def add(self, folder):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), "inotify_add_watch", folder)
+        self._dirs[wd] = folder
+        return wd
+    
+    def remove(self, wd):
+        self._dirs.pop(wd, None)
+        self._libc.inotify_rm_watch(self.fd, wd)
+    
+    def read(self):
+        """Paths named by the pending events / Rutas de los eventos pendientes"""
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                folder = self._dirs.get(wd)
+                if folder is not None:
+                    paths.add(os.path.join(folder, os.fsdecode(name)) if name else folder)
+    
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Watches files on a background thread and reports changes on the Tk thread
+    Vigila archivos en un hilo y notifica los cambios en el hilo de Tk
+    
+    With inotify (Linux) the thread sleeps until the folder of a watched
+    file changes; elsewhere it compares the (mtime, size, inode) signature
+    of every watched file each STAT_INTERVAL seconds (with inotify too,
+    each SAFETY_INTERVAL, for network shares). Either way, every
+    stat() happens on the watcher thread. A change is reported once per
+    new signature as on_change(path, signature), signature None meaning
+    the file is gone. The Tk side only drains a queue every POLL_MS, and
+    only while something is watched.
+    Todos los stat() se hacen en el hilo del vigilante; el hilo Tk solo
+    vacía una cola.
+    """
+    
+    POLL_MS = 250
+    STAT_INTERVAL = 2.0
+    SAFETY_INTERVAL = 10.0  # inotify misses remote writes on network shares
+    SETTLE_SECONDS = 0.1    # Let a writer finish before stat() / Deja terminar al escritor
+    
+    def __init__(self, root, on_change, use_inotify=True):
+        """
+        Args:
+            root: Tk widget used for after() polling / Widget Tk para after()
+            on_change: Callback(path, signature) on the Tk thread
+            use_inotify: Try inotify before falling back to stat polling
+        """
+        self.root = root
+        self.on_change = on_change
+        self.events = queue.Queue()
+        self.backend = "poll"
+        
+        self._lock = threading.Lock()
+        self._requests = []     # ("watch", path, signature) / ("unwatch", path)
+        self._watched = {}      # normcased path -> [path, signature]  (thread only)
+        self._dir_watches = {}  # folder -> [wd, count]  (thread only)
+        self._tk_watched = set()    # normcased paths  (Tk thread only)
+        self._poll_job = None
+        self._stopped = False
+        
+        self._inotify = None
+        if use_inotify and hasattr(os, "O_CLOEXEC"):
+            try:
+                self._inotify = _Inotify()
+                self._wake_r, self._wake_w = os.pipe()
+                self._safety_due = time.monotonic() + self.SAFETY_INTERVAL
+                self.backend = "inotify"
+            except (OSError, AttributeError):
+                self._inotify = None
+        self._wake_event = threading.Event()
+        
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+    
+    def watch(self, path, signature=None):
+        """
+        Watch path (Tk thread). signature is what the caller knows is on
+        disk (e.g. after its own save); None takes it from disk.
+        Vigila path; signature es lo que se sabe que hay en disco.
+        """
+        self._request(("watch", path, signature))
+        self._tk_watched.add(os.path.normcase(os.path.abspath(path)))
+        if self._poll_job is None and not self._stopped:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+    
+    def unwatch(self, path):
+        """Stop watching path (Tk thread) / Deja de vigilar path"""
+        self._request(("unwatch", path))
+        self._tk_watched.discard(os.path.normcase(os.path.abspath(path)))
+    
+    def stop(self):
+        """Stop the thread / Detiene el hilo"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake()
+        self._thread.join(1.0)
+        if self._inotify is not None and not self._thread.is_alive():
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+        if self._poll_job:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+    
+    def _request(self, request):
+        if self._stopped:
+            return
+        with self._lock:
+            self._requests.append(request)
+        self._wake()
+    
+    def _wake(self):
+        if self._inotify is not None:
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass
+        else:
+            self._wake_event.set()
+    
+    # =========================================================================
+    # WATCHER THREAD / HILO VIGILANTE
+    # =========================================================================
+    
+    def _run(self):
+        try:
+            while not self._stopped:
+                self._apply_requests()
+                if self._inotify is not None:
+                    changed = self._wait_inotify()
+                else:
+                    self._wake_event.wait(self.STAT_INTERVAL)
+                    self._wake_event.clear()
+                    changed = None      # Poll every watched file
+                if not self._stopped:
+                    self._check(changed)
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+    
+    def _wait_inotify(self):
+        """
+        Block until a watched folder changes; returns the changed paths,
+        or None every SAFETY_INTERVAL to stat every watched file
+        """
+        fd = self._inotify.fd
+        timeout = self._safety_due - time.monotonic()
+        if timeout <= 0:
+            self._safety_due = time.monotonic() + self.SAFETY_INTERVAL
+            return None
+        ready, _, _ = select.select([fd, self._wake_r], [], [], timeout)
+        if not ready:
+            self._safety_due = time.monotonic() + self.SAFETY_INTERVAL
+            return None
+        if self._wake_r in ready:
+            os.read(self._wake_r, 4096)
+        if fd not in ready:
+            return set()
+        self._stopped_wait(self.SETTLE_SECONDS)
+        return {os.path.normcase(p) for p in self._inotify.read()}
+    
+    def _stopped_wait(self, seconds):
+        select.select([self._wake_r], [], [], seconds)
+    
+    def _apply_requests(self):
+        with self._lock:
+            requests, self._requests = self._requests, []
+        for request in requests:
+            key = os.path.normcase(os.path.abspath(request[1]))
+            if request[0] == "watch":
+                signature = request[2] if request[2] is not None else file_signature(key)
+                if key not in self._watched:
+                    self._add_dir(os.path.dirname(key))
+                self._watched[key] = [request[1], signature]
+            elif key in self._watched:
+                del self._watched[key]
+                self._remove_dir(os.path.dirname(key))
+    
+    def _add_dir(self, folder):
+        if self._inotify is None:
+            return
+        entry = self._dir_watches.get(folder)
+        if entry is not None:
+            entry[1] += 1
+            return
+        try:
+            self._dir_watches[folder] = [self._inotify.add(folder), 1]
+        except OSError as e:
+            print(f"Error file watcher: {e}")
+    
+    def _remove_dir(self, folder):
+        entry = self._dir_watches.get(folder)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._dir_watches[folder]
+            self._inotify.remove(entry[0])
+    
+    def _check(self, changed):
+        """Compare signatures; changed=None checks every watched file"""
+        for key, entry in self._watched.items():
+            if changed is not None and key not in changed and os.path.dirname(key) not in changed:
+                continue
+            signature = file_signature(key)
+            if signature != entry[1]:
+                entry[1] = signature
+                self.events.put((entry[0], signature))
+    
+    # =========================================================================
+    # TK THREAD / HILO TK
+    # =========================================================================
+    
+    def _poll(self):
+        self._poll_job = None
+        if self._stopped:
+            return
+        while True:
+            try:
+                path, signature = self.events.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.on_change(path, signature)
+            except Exception as e:
+                print(f"Error file change: {e}")
+        # Idle with nothing watched: watch() starts polling again
+        if self._tk_watched or not self.events.empty():
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
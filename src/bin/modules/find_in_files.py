@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Find in Files window
+Ventana de buscar en archivos
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import re
+import queue
+import customtkinter as ctk
+from tkinter import filedialog, messagebox
+
+from .i18n import t
+from .config import UI_FONT_FAMILY, UI_FONT_SIZE
+from .find_replace import compile_search, literal_text
+from .workspace_search import FolderSearch, FolderReplace
+
+
+class FindInFilesWindow(ctk.CTkToplevel):
+    """
+    Searches every Markdown file of a folder and lists the hits
+    Busca en todos los archivos Markdown de una carpeta y lista los resultados
+    """
+    
+    POLL_MS = 50
+    MAX_EVENTS_PER_POLL = 200
+    
+    def __init__(self, parent, folder, dirty_files, on_open, on_files_changed=None):
+        """
+        Args:
+            parent: Main window / Ventana principal
+            folder: Initial folder / Carpeta inicial
+            dirty_files: Callable returning the open files with unsaved edits
+            on_open: Callback(path, line, col, length) to open a hit
+            on_files_changed: Callback(paths) after Replace in Files
+        """
+        super().__init__(parent)
+        self.title(t("find_in_files.title"))
+        self.geometry("760x520")
+        self.transient(parent)
+        
+        self.dirty_files = dirty_files
+        self.on_open = on_open
+        self.on_files_changed = on_files_changed
+        self.ui_font = (UI_FONT_FAMILY, UI_FONT_SIZE)
+        
+        self.case_sensitive = ctk.BooleanVar(value=False)
+        self.use_regex = ctk.BooleanVar(value=False)
+        self.whole_word = ctk.BooleanVar(value=False)
+        
+        self.search = None
+        self.replace = None
+        self._hits = []             # Results text line -> (path, line, col, length)
+        self._changed_files = []
+        self._poll_job = None
+        
+        self._create_ui(folder or os.getcwd())
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _create_ui(self, folder):
+        """Create UI elements"""
+        font = self.ui_font
+        
+        # Folder row
+        folder_row = ctk.CTkFrame(self, fg_color="transparent")
+        folder_row.pack(fill="x", padx=10, pady=(10, 5))
+        self.folder_entry = ctk.CTkEntry(folder_row, height=28, font=font)
+        self.folder_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.folder_entry.insert(0, folder)
+        ctk.CTkButton(folder_row, text=t("find_in_files.folder"), width=90, height=28,
+                      font=font, command=self._choose_folder).pack(side="left")
+        
+        # Find row
+        find_row = ctk.CTkFrame(self, fg_color="transparent")
+        find_row.pack(fill="x", padx=10, pady=5)
+        self.find_entry = ctk.CTkEntry(find_row, height=28, font=font,
+                                       placeholder_text=t("find.placeholder"))
+        self.find_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.find_entry.bind("<Return>", lambda e: self._start_search())
+        for key, var in (("find.case_sensitive", self.case_sensitive),
+                         ("find.regex", self.use_regex),
+                         ("find.whole_word", self.whole_word)):
+            ctk.CTkCheckBox(find_row, text=t(key), variable=var, width=50, font=font,
+                            checkbox_width=18, checkbox_height=18).pack(side="left", padx=2)
+        self.search_btn = ctk.CTkButton(find_row, text=t("find_in_files.search"), width=90,
+                                        height=28, font=font, command=self._start_search)
+        self.search_btn.pack(side="left", padx=(5, 0))
+        
+        # Replace row
+        replace_row = ctk.CTkFrame(self, fg_color="transparent")
+        replace_row.pack(fill="x", padx=10, pady=5)
+        self.replace_entry = ctk.CTkEntry(replace_row, height=28, font=font,
+                                          placeholder_text=t("find.replace_placeholder"))
+        self.replace_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.replace_btn = ctk.CTkButton(replace_row, text=t("find_in_files.replace_all"),
+                                         width=150, height=28, font=font,
+                                         command=self._start_replace)
+        self.replace_btn.pack(side="left")
+        
+        # Results (one line per hit, click to open)
+        self.results = ctk.CTkTextbox(self, wrap="none", font=("Consolas", UI_FONT_SIZE - 1))
+        self.results.pack(fill="both", expand=True, padx=10, pady=5)
+        self.results.configure(state="disabled")
+        self.results._textbox.tag_configure("file", foreground="#3B82F6")
+        self.results.bind("<ButtonRelease-1>", self._on_result_click)
+        
+        self.status_label = ctk.CTkLabel(self, text="", anchor="w", font=font)
+        self.status_label.pack(fill="x", padx=10, pady=(0, 10))
+    
+    def _choose_folder(self):
+        folder = filedialog.askdirectory(parent=self, initialdir=self.folder_entry.get())
+        if folder:
+            self.folder_entry.delete(0, "end")
+            self.folder_entry.insert(0, folder)
+    
+    # =========================================================================
+    # SEARCH / BÚSQUEDA
+    # =========================================================================
+    
+    def _compile(self):
+        """Compiled pattern of the query, or None (error shown)"""
+        query = self.find_entry.get()
+        if not query:
+            return None
+        try:
+            return compile_search(query, self.use_regex.get(), self.whole_word.get(),
+                                  self.case_sensitive.get())
+        except re.error:
+            self.status_label.configure(text=t("find.invalid_pattern"))
+            return None
+    
+    def _start_search(self):
+        """Search the folder, streaming results / Busca en la carpeta"""
+        if self._busy():
+            return
+        folder = self.folder_entry.get()
+        pattern = self._compile()
+        if pattern is None:
+            return
+        if not os.path.isdir(folder):
+            self.status_label.configure(text=f"{t('dialog.file_not_found')}: {folder}")
+            return
+        
+        literal = None
+        if not self.use_regex.get():
+            literal = literal_text(self.find_entry.get())
+        
+        self._clear_results()
+        self.search = FolderSearch(folder, pattern, literal, regex=self.use_regex.get())
+        self.search.start()
+        self.status_label.configure(text=t("find_in_files.searching", done=0, total="…"))
+        self._schedule_poll()
+    
+    def _start_replace(self):
+        """Replace in every matched file / Reemplaza en todos los archivos"""
+        if self._busy() or self.search is None or not self.search.matched:
+            return
+        
+        stats = self.search.stats
+        if not messagebox.askyesno(
+            t("find_in_files.title"),
+            t("find_in_files.confirm_replace", matches=stats["matches"], files=stats["matched_files"]),
+            parent=self
+        ):
+            return
+        
+        # Open files are only rewritten on disk when they have no unsaved edits
+        skip = list(self.dirty_files())
+        for path in skip:
+            self._append_line(t("find_in_files.skipped_dirty", filename=os.path.basename(path)))
+        
+        self._changed_files = []
+        self.replace = FolderReplace(self.search, self.search.substitution(self.replace_entry.get()))
+        self.replace.start(skip)
+        self._schedule_poll()
+    
+    def _busy(self):
+        return ((self.search is not None and self.search.is_running())
+                or (self.replace is not None and self.replace.is_running()))
+    
+    # =========================================================================
+    # EVENTS / EVENTOS
+    # =========================================================================
+    
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.after(self.POLL_MS, self._poll)
+    
+    def _poll(self):
+        """Drain worker events on the Tk thread / Procesa eventos en el hilo Tk"""
+        self._poll_job = None
+        pending = False
+        for job in (self.search, self.replace):
+            if job is None:
+                continue
+            for _ in range(self.MAX_EVENTS_PER_POLL):
+                try:
+                    event = job.events.get_nowait()
+                except queue.Empty:
+                    break
+                self._handle_event(job, event)
+            pending |= not job.events.empty()
+        
+        if self._busy() or pending:
+            self._schedule_poll()
+    
+    def _handle_event(self, job, event):
+        """Apply one worker event / Aplica un evento del trabajador"""
+        kind = event[0]
+        
+        if kind == "hits":
+            _, path, hits, count = event
+            self._add_hits(path, hits, count)
+        elif kind == "progress":
+            key = "searching" if job is self.search else "replacing"
+            self.status_label.configure(text=t(f"find_in_files.{key}", done=event[1], total=event[2]))
+        elif kind == "replaced":
+            self._changed_files.append(event[1])
+        elif kind == "conflict":
+            self._append_line(t("find_in_files.conflict", filename=event[1]))
+        elif kind == "error":
+            self._append_line(f"{t('dialog.error')}: {event[1]}: {event[2]}")
+        elif kind == "done":
+            stats = event[1]
+            if job is self.search:
+                self.status_label.configure(text=t(
+                    "find_in_files.summary", matches=stats["matches"],
+                    files=stats["matched_files"], scanned=stats["scanned"],
+                    skipped=stats["skipped"], ms=round(stats["seconds"] * 1000)))
+            else:
+                self.status_label.configure(text=t(
+                    "find_in_files.replaced", count=stats["replacements"],
+                    files=stats["files"], ms=round(stats["seconds"] * 1000)))
+                if self.on_files_changed and self._changed_files:
+                    self.on_files_changed(list(self._changed_files))
+    
+    # =========================================================================
+    # RESULTS / RESULTADOS
+    # =========================================================================
+    
+    def _clear_results(self):
+        self._hits = []
+        self.results.configure(state="normal")
+        self.results.delete("1.0", "end")
+        self.results.configure(state="disabled")
+    
+    def _add_hits(self, path, hits, count):
+        """Append the hits of one file / Añade los resultados de un archivo"""
+        folder = self.search.folder
+        lines = [os.path.relpath(path, folder)]
+        self._hits.append(None)
+        for line, col, length, line_text in hits:
+            lines.append(f"  {line:>5}: {line_text.strip()[:200]}")
+            self._hits.append((path, line, col, length))
+        if count > len(hits):
+            lines.append("  " + t("find_in_files.more_hits", count=count - len(hits)))
+            self._hits.append(None)
+        
+        first = len(self._hits) - len(lines) + 1
+        self.results.configure(state="normal")
+        self.results.insert("end", "\n".join(lines) + "\n")
+        self.results._textbox.tag_add("file", f"{first}.0", f"{first}.end")
+        self.results.configure(state="disabled")
+    
+    def _append_line(self, text):
+        self._hits.append(None)
+        self.results.configure(state="normal")
+        self.results.insert("end", text + "\n")
+        self.results.configure(state="disabled")
+    
+    def _on_result_click(self, event):
+        index = self.results._textbox.index(f"@{event.x},{event.y}")
+        row = int(index.split(".")[0]) - 1
+        if 0 <= row < len(self._hits) and self._hits[row]:
+            self.on_open(*self._hits[row])
+    
+    def _on_close(self):
+        if self.search is not None:
+            self.search.cancel()
+        if self._poll_job:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.destroy()
@@ -11,33 +11,125 @@ Copyright (c) 2025 Fernando Ruiz Casas
 Licensed under MIT License
 """
 
+import re
+import time
+from bisect import bisect_right
+from functools import lru_cache
 import customtkinter as ctk
 from .i18n import t
 from .config import UI_FONT_FAMILY, UI_FONT_SIZE
 
 
+@lru_cache(maxsize=32)
+def _compile(source, flags):
+    return re.compile(source, flags)
+
+
+def literal_text(query, multiline=False):
+    """
+    Text searched for a literal query (multi-line mode reads \\n and \\t)
+    Texto buscado para una consulta literal (multilínea interpreta \\n y \\t)
+    """
+    if multiline:
+        query = query.replace("\\n", "\n").replace("\\t", "\t")
+    return query
+
+
+def compile_search(query, regex=False, whole_word=False, case_sensitive=False, multiline=False):
+    """
+    Compile a find query into a cached pattern
+    Compila una consulta de búsqueda en un patrón (con caché)
+    
+    Args:
+        query: Text typed in the find box / Texto de la caja de búsqueda
+        regex: Query is a regular expression / La consulta es una regex
+        whole_word: Only match whole words / Solo palabras completas
+        case_sensitive: Match case / Distinguir mayúsculas
+        multiline: "." matches newlines and literal queries accept \\n
+                   "." incluye saltos de línea y las literales aceptan \\n
+    
+    Returns:
+        re.Pattern (^ and $ always match at line boundaries)
+    
+    Raises:
+        re.error: Invalid regular expression / Expresión regular no válida
+    """
+    source = query if regex else re.escape(literal_text(query, multiline))
+    if whole_word:
+        source = rf"\b(?:{source})\b"
+    
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    if multiline:
+        flags |= re.DOTALL
+    return _compile(source, flags)
+
+
+class LineIndex:
+    """
+    Line-start offsets of a text, to map offsets to Tk "line.col" indices
+    Offsets de inicio de línea, para convertir offsets a índices "línea.col"
+    """
+    
+    def __init__(self, content):
+        self.content = content
+        self.line_starts = [0]
+        pos = content.find("\n")
+        while pos != -1:
+            self.line_starts.append(pos + 1)
+            pos = content.find("\n", pos + 1)
+    
+    def index(self, offset):
+        """Offset to Tk index / Offset a índice Tk"""
+        line = bisect_right(self.line_starts, offset)
+        return f"{line}.{offset - self.line_starts[line - 1]}"
+
+
 class FindReplaceBar(ctk.CTkFrame):
     """
     Find and Replace bar that appears above the editor
     Barra de buscar/reemplazar que aparece sobre el editor
     """
     
-    def __init__(self, parent, editor_widget, on_close=None):
+    SEARCH_DEBOUNCE_MS = 150    # Wait after typing in the find box
+    SLICE_MS = 12               # Tk time spent per search slice
+    BATCH = 200                 # Matches between slice deadline checks
+    
+    def __init__(self, parent, editor_widget, on_close=None, edit_tracker=None, on_status=None):
         """
         Initialize find bar
         
         Args:
             parent: Parent widget
-            editor_widget: CTkTextbox to search in
+            editor_widget: CTkTextbox to search in (see attach())
             on_close: Callback when bar is closed
+            edit_tracker: EditTracker of the editor, to reuse the line index
+                          between searches until the buffer is edited
+            on_status: Callback for status messages (e.g. Replace All count)
         """
         super().__init__(parent, fg_color=("gray85", "gray20"), corner_radius=0)
         
         self.editor = editor_widget
         self.on_close_callback = on_close
+        self.on_status = on_status
+        self.edit_tracker = edit_tracker
+        self._line_index = None
+        self._index_generation = None
+        
+        # Incremental search state / Estado de búsqueda incremental
+        self._match_spans = []
+        self._search_key = None
+        self._pattern_error = None
+        self._search_job = None
+        self._search_after = None
+        self._debounce_job = None
         self.matches = []
         self.current_match = -1
         self.case_sensitive = ctk.BooleanVar(value=False)
+        self.use_regex = ctk.BooleanVar(value=False)
+        self.whole_word = ctk.BooleanVar(value=False)
+        self.multiline = ctk.BooleanVar(value=False)
         self.show_replace = False
         
         # Tag for highlighting / Tag para resaltado
@@ -46,6 +138,8 @@ class FindReplaceBar(ctk.CTkFrame):
         
         self._create_ui()
         self._setup_bindings()
+        self._label_color = self.counter_label.cget("text_color")
+        self._entry_border = self.find_entry.cget("border_color")
     
     def _create_ui(self):
         """Create UI elements"""
@@ -83,14 +177,15 @@ class FindReplaceBar(ctk.CTkFrame):
         )
         self.next_btn.pack(side="left", padx=1)
         
-        # Case sensitive toggle
-        self.case_btn = ctk.CTkButton(
-            self.main_row, text=t("find.case_sensitive"), width=32, height=28,
-            font=font, fg_color="transparent",
-            hover_color=("gray75", "gray35"),
-            command=self._toggle_case
-        )
-        self.case_btn.pack(side="left", padx=(10, 5))
+        # Search mode toggles: case, regex, whole word, multi-line
+        self.case_btn = self._create_toggle("find.case_sensitive", self.case_sensitive, font)
+        self.case_btn.pack(side="left", padx=(10, 1))
+        self.regex_btn = self._create_toggle("find.regex", self.use_regex, font)
+        self.regex_btn.pack(side="left", padx=1)
+        self.word_btn = self._create_toggle("find.whole_word", self.whole_word, font)
+        self.word_btn.pack(side="left", padx=1)
+        self.multiline_btn = self._create_toggle("find.multiline", self.multiline, font)
+        self.multiline_btn.pack(side="left", padx=(1, 5))
         
         # Close button
         self.close_btn = ctk.CTkButton(
@@ -123,6 +218,16 @@ class FindReplaceBar(ctk.CTkFrame):
         )
         self.replace_all_btn.pack(side="left", padx=2)
     
+    def _create_toggle(self, text_key, variable, font):
+        """Create a search mode toggle button"""
+        button = ctk.CTkButton(
+            self.main_row, text=t(text_key), width=32, height=28,
+            font=font, fg_color="transparent",
+            hover_color=("gray75", "gray35")
+        )
+        button.configure(command=lambda: self._toggle_option(variable, button))
+        return button
+    
     def _setup_bindings(self):
         """Setup keyboard bindings"""
         self.find_entry.bind("<Return>", lambda e: self._find_next())
@@ -155,12 +260,33 @@ class FindReplaceBar(ctk.CTkFrame):
                 self.find_entry.delete(0, "end")
                 self.find_entry.insert(0, sel)
                 self.find_entry.select_range(0, "end")
-                self._do_search()
+                self._start_search()
         except:
             pass
     
+    def attach(self, editor_widget, edit_tracker=None):
+        """
+        Search in another editor (tab switch); a visible bar searches again
+        Busca en otro editor (cambio de pestaña); si la barra está visible, rebusca
+        """
+        visible = self.is_visible()
+        self._cancel_search()
+        self._clear_highlights()
+        self.editor = editor_widget
+        self.edit_tracker = edit_tracker
+        self._line_index = None
+        self._index_generation = None
+        self._match_spans = []
+        self._search_key = None
+        self.matches = []
+        self.current_match = -1
+        if visible:
+            self.pack(fill="x", before=self.editor)
+            self._start_search()
+    
     def hide(self):
         """Hide the find bar and clear highlights"""
+        self._cancel_search()
         self._clear_highlights()
         self.pack_forget()
         self.editor.focus_set()
@@ -172,71 +298,202 @@ class FindReplaceBar(ctk.CTkFrame):
         """Check if bar is visible"""
         return self.winfo_ismapped()
     
-    def _toggle_case(self):
-        """Toggle case sensitive search"""
-        self.case_sensitive.set(not self.case_sensitive.get())
+    def _toggle_option(self, variable, button):
+        """Toggle a search mode (case, regex, whole word, multi-line)"""
+        variable.set(not variable.get())
         
         # Update button appearance
-        if self.case_sensitive.get():
-            self.case_btn.configure(fg_color=("gray70", "gray40"))
+        if variable.get():
+            button.configure(fg_color=("gray70", "gray40"))
         else:
-            self.case_btn.configure(fg_color="transparent")
+            button.configure(fg_color="transparent")
         
-        self._do_search()
+        self._start_search()
     
     def _on_search_change(self):
-        """Called when search text changes"""
-        self._do_search()
+        """Called when search text changes (debounced)"""
+        if self._debounce_job:
+            self.after_cancel(self._debounce_job)
+        self._debounce_job = self.after(self.SEARCH_DEBOUNCE_MS, self._start_search)
+    
+    # =========================================================================
+    # INCREMENTAL SEARCH / BÚSQUEDA INCREMENTAL
+    # =========================================================================
+    
+    def _start_search(self):
+        """Search in time slices, cancelling any running search"""
+        self._cancel_search()
+        self._search_job = self._search_steps()
+        self._run_search_slice()
+    
+    def _run_search_slice(self):
+        """Advance the running search for one time slice"""
+        self._search_after = None
+        job = self._search_job
+        if job is None:
+            return
+        
+        deadline = time.perf_counter() + self.SLICE_MS / 1000
+        for _ in job:
+            if time.perf_counter() >= deadline:
+                self._update_counter()
+                self._search_after = self.after(1, self._run_search_slice)
+                return
+        
+        self._search_job = None
+        self._update_counter()
+    
+    def _cancel_search(self):
+        """Stop pending and running searches"""
+        if self._debounce_job:
+            self.after_cancel(self._debounce_job)
+            self._debounce_job = None
+        if self._search_after:
+            self.after_cancel(self._search_after)
+            self._search_after = None
+        self._search_job = None
     
     def _do_search(self):
-        """Execute search and highlight matches"""
+        """Execute search and highlight matches (synchronously)"""
+        self._cancel_search()
+        for _ in self._search_steps():
+            pass
+        self._update_counter()
+    
+    def _search_steps(self):
+        """
+        Search generator: highlights matches in the viewport first, then
+        finds and highlights the rest in batches, yielding between them.
+        A literal query that extends the previous one only re-checks the
+        previous matches.
+        """
+        prev_key, prev_spans = self._search_key, self._match_spans
         self._clear_highlights()
         self.matches = []
+        self._match_spans = []
+        self._search_key = None
+        self._pattern_error = None
         self.current_match = -1
         
         query = self.find_entry.get()
         if not query:
-            self._update_counter()
             return
         
-        # Get editor content
-        content = self.editor.get("1.0", "end-1c")
+        try:
+            pattern = self._compile_query(query)
+        except re.error as e:
+            self._pattern_error = str(e)
+            return
+        
+        # Get editor content and its line index
+        line_index = self._get_line_index()
+        content = line_index.content
         
-        # Search
-        if not self.case_sensitive.get():
-            search_content = content.lower()
-            search_query = query.lower()
-        else:
-            search_content = content
-            search_query = query
-        
-        # Find all matches
-        start = 0
-        while True:
-            pos = search_content.find(search_query, start)
-            if pos == -1:
+        options = self._search_options()
+        literal = not (self.use_regex.get() or self.whole_word.get())
+        needle = literal_text(query, self.multiline.get())
+        key = (options, self._index_generation, needle)
+        textbox = self.editor._textbox
+        self._configure_tags()
+        
+        # Viewport first / Primero la zona visible
+        vis_start, vis_end = self._visible_range(line_index)
+        visible = set()
+        for match in pattern.finditer(content, vis_start):
+            if match.start() >= vis_end:
                 break
-            
-            # Convert to line.char format
-            line = content[:pos].count("\n") + 1
-            col = pos - content[:pos].rfind("\n") - 1
-            start_idx = f"{line}.{col}"
-            end_idx = f"{line}.{col + len(query)}"
-            
+            if match.end() > match.start():
+                visible.add(match.span())
+                textbox.tag_add(self.highlight_tag, line_index.index(match.start()), line_index.index(match.end()))
+        yield
+        
+        # Whole buffer / Todo el buffer
+        if (literal and prev_key and prev_key[:2] == key[:2] and key[1] is not None
+                and needle.startswith(prev_key[2])):
+            spans = self._narrow(pattern, content, prev_spans)
+        else:
+            spans = (m.span() for m in pattern.finditer(content) if m.end() > m.start())
+        
+        for start, end in spans:
+            start_idx = line_index.index(start)
+            end_idx = line_index.index(end)
+            self._match_spans.append((start, end))
             self.matches.append((start_idx, end_idx))
-            start = pos + 1
+            if (start, end) in visible:
+                visible.discard((start, end))
+            else:
+                textbox.tag_add(self.highlight_tag, start_idx, end_idx)
+            
+            if len(self.matches) % self.BATCH == 0:
+                self._select_first_match()
+                yield
         
-        # Highlight all matches
-        self._configure_tags()
-        for start_idx, end_idx in self.matches:
-            self.editor._textbox.tag_add(self.highlight_tag, start_idx, end_idx)
+        # Viewport matches the full scan did not confirm
+        for start, end in visible:
+            textbox.tag_remove(self.highlight_tag, line_index.index(start), line_index.index(end))
         
-        # Go to first match
-        if self.matches:
+        self._select_first_match()
+        self._search_key = key
+    
+    def _narrow(self, pattern, content, prev_spans):
+        """
+        Matches of an extended literal query: each one starts inside a
+        previous match, so only those positions are tried
+        """
+        last_end = 0
+        for start, end in prev_spans:
+            for pos in range(max(start, last_end), end):
+                match = pattern.match(content, pos)
+                if match:
+                    last_end = match.end()
+                    yield match.span()
+                    break
+    
+    def _search_options(self):
+        """Current mode flags / Flags de modo actuales"""
+        return (self.case_sensitive.get(), self.use_regex.get(),
+                self.whole_word.get(), self.multiline.get())
+    
+    def _compile_query(self, query):
+        """Compile the query with the current modes (raises re.error)"""
+        case_sensitive, regex, whole_word, multiline = self._search_options()
+        return compile_search(query, regex, whole_word, case_sensitive, multiline)
+    
+    def _expand(self, match, template):
+        """Replacement text for a match (regex mode expands \\1, \\g<name>)"""
+        if self.use_regex.get() and "\\" in template:
+            return match.expand(template)
+        return template
+    
+    def _visible_range(self, line_index):
+        """Buffer offsets [start, end) shown in the editor viewport"""
+        textbox = self.editor._textbox
+        try:
+            first = int(textbox.index("@0,0").split(".")[0])
+            last = int(textbox.index(f"@0,{textbox.winfo_height()}").split(".")[0])
+        except Exception:
+            return 0, 0
+        starts = line_index.line_starts
+        start = starts[min(first, len(starts)) - 1]
+        end = starts[last] if last < len(starts) else len(line_index.content)
+        return start, end
+    
+    def _select_first_match(self):
+        """Make the first match current once there is one"""
+        if self.matches and self.current_match < 0:
             self.current_match = 0
             self._highlight_current()
-        
-        self._update_counter()
+    
+    def _get_line_index(self):
+        """
+        Line index of the buffer, rebuilt only after edits
+        Índice de líneas del buffer, reconstruido solo tras ediciones
+        """
+        generation = self.edit_tracker.generation if self.edit_tracker else None
+        if self._line_index is None or generation is None or generation != self._index_generation:
+            self._line_index = LineIndex(self.editor.get("1.0", "end-1c"))
+            self._index_generation = generation
+        return self._line_index
     
     def _configure_tags(self):
         """Configure highlight tags"""
@@ -282,16 +539,26 @@ class FindReplaceBar(ctk.CTkFrame):
         self.editor._textbox.mark_set("insert", start_idx)
     
     def _update_counter(self):
-        """Update the counter label"""
+        """Update the counter label (with "…" while still searching)"""
+        if self._pattern_error:
+            self.counter_label.configure(text=t("find.invalid_pattern"), text_color="#E04040")
+            self.find_entry.configure(border_color="#E04040")
+            return
+        self.counter_label.configure(text_color=self._label_color)
+        self.find_entry.configure(border_color=self._entry_border)
+        
+        searching = "…" if self._search_job is not None else ""
         if not self.matches:
             query = self.find_entry.get()
-            if query:
+            if searching:
+                self.counter_label.configure(text=searching)
+            elif query:
                 self.counter_label.configure(text=t("find.no_results"))
             else:
                 self.counter_label.configure(text="")
         else:
             text = t("find.count", current=self.current_match + 1, total=len(self.matches))
-            self.counter_label.configure(text=text)
+            self.counter_label.configure(text=text + searching)
     
     def _find_next(self):
         """Go to next match"""
@@ -312,12 +579,22 @@ class FindReplaceBar(ctk.CTkFrame):
         self._update_counter()
     
     def _replace_current(self):
-        """Replace current match"""
+        """Replace current match (regex mode expands capture groups)"""
         if not self.matches or self.current_match < 0:
             return
         
         start_idx, end_idx = self.matches[self.current_match]
-        replacement = self.replace_entry.get()
+        start, end = self._match_spans[self.current_match]
+        try:
+            pattern = self._compile_query(self.find_entry.get())
+            match = pattern.match(self._get_line_index().content, start)
+            if not match or match.end() != end:
+                return
+            replacement = self._expand(match, self.replace_entry.get())
+        except (re.error, IndexError) as e:
+            self._pattern_error = str(e)
+            self._update_counter()
+            return
         
         # Delete and insert
         self.editor._textbox.delete(start_idx, end_idx)
@@ -326,34 +603,121 @@ class FindReplaceBar(ctk.CTkFrame):
         # Re-search
         self._do_search()
         
-        # Go to next match if any
-        if self.matches and self.current_match >= len(self.matches):
-            self.current_match = 0
+        # Go to the next match after the replaced text, if any
+        resume = start + len(replacement)
+        for i, (match_start, _) in enumerate(self._match_spans):
+            if match_start >= resume:
+                self.current_match = i
+                break
+        else:
+            self.current_match = 0 if self.matches else -1
         self._highlight_current()
         self._update_counter()
     
     def _replace_all(self):
-        """Replace all matches"""
+        """
+        Replace all matches as a single undo step, rewriting only the
+        changed text and keeping cursor and scroll position
+        (regex mode expands capture groups)
+        """
         if not self.matches:
             return
         
-        query = self.find_entry.get()
-        replacement = self.replace_entry.get()
+        started = time.perf_counter()
+        line_index = self._get_line_index()
+        try:
+            pattern = self._compile_query(self.find_entry.get())
+            edits, count = self._replace_edits(pattern, line_index.content, self.replace_entry.get())
+        except (re.error, IndexError) as e:
+            self._pattern_error = str(e)
+            self._update_counter()
+            return
         
-        # Get content
-        content = self.editor.get("1.0", "end-1c")
+        if edits:
+            textbox = self.editor._textbox
+            cursor = self._shift_offset(self._offset_of(line_index, textbox.index("insert")), edits)
+            top = self._shift_offset(self._offset_of(line_index, textbox.index("@0,0")), edits)
+            
+            # One undo step: no automatic separators between the edits.
+            # Back to front, so earlier indices stay valid.
+            autoseparators = textbox.cget("autoseparators")
+            textbox.edit_separator()
+            textbox.configure(autoseparators=False)
+            try:
+                for start, end, text in reversed(edits):
+                    textbox.replace(line_index.index(start), line_index.index(end), text)
+            finally:
+                textbox.configure(autoseparators=autoseparators)
+                textbox.edit_separator()
+            
+            # Restore view / Restaura la vista
+            textbox.mark_set("insert", f"1.0 + {cursor} chars")
+            textbox.yview(f"1.0 + {top} chars")
         
-        # Replace
-        if self.case_sensitive.get():
-            new_content = content.replace(query, replacement)
-        else:
-            # Case insensitive replace
-            import re
-            new_content = re.sub(re.escape(query), replacement, content, flags=re.IGNORECASE)
+        # Re-search
+        self._start_search()
         
-        # Update editor
-        self.editor.delete("1.0", "end")
-        self.editor.insert("1.0", new_content)
+        if self.on_status:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.on_status(t("find.replaced", count=count, ms=round(elapsed)))
+    
+    def _replace_edits(self, pattern, content, replacement):
+        """
+        Changed spans for Replace All: [(start, end, new_text)] in buffer
+        order, merging matches on the same line into one edit
         
-        # Re-search
-        self._do_search()
+        Returns:
+            tuple: (edits, number of replaced matches)
+        """
+        edits = []
+        count = 0
+        group_start = group_end = None
+        parts = []
+        expand = self.use_regex.get() and "\\" in replacement
+        
+        for match in pattern.finditer(content):
+            start, end = match.span()
+            if start == end:
+                continue    # Empty matches are never highlighted
+            count += 1
+            new_text = match.expand(replacement) if expand else replacement
+            
+            if group_end is not None and "\n" in content[group_end:start]:
+                self._close_edit(edits, content, group_start, group_end, parts)
+                group_start = None
+            if group_start is None:
+                group_start, parts = start, []
+            else:
+                parts.append(content[group_end:start])
+            parts.append(new_text)
+            group_end = end
+        
+        if group_start is not None:
+            self._close_edit(edits, content, group_start, group_end, parts)
+        return edits, count
+    
+    def _close_edit(self, edits, content, start, end, parts):
+        """Append an edit unless it leaves the text unchanged"""
+        text = "".join(parts)
+        if text != content[start:end]:
+            edits.append((start, end, text))
+    
+    def _offset_of(self, line_index, index):
+        """Tk "line.col" index to buffer offset"""
+        line, col = map(int, index.split("."))
+        starts = line_index.line_starts
+        if line > len(starts):
+            return len(line_index.content)
+        return starts[line - 1] + col
+    
+    def _shift_offset(self, offset, edits):
+        """Offset after applying edits (inside an edit: its start)"""
+        shift = 0
+        for start, end, text in edits:
+            if end <= offset:
+                shift += len(text) - (end - start)
+            elif start < offset:
+                return start + shift
+            else:
+                break
+        return offset + shift
@@ -14,6 +14,11 @@ Licensed under MIT License
 import json
 import os
 import locale
+import string
+from collections import OrderedDict
+
+from .config import CACHE_DIR, config_store
+from .config_store import SECTION_LANGUAGE, atomic_write
 
 # =============================================================================
 # PATHS / RUTAS
@@ -22,14 +27,24 @@ import locale
 _MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 _SRC_DIR = os.path.dirname(os.path.dirname(_MODULE_DIR))
 LANG_DIR = os.path.join(_SRC_DIR, "lang")
-CONFIG_FILE = os.path.join(_SRC_DIR, "config.json")
+MANIFEST_FILE = os.path.join(CACHE_DIR, "languages.json")
+MANIFEST_VERSION = 1
 
 # =============================================================================
 # STATE / ESTADO
 # =============================================================================
 
+FALLBACK_LANG = "en"
+
 _current_lang = "en"
-_translations = {}
+_catalog = {}       # Current language, flat: {"menu.file": "File"}
+_fallback = {}      # FALLBACK_LANG, for keys the current language lacks
+_templates = {}     # Template text -> ((literal, field), ...) / Plantillas pre-analizadas
+_formatter = string.Formatter()
+CATALOG_CACHE_SIZE = 4
+_catalogs = OrderedDict()   # LRU of compiled catalogs / LRU de catálogos compilados
+# Counters for benchmarks / Contadores para benchmarks
+stats = {"files_parsed": 0, "catalog_hits": 0, "manifest_hits": 0}
 _available_languages = {}
 _change_callbacks = []  # Callbacks for hot-reload / Callbacks para recarga en caliente
 
@@ -43,31 +58,137 @@ def _load_language(lang_code):
     if os.path.exists(filepath):
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
+            stats["files_parsed"] += 1
+            return data
         except:
             pass
     return None
 
 
+def _compile_catalog(data):
+    """
+    Flatten a language file into {dotted_key: text} and pre-parse the
+    format templates it contains, so t() is a dict lookup
+    Aplana un archivo de idioma en {clave.con.puntos: texto}
+    """
+    catalog = {}
+    stack = [("", data or {})]
+    while stack:
+        prefix, node = stack.pop()
+        for key, value in node.items():
+            if isinstance(value, dict):
+                stack.append((prefix + key + ".", value))
+            elif isinstance(value, str):
+                catalog[prefix + key] = value
+                if ("{" in value or "}" in value) and value not in _templates:
+                    _templates[value] = _compile_template(value)
+    return catalog
+
+
+def _compile_template(text):
+    """
+    (literal, field name) pairs of a str.format template, or None when a
+    field uses a format spec, a conversion or an index (left to str.format)
+    """
+    pieces = []
+    try:
+        for literal, field, spec, conversion in _formatter.parse(text):
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                return None
+            pieces.append((literal, field))
+    except ValueError:
+        return None     # Unbalanced braces: str.format fails too
+    return tuple(pieces)
+
+
+def _get_catalog(lang_code):
+    """Compiled catalog of a language, from the LRU or from disk"""
+    catalog = _catalogs.get(lang_code)
+    if catalog is not None:
+        _catalogs.move_to_end(lang_code)
+        stats["catalog_hits"] += 1
+        return catalog
+    return _remember_catalog(lang_code, _compile_catalog(_load_language(lang_code)))
+
+
+def _remember_catalog(lang_code, catalog):
+    _catalogs[lang_code] = catalog
+    _catalogs.move_to_end(lang_code)
+    while len(_catalogs) > CATALOG_CACHE_SIZE:
+        _catalogs.popitem(last=False)
+    return catalog
+
+
+def _set_catalogs(lang_code):
+    global _catalog, _fallback
+    _catalog = _get_catalog(lang_code)
+    _fallback = {} if lang_code == FALLBACK_LANG else _get_catalog(FALLBACK_LANG)
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest.get("languages", {})
+    except (IOError, OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
 def _load_available_languages():
-    """Scan lang/ folder for available languages / Escanea carpeta lang/ buscando idiomas"""
+    """
+    Scan lang/ folder for available languages
+    Escanea carpeta lang/ buscando idiomas
+    
+    Each file's _meta comes from the manifest in the cache folder while
+    the file's mtime and size still match; only new or changed files are
+    parsed (and their catalog kept in the LRU), then the manifest is
+    rewritten.
+    """
     global _available_languages
     _available_languages = {}
     
     if not os.path.exists(LANG_DIR):
         return
     
-    for filename in os.listdir(LANG_DIR):
-        if filename.endswith('.json'):
-            lang_code = filename[:-5]  # Remove .json
-            data = _load_language(lang_code)
-            if data and "_meta" in data:
+    cached = _read_manifest()
+    manifest = {}
+    changed = False
+    with os.scandir(LANG_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.json') or not entry.is_file():
+                continue
+            lang_code = entry.name[:-5]  # Remove .json
+            st = entry.stat()
+            record = cached.get(lang_code)
+            if record and record.get("mtime_ns") == st.st_mtime_ns and record.get("size") == st.st_size:
+                stats["manifest_hits"] += 1
+            else:
+                data = _load_language(lang_code)
+                if not data:
+                    continue
+                record = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "meta": data.get("_meta")}
+                _remember_catalog(lang_code, _compile_catalog(data))
+                changed = True
+            manifest[lang_code] = record
+            meta = record.get("meta")
+            if meta:
                 _available_languages[lang_code] = {
                     "code": lang_code,
-                    "name_native": data["_meta"].get("name_native", lang_code),
-                    "name_english": data["_meta"].get("name_english", lang_code),
-                    "flag": data["_meta"].get("flag", "🏳️")
+                    "name_native": meta.get("name_native", lang_code),
+                    "name_english": meta.get("name_english", lang_code),
+                    "flag": meta.get("flag", "🏳️")
                 }
+    
+    if changed or manifest.keys() != cached.keys():
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            data = {"version": MANIFEST_VERSION, "languages": manifest}
+            atomic_write(MANIFEST_FILE, json.dumps(data, indent=1, ensure_ascii=False).encode("utf-8"))
+        except (IOError, OSError):
+            pass    # Read-only install: scan again next time
 
 
 def get_available_languages():
@@ -164,26 +285,6 @@ def _detect_system_language():
     return "en"
 
 
-def _load_config():
-    """Load config file / Carga archivo de configuración"""
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
-
-
-def _save_config(config):
-    """Save config file / Guarda archivo de configuración"""
-    try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-    except:
-        pass
-
-
 def init(default_lang=None):
     """
     Initialize i18n system
@@ -192,13 +293,12 @@ def init(default_lang=None):
     Args:
         default_lang: Force specific language, or None for auto-detect
     """
-    global _current_lang, _translations
+    global _current_lang
     
     _load_available_languages()
     
     # Priority: config > default_lang > system > english
-    config = _load_config()
-    lang = config.get("language")
+    lang = config_store.get(SECTION_LANGUAGE)
     
     if not lang or lang not in _available_languages:
         lang = default_lang
@@ -210,7 +310,7 @@ def init(default_lang=None):
         lang = "en"
     
     _current_lang = lang
-    _translations = _load_language(lang) or {}
+    _set_catalogs(lang)
 
 
 def get_current_language():
@@ -229,18 +329,16 @@ def set_language(lang_code):
     Returns:
         bool: True if changed successfully
     """
-    global _current_lang, _translations
+    global _current_lang
     
     if lang_code not in get_available_languages():
         return False
     
     _current_lang = lang_code
-    _translations = _load_language(lang_code) or {}
+    _set_catalogs(lang_code)
     
     # Save preference / Guardar preferencia
-    config = _load_config()
-    config["language"] = lang_code
-    _save_config(config)
+    config_store.set(SECTION_LANGUAGE, lang_code)
     
     # Notify callbacks / Notificar callbacks
     for callback in _change_callbacks:
@@ -279,6 +377,9 @@ def t(key, **kwargs):
     Get translated string by key
     Obtiene cadena traducida por clave
     
+    Looks up the current language, then English, then returns the key.
+    Busca en el idioma actual, luego en inglés, y si no devuelve la clave.
+    
     Args:
         key: Dot-notation key (e.g. "menu.file")
         **kwargs: Format arguments (e.g. filename="doc.md")
@@ -290,27 +391,34 @@ def t(key, **kwargs):
         t("menu.file") -> "Archivo"
         t("status.saved", filename="doc.md") -> "Guardado: doc.md"
     """
-    # Navigate nested dict with dot notation
-    parts = key.split(".")
-    value = _translations
-    
-    for part in parts:
-        if isinstance(value, dict) and part in value:
-            value = value[part]
-        else:
+    value = _catalog.get(key)
+    if value is None:
+        value = _fallback.get(key)
+        if value is None:
             return key  # Key not found, return as-is
     
-    if not isinstance(value, str):
-        return key
-    
     # Format with kwargs if provided
     if kwargs:
+        return _format(value, kwargs)
+    
+    return value
+
+
+def _format(value, kwargs):
+    """value.format(**kwargs) from the pre-parsed template; value on error"""
+    pieces = _templates.get(value)
+    if pieces is None:
+        if "{" not in value and "}" not in value:
+            return value
         try:
             return value.format(**kwargs)
         except:
             return value
-    
-    return value
+    try:
+        return "".join([literal + format(kwargs[field]) if field is not None else literal
+                        for literal, field in pieces])
+    except:
+        return value
 
 
 # Alias for convenience / Alias por conveniencia
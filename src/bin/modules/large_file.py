@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Memory-mapped read-only viewer for huge files
+Visor de solo lectura con mmap para archivos enormes
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import re
+import mmap
+import array
+import threading
+
+from .text_encoding import SAMPLE_BYTES, TextFormat, detect_encoding, detect_newline
+
+
+class MappedDocument:
+    """
+    A file mapped in memory with an index of line starts
+    Archivo mapeado en memoria con un índice de inicios de línea
+    
+    Only the line offsets are kept in Python (8 bytes per line); text is
+    decoded on demand for a range of lines, in the encoding detected once on
+    open (text_format). UTF-16/32 lines split on whole code units only.
+    Solo se guardan los offsets de línea; el texto se decodifica a demanda.
+    """
+    
+    INDEX_CHUNK = 4 * 1024 * 1024   # A multiple of every code unit size
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self.size = len(self._map)
+        
+        sample = self._map[:SAMPLE_BYTES]
+        encoding, bom = detect_encoding(sample, final=self.size <= SAMPLE_BYTES)
+        self.encoding = encoding
+        self._start = len(TextFormat(encoding, bom).encode(""))     # BOM length
+        self._newline = "\n".encode(encoding)
+        self._heading = "#".encode(encoding)
+        self._unit = len(self._newline)
+        head = sample[self._start:len(sample) - len(sample) % self._unit]
+        newline = detect_newline(head.decode(encoding, errors="replace"))
+        self.text_format = TextFormat(encoding, bom, newline)
+        
+        self.line_starts = array.array('q', [self._start])
+        self.line_count = 0
+    
+    def build_index(self, cancel=None, on_progress=None):
+        """
+        Find every line start (can run on a worker thread)
+        Busca todos los inicios de línea (puede ir en un hilo)
+        
+        Args:
+            cancel: threading.Event that stops the scan / Evento que detiene el escaneo
+            on_progress: Callback(bytes_scanned) per chunk / Callback por bloque
+        
+        Returns:
+            bool: False if cancelled
+        """
+        starts = array.array('q', [self._start])
+        pattern = re.compile(re.escape(self._newline))
+        unit = self._unit
+        offset = 0
+        # Plain reads, not the map: scanned pages do not stay in our RSS
+        with open(self.filepath, 'rb') as f:
+            while offset < self.size:
+                if cancel is not None and cancel.is_set():
+                    return False
+                chunk = f.read(min(self.INDEX_CHUNK, self.size - offset))
+                if not chunk:
+                    break
+                if unit == 1:
+                    starts.extend(m.end() + offset for m in pattern.finditer(chunk))
+                else:
+                    # Chunks start on a code unit: keep aligned matches only
+                    starts.extend(m.end() + offset for m in pattern.finditer(chunk)
+                                  if m.start() % unit == 0)
+                offset += len(chunk)
+                if on_progress:
+                    on_progress(offset)
+        self.line_starts = starts
+        self.line_count = len(starts)
+        return True
+    
+    def lines(self, first, last):
+        """
+        Text of lines [first, last), 0-based, without the final newline
+        Texto de las líneas [first, last), base 0, sin el salto final
+        """
+        start = self.line_starts[first]
+        end = self.line_starts[last] - self._unit if last < self.line_count else self.size
+        end -= (end - start) % self._unit   # Odd trailing byte / Byte suelto al final
+        text = self._map[start:max(start, end)].decode(self.encoding, errors="replace")
+        return text.replace("\r\n", "\n")
+    
+    def section_start(self, line, lookback):
+        """
+        Closest heading line at or above line (within lookback lines)
+        Línea de título más cercana en o sobre line (dentro de lookback)
+        """
+        heading = self._heading
+        for candidate in range(line, max(-1, line - lookback - 1), -1):
+            start = self.line_starts[candidate]
+            if self._map[start:start + len(heading)] == heading:
+                return candidate
+        return line
+    
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class MappedLoader:
+    """
+    Maps a file and indexes its lines on a worker thread
+    Mapea un archivo e indexa sus líneas en un hilo
+    
+    Same interface as ChunkedLoader, so FileManager can treat both alike:
+    on_progress(percent) and on_done(document) / on_error(exception) run
+    on the Tk thread.
+    """
+    
+    POLL_MS = 50
+    
+    def __init__(self, widget, filepath, on_progress=None, on_done=None, on_error=None):
+        self.widget = widget
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.document = MappedDocument(filepath)
+        self.scanned = 0
+        self._error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._index, name="file-index", daemon=True)
+        self._thread.start()
+        self._job = widget.after(self.POLL_MS, self._poll)
+    
+    def cancel(self):
+        self._cancel.set()
+        if self._job:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._thread.join()
+        self.document.close()
+    
+    def _index(self):
+        try:
+            self.document.build_index(self._cancel, self._set_scanned)
+        except Exception as e:
+            self._error = e
+    
+    def _set_scanned(self, count):
+        self.scanned = count
+    
+    def _poll(self):
+        self._job = None
+        if self._thread.is_alive():
+            if self.on_progress and self.document.size:
+                self.on_progress(self.scanned * 100 // self.document.size)
+            self._job = self.widget.after(self.POLL_MS, self._poll)
+        elif self._error is not None:
+            self.document.close()
+            if self.on_error:
+                self.on_error(self._error)
+        elif self.on_done:
+            self.on_done(self.document)
+
+
+class LargeFileView:
+    """
+    Shows a window of lines of a MappedDocument in a CTkTextbox
+    Muestra una ventana de líneas de un MappedDocument en un CTkTextbox
+    
+    The textbox holds at most WINDOW_LINES lines, read-only. Its scrollbar
+    is rewired to represent the whole document: dragging it or scrolling
+    near the edges of the window materializes a new window around the
+    target line, starting at a nearby heading so the preview (which
+    renders the textbox content) shows whole sections.
+    La barra de desplazamiento representa todo el documento.
+    """
+    
+    WINDOW_LINES = 3000
+    MARGIN_LINES = 300          # Re-window when the view gets this close to an edge
+    SECTION_LOOKBACK = 200      # Lines searched upwards for a heading
+    
+    def __init__(self, editor, document, on_window_change=None):
+        """
+        Args:
+            editor: CTkTextbox / CTkTextbox del editor
+            document: Indexed MappedDocument / MappedDocument indexado
+            on_window_change: Called after a new window is shown
+        """
+        self.editor = editor
+        self.text = editor._textbox
+        self.scrollbar = editor._y_scrollbar
+        self.document = document
+        self.on_window_change = on_window_change
+        self.first_line = 0
+        self.count = 0
+        self.windows_shown = 0
+        self._rewindow_job = None
+        self._state = (self.text.cget("state"), self.text.cget("undo"))
+        
+        self.text.configure(yscrollcommand=self._on_yscroll, undo=False)
+        self.scrollbar.configure(command=self._on_scrollbar)
+        self.show_line(0)
+    
+    def close(self):
+        """Restore the textbox and unmap the file / Restaura el textbox"""
+        if self._rewindow_job:
+            self.text.after_cancel(self._rewindow_job)
+            self._rewindow_job = None
+        state, undo = self._state
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.configure(state=state, undo=undo, yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.text.yview)
+        self.text.edit_reset()
+        self.document.close()
+    
+    def show_line(self, line):
+        """Materialize the window around a document line (0-based) and scroll to it"""
+        total = self.document.line_count
+        first = max(0, min(line - self.WINDOW_LINES // 3, total - self.WINDOW_LINES))
+        first = self.document.section_start(first, self.SECTION_LOOKBACK)
+        last = min(total, first + self.WINDOW_LINES)
+        
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", self.document.lines(first, last))
+        self.text.configure(state="disabled")
+        self.first_line, self.count = first, last - first
+        self.windows_shown += 1
+        
+        self.text.yview(f"{line - first + 1}.0")
+        if self.on_window_change:
+            self.on_window_change()
+    
+    def _on_yscroll(self, lo, hi):
+        """Map the window's scroll fractions to the whole document"""
+        lo, hi = float(lo), float(hi)
+        total = max(1, self.document.line_count)
+        top = self.first_line + lo * self.count
+        bottom = self.first_line + hi * self.count
+        self.scrollbar.set(top / total, bottom / total)
+        
+        near_top = self.first_line > 0 and lo * self.count < self.MARGIN_LINES
+        near_bottom = (self.first_line + self.count < total
+                       and (1 - hi) * self.count < self.MARGIN_LINES)
+        if (near_top or near_bottom) and self._rewindow_job is None:
+            self._rewindow_job = self.text.after_idle(self._rewindow, int(top))
+    
+    def _rewindow(self, top_line):
+        self._rewindow_job = None
+        self.show_line(top_line)
+    
+    def _on_scrollbar(self, *args):
+        """Scrollbar command over the whole document"""
+        if args and args[0] == "moveto":
+            line = int(float(args[1]) * self.document.line_count)
+            local = line - self.first_line
+            inside = self.MARGIN_LINES <= local <= self.count - self.MARGIN_LINES
+            if inside or (self.first_line == 0 and 0 <= local < self.count):
+                self.text.yview(f"{local + 1}.0")
+            else:
+                self.show_line(line)
+        else:
+            self.text.yview(*args)
@@ -33,68 +33,70 @@ def create_menu_bar(app):
     """
     menu_bar = Menu(app)
     app.configure(menu=menu_bar)
+    texts = app.texts
     
     # File menu
     fm = Menu(menu_bar, tearoff=0)
-    menu_bar.add_cascade(label=t("menu.file"), menu=fm)
-    fm.add_command(label=t("menu.new"), command=app._new, accelerator="Ctrl+N")
-    fm.add_command(label=t("menu.open"), command=app._open, accelerator="Ctrl+O")
+    texts.add(menu_bar, "cascade", "menu.file", menu=fm)
+    texts.add(fm, "command", "menu.new", command=app._new, accelerator="Ctrl+N")
+    texts.add(fm, "command", "menu.open", command=app._open, accelerator="Ctrl+O")
     
-    app.recent_menu = Menu(fm, tearoff=0)
-    fm.add_cascade(label=t("menu.recent_files"), menu=app.recent_menu)
+    app.recent_menu = Menu(fm, tearoff=0, postcommand=app._refresh_recent_menu)
+    texts.add(fm, "cascade", "menu.recent_files", menu=app.recent_menu)
     
-    fm.add_command(label=t("menu.save"), command=app._save, accelerator="Ctrl+S")
-    fm.add_command(label=t("menu.save_as"), command=app._save_as, accelerator="Ctrl+Shift+S")
+    texts.add(fm, "command", "menu.save", command=app._save, accelerator="Ctrl+S")
+    texts.add(fm, "command", "menu.save_as", command=app._save_as, accelerator="Ctrl+Shift+S")
+    texts.add(fm, "command", "menu.close_tab", command=app._close_document, accelerator="Ctrl+W")
     fm.add_separator()
-    fm.add_command(label=t("menu.export_pdf"), command=app._export_pdf)
-    fm.add_command(label=t("menu.copy_html"), command=app._copy_html)
+    texts.add(fm, "command", "menu.export_pdf", command=app._export_pdf)
+    texts.add(fm, "command", "menu.copy_html", command=app._copy_html)
     fm.add_separator()
-    fm.add_command(label=t("menu.exit"), command=app._on_close)
+    texts.add(fm, "command", "menu.exit", command=app._on_close)
     
     # Edit menu
     em = Menu(menu_bar, tearoff=0)
-    menu_bar.add_cascade(label=t("menu.edit"), menu=em)
-    em.add_command(label=t("menu.undo"), command=app._undo, accelerator="Ctrl+Z")
-    em.add_command(label=t("menu.redo"), command=app._redo, accelerator="Ctrl+Y")
+    texts.add(menu_bar, "cascade", "menu.edit", menu=em)
+    texts.add(em, "command", "menu.undo", command=app._undo, accelerator="Ctrl+Z")
+    texts.add(em, "command", "menu.redo", command=app._redo, accelerator="Ctrl+Y")
     em.add_separator()
-    em.add_command(label=t("menu.cut"), command=app._cut, accelerator="Ctrl+X")
-    em.add_command(label=t("menu.copy"), command=app._copy, accelerator="Ctrl+C")
-    em.add_command(label=t("menu.paste"), command=app._paste, accelerator="Ctrl+V")
+    texts.add(em, "command", "menu.cut", command=app._cut, accelerator="Ctrl+X")
+    texts.add(em, "command", "menu.copy", command=app._copy, accelerator="Ctrl+C")
+    texts.add(em, "command", "menu.paste", command=app._paste, accelerator="Ctrl+V")
     em.add_separator()
-    em.add_command(label=t("menu.find"), command=app._show_find, accelerator="Ctrl+F")
-    em.add_command(label=t("menu.replace"), command=app._show_replace, accelerator="Ctrl+H")
+    texts.add(em, "command", "menu.find", command=app._show_find, accelerator="Ctrl+F")
+    texts.add(em, "command", "menu.replace", command=app._show_replace, accelerator="Ctrl+H")
+    texts.add(em, "command", "menu.find_in_files", command=app._show_find_in_files, accelerator="Ctrl+Shift+F")
     
     # View menu
     vm = Menu(menu_bar, tearoff=0)
-    menu_bar.add_cascade(label=t("menu.view"), menu=vm)
-    vm.add_command(label=t("menu.zoom_in"), command=lambda: (app.zoom.editor_in(), app._update_editor_zoom_label()), accelerator="Ctrl++")
-    vm.add_command(label=t("menu.zoom_out"), command=lambda: (app.zoom.editor_out(), app._update_editor_zoom_label()), accelerator="Ctrl+-")
-    vm.add_command(label=t("menu.zoom_reset"), command=lambda: (app.zoom.editor_reset(), app._update_editor_zoom_label()), accelerator="Ctrl+0")
+    texts.add(menu_bar, "cascade", "menu.view", menu=vm)
+    texts.add(vm, "command", "menu.zoom_in", command=lambda: (app.zoom.editor_in(), app._update_editor_zoom_label()), accelerator="Ctrl++")
+    texts.add(vm, "command", "menu.zoom_out", command=lambda: (app.zoom.editor_out(), app._update_editor_zoom_label()), accelerator="Ctrl+-")
+    texts.add(vm, "command", "menu.zoom_reset", command=lambda: (app.zoom.editor_reset(), app._update_editor_zoom_label()), accelerator="Ctrl+0")
     vm.add_separator()
-    vm.add_checkbutton(label=t("menu.dark_mode"), variable=app.is_dark_mode, command=app._toggle_theme)
+    texts.add(vm, "checkbutton", "menu.dark_mode", variable=app.is_dark_mode, command=app._toggle_theme)
     vm.add_separator()
     
-    # Language submenu
+    # Language submenu (entries are "Native / English": nothing to translate)
     lang_menu = Menu(vm, tearoff=0)
-    current_flag = i18n.get_current_flag()
-    vm.add_cascade(label=f"{current_flag}  {t('menu.language')}", menu=lang_menu)
-    current_lang = i18n.get_current_language()
+    texts.add(vm, "cascade", lambda: f"{i18n.get_current_flag()}  {t('menu.language')}", menu=lang_menu)
+    app.language_var = ctk.StringVar(value=i18n.get_current_language())
     for code, flag, display in i18n.get_language_flag_list():
         lang_menu.add_radiobutton(
             label=f"{flag}  {display}",
             command=lambda c=code: i18n.set_language(c),
             value=code,
-            variable=ctk.StringVar(value=current_lang)
+            variable=app.language_var
         )
     
     # Styles menu
     app.styles_menu = Menu(menu_bar, tearoff=0)
-    menu_bar.add_cascade(label=t("menu.styles"), menu=app.styles_menu)
+    texts.add(menu_bar, "cascade", "menu.styles", menu=app.styles_menu)
     
     # Help menu
     hm = Menu(menu_bar, tearoff=0)
-    menu_bar.add_cascade(label=t("menu.help"), menu=hm)
-    hm.add_command(label=t("menu.about"), command=app._show_about)
+    texts.add(menu_bar, "cascade", "menu.help", menu=hm)
+    texts.add(hm, "command", "menu.about", command=app._show_about)
     
     app.protocol("WM_DELETE_WINDOW", app._on_close)
     
@@ -106,6 +108,7 @@ def update_styles_menu(app):
     Rebuild styles menu with current styles
     Reconstruye menú de estilos con estilos actuales
     """
+    app.texts.forget(app.styles_menu)
     app.styles_menu.delete(0, "end")
     for fname, style in app.available_styles.items():
         app.styles_menu.add_command(
@@ -113,8 +116,8 @@ def update_styles_menu(app):
             command=lambda s=style: app._apply_style(s)
         )
     app.styles_menu.add_separator()
-    app.styles_menu.add_command(label=t("menu.edit_style"), command=app._edit_style)
-    app.styles_menu.add_command(label=t("menu.reload_styles"), command=app._reload_styles)
+    app.texts.add(app.styles_menu, "command", "menu.edit_style", command=app._edit_style)
+    app.texts.add(app.styles_menu, "command", "menu.reload_styles", command=app._reload_styles)
 
 
 def update_recent_menu(app):
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Adaptive preview debounce
+Debounce adaptativo del preview
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import time
+from collections import deque
+
+
+class AdaptiveDebounce:
+    """
+    Picks the preview debounce from measured render cost
+    Elige el debounce del preview según el coste medido del render
+    
+    The delay follows a moving average of recent render times, so tiny notes
+    refresh almost immediately and big documents wait longer. A pending edit
+    is never left unrendered longer than MAX_STALENESS_MS, unless renders are
+    slower than the typing cadence: then it only renders when typing pauses.
+    El retardo sigue la media de los últimos renders, con un límite de
+    antigüedad salvo cuando renderizar es más lento que teclear.
+    """
+    
+    MIN_DELAY_MS = 40
+    MAX_DELAY_MS = 1500
+    MAX_STALENESS_MS = 2000
+    RENDER_FACTOR = 2.0     # Delay = average render time x factor
+    SMOOTHING = 0.3         # Weight of the newest sample in the averages
+    TYPING_GAP_MAX = 2.0    # Longer gaps between edits are pauses, not typing
+    HISTORY = 20
+    
+    def __init__(self, root, callback):
+        """
+        Args:
+            root: Tk widget used for after() / Widget Tk para after()
+            callback: Called when the preview should render / Se llama al renderizar
+        """
+        self.root = root
+        self.callback = callback
+        
+        self.avg_render = None
+        self.avg_gap = None
+        self.render_times = deque(maxlen=self.HISTORY)
+        self.last_interval_ms = self.MIN_DELAY_MS
+        self.stale_renders = 0
+        
+        self._job = None
+        self._forced = False
+        self._first_edit = None
+        self._last_edit = None
+    
+    # =========================================================================
+    # SCHEDULING / PROGRAMACIÓN
+    # =========================================================================
+    
+    def trigger(self):
+        """Content changed: (re)schedule a render / Cambió el contenido: programa un render"""
+        now = time.monotonic()
+        if self._last_edit is not None:
+            gap = now - self._last_edit
+            if gap < self.TYPING_GAP_MAX:
+                self.avg_gap = self._smooth(self.avg_gap, gap)
+        self._last_edit = now
+        if self._first_edit is None:
+            self._first_edit = now
+        
+        delay = self.interval()
+        self._forced = False
+        if not self.is_idle_mode():
+            waited = (now - self._first_edit) * 1000
+            remaining = max(0, self.MAX_STALENESS_MS - waited)
+            if remaining < delay:
+                delay = int(remaining)
+                self._forced = True
+        
+        self.last_interval_ms = delay
+        self.cancel()
+        self._job = self.root.after(delay, self._fire)
+    
+    def cancel(self):
+        """Drop the pending render, if any / Cancela el render pendiente"""
+        if self._job:
+            self.root.after_cancel(self._job)
+            self._job = None
+    
+    def reset(self):
+        """Forget pending edits (a render just happened) / Olvida ediciones pendientes"""
+        self.cancel()
+        self._first_edit = None
+    
+    def _fire(self):
+        self._job = None
+        self._first_edit = None
+        if self._forced:
+            self.stale_renders += 1
+        self.callback()
+    
+    # =========================================================================
+    # MEASUREMENTS / MEDICIONES
+    # =========================================================================
+    
+    def record_render(self, seconds):
+        """
+        Feed the duration of a finished render
+        Registra la duración de un render terminado
+        """
+        self.render_times.append(seconds)
+        self.avg_render = self._smooth(self.avg_render, seconds)
+    
+    def interval(self):
+        """Current debounce in ms / Debounce actual en ms"""
+        if self.avg_render is None:
+            return self.MIN_DELAY_MS
+        delay = self.avg_render * 1000 * self.RENDER_FACTOR
+        if self.is_idle_mode():
+            # Wait for a pause in typing / Espera una pausa al teclear
+            delay = max(delay, self.avg_gap * 1000 * 2)
+        return int(min(self.MAX_DELAY_MS, max(self.MIN_DELAY_MS, delay)))
+    
+    def is_idle_mode(self):
+        """Are renders slower than the typing cadence? / ¿Renderizar es más lento que teclear?"""
+        return (self.avg_render is not None and self.avg_gap is not None
+                and self.avg_render > self.avg_gap)
+    
+    def stats(self):
+        """
+        Instrumentation for tuning / Instrumentación para ajuste
+        
+        Returns:
+            dict: {interval_ms, avg_render_ms, avg_keystroke_ms, idle_mode,
+                   stale_renders, render_times_ms}
+        """
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+        
+        return {
+            "interval_ms": self.last_interval_ms,
+            "avg_render_ms": ms(self.avg_render),
+            "avg_keystroke_ms": ms(self.avg_gap),
+            "idle_mode": self.is_idle_mode(),
+            "stale_renders": self.stale_renders,
+            "render_times_ms": [ms(t) for t in self.render_times]
+        }
+    
+    def _smooth(self, average, sample):
+        """Exponential moving average / Media móvil exponencial"""
+        if average is None:
+            return sample
+        return average + self.SMOOTHING * (sample - average)
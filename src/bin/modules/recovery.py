@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Autosave and crash recovery journal
+Autoguardado y diario de recuperación ante cierres inesperados
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import deque
+
+from .config import RECOVERY_DIR
+from .config_store import atomic_write
+from .text_encoding import TextFormat, read_text
+
+
+SNAPSHOT_NAME = "snapshot.json"
+JOURNAL_NAME = "journal.log"
+
+
+class RecoveryJournal:
+    """
+    Append-only journal of edit operations, flushed by a background thread
+    Diario de operaciones de edición, escrito por un hilo en segundo plano
+    
+    The state is a base plus the operations since it. The base is either
+    the file on disk (identified by its SHA-1; free to record after a load
+    or save) or a snapshot of the text. record() runs on the Tk thread for
+    every edit and only appends the operation to a deque, without a lock
+    (deque.append is atomic): serializing and writing happen on the flusher
+    thread every FLUSH_MS. Once the journal
+    grows past COMPACT_BYTES, needs_compaction() asks the owner for a new
+    base, which truncates the journal.
+    El hilo Tk solo añade la operación a una deque; el hilo de escritura
+    serializa y escribe cada FLUSH_MS.
+    
+    Files: snapshot.json {"seq", "file", "saved", "text", "format"} and journal.log,
+    a {"seq"} header line plus one JSON array per operation. A journal whose
+    seq differs from the snapshot's is stale and ignored. An operation that
+    cannot be described (("x",)) also asks for compaction; replay stops there.
+    """
+    
+    FLUSH_MS = 1000
+    COMPACT_BYTES = 2 * 1024 * 1024
+    
+    def __init__(self, folder=RECOVERY_DIR, paused=None):
+        """
+        Args:
+            folder: Where the journal lives / Carpeta del diario
+            paused: Callable; while it returns True edits are not recorded
+                    (e.g. a file streaming in) / Mientras devuelva True no se registra
+        """
+        self.folder = folder
+        self.paused = paused
+        self.snapshot_path = os.path.join(folder, SNAPSHOT_NAME)
+        self.journal_path = os.path.join(folder, JOURNAL_NAME)
+        
+        # Tk thread cost of record() / Coste de record() en el hilo Tk
+        self.recorded = 0
+        self.record_seconds = 0.0
+        self.record_max = 0.0
+        # Flusher counters / Contadores del hilo de escritura
+        self.flushes = 0
+        self.snapshots = 0
+        self.bytes_written = 0
+        self.journal_bytes = 0
+        
+        self._seq = 0
+        self._lock = threading.Condition()
+        self._queue = deque()      # Bases (dict) and operations / Bases y operaciones
+        self._base_queued = False
+        self._stopped = False
+        self._has_base = False
+        self._snapshot_needed = False
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="recovery-journal", daemon=True)
+        self._thread.start()
+    
+    # =========================================================================
+    # TK THREAD / HILO TK
+    # =========================================================================
+    
+    def record(self, op):
+        """
+        Queue one edit operation (EditTracker op listener)
+        Encola una operación de edición (listener de EditTracker)
+        """
+        start = time.perf_counter()
+        if self._has_base and not (self.paused and self.paused()):
+            if op[0] == "x":
+                self._snapshot_needed = True
+            self._queue.append(op)
+        elapsed = time.perf_counter() - start
+        self.recorded += 1
+        self.record_seconds += elapsed
+        if elapsed > self.record_max:
+            self.record_max = elapsed
+    
+    def reset(self, filepath, saved_digest, text=None, text_format=None):
+        """
+        Start over from a new base / Empieza de nuevo desde una base nueva
+        
+        Args:
+            filepath: Document file or None / Archivo del documento o None
+            saved_digest: SHA-1 of the file content on disk / SHA-1 del archivo
+            text: Current text, or None when it equals the file on disk
+            text_format: TextFormat of the file, to save it back the same way
+        """
+        fmt = [text_format.encoding, text_format.bom, text_format.newline] if text_format else None
+        with self._lock:
+            self._seq += 1
+            self._queue.append({"seq": self._seq, "file": filepath, "saved": (saved_digest or b"").hex(),
+                                "text": text, "format": fmt})
+            self._base_queued = True
+            self._has_base = True
+            self._snapshot_needed = False
+            self._lock.notify()
+    
+    def needs_compaction(self):
+        """Should the owner reset() with a new base? / ¿Hace falta una base nueva?"""
+        return self._snapshot_needed or self.journal_bytes > self.COMPACT_BYTES
+    
+    def stats(self):
+        """Counters for benchmarks and diagnostics / Contadores"""
+        return {
+            "recorded": self.recorded,
+            "record_mean_us": self.record_seconds / self.recorded * 1e6 if self.recorded else 0.0,
+            "record_max_us": self.record_max * 1e6,
+            "flushes": self.flushes,
+            "snapshots": self.snapshots,
+            "bytes_written": self.bytes_written,
+        }
+    
+    def flush(self):
+        """Write what is queued now (blocking) / Escribe lo pendiente ya"""
+        self._drain()
+    
+    def close(self):
+        """
+        Clean exit: stop the thread and delete the journal
+        Salida limpia: detiene el hilo y borra el diario
+        """
+        with self._lock:
+            self._stopped = True
+            self._queue.clear()
+            self._lock.notify()
+        self._thread.join()
+        discard_recovery(self.folder)
+    
+    # =========================================================================
+    # FLUSHER THREAD / HILO DE ESCRITURA
+    # =========================================================================
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._stopped or self._base_queued,
+                                    self.FLUSH_MS / 1000)
+                if self._stopped:
+                    return
+            try:
+                self._drain()
+            except Exception as e:
+                print(f"Error recovery journal: {e}")
+    
+    def _drain(self):
+        """Take the queue and write it; batches never overtake each other"""
+        with self._write_lock:
+            with self._lock:
+                self._base_queued = False
+            queue = []
+            try:
+                while True:
+                    queue.append(self._queue.popleft())
+            except IndexError:
+                pass
+            if queue:
+                self._write(queue)
+    
+    def _write(self, queue):
+        """Write a batch: the newest base (if any), then the operations after it"""
+        base = None
+        for i in range(len(queue) - 1, -1, -1):
+            if isinstance(queue[i], dict):
+                base, queue = queue[i], queue[i + 1:]
+                break
+        
+        if base is not None:
+            os.makedirs(self.folder, exist_ok=True)
+            data = json.dumps(base, ensure_ascii=False).encode("utf-8")
+            atomic_write(self.snapshot_path, data)
+            header = (json.dumps({"seq": base["seq"]}) + "\n").encode("utf-8")
+            with open(self.journal_path, 'wb') as f:
+                f.write(header)
+            self.snapshots += 1
+            self.bytes_written += len(data) + len(header)
+            self.journal_bytes = len(header)
+        
+        if queue:
+            data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in queue).encode("utf-8")
+            with open(self.journal_path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.bytes_written += len(data)
+            self.journal_bytes += len(data)
+        self.flushes += 1
+
+
+# =============================================================================
+# RECOVERY / RECUPERACIÓN
+# =============================================================================
+
+class Recovery:
+    """
+    What a previous session left: a base and the operations after it
+    Lo que dejó una sesión anterior: una base y las operaciones posteriores
+    """
+    
+    def __init__(self, filepath, saved_digest, text, ops, text_format=None):
+        self.filepath = filepath
+        self.saved_digest = saved_digest
+        self.text = text
+        self.ops = ops
+        self.text_format = text_format
+    
+    def base_text(self):
+        """
+        Text the operations apply to; reads the file when the base is on disk
+        
+        Raises:
+            ValueError: The file changed since the journal was written
+        """
+        if self.text is not None:
+            return self.text
+        text, text_format = read_text(self.filepath)
+        if hashlib.sha1(text.encode("utf-8")).digest() != self.saved_digest:
+            raise ValueError(self.filepath)
+        self.text_format = self.text_format or text_format
+        return text
+    
+    def replay(self, text_widget):
+        """Apply the operations to a tk.Text holding base_text()"""
+        for op in self.ops:
+            if op[0] == "i":
+                text_widget.insert(op[1], op[2])
+            elif op[0] == "d":
+                text_widget.delete(op[1], op[2])
+            elif op[0] == "r":
+                text_widget.replace(op[1], op[2], op[3])
+
+
+def load_recovery(folder=RECOVERY_DIR):
+    """
+    Read the journal left by a session that did not exit cleanly
+    Lee el diario de una sesión que no terminó limpiamente
+    
+    Returns:
+        Recovery, or None if there is nothing to replay
+    """
+    try:
+        with open(os.path.join(folder, SNAPSHOT_NAME), 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        with open(os.path.join(folder, JOURNAL_NAME), 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            lines = f.readlines()
+    except (OSError, ValueError):
+        return None
+    if header.get("seq") != base.get("seq"):
+        return None     # Snapshot written, journal not yet truncated
+    
+    ops = []
+    for line in lines:
+        try:
+            op = json.loads(line)
+        except ValueError:
+            break       # Torn last write / Última escritura incompleta
+        if op[0] == "x":
+            break       # Not replayable past this point / No reproducible
+        ops.append(op)
+    if not ops:
+        return None
+    fmt = base.get("format")
+    return Recovery(base.get("file"), bytes.fromhex(base.get("saved", "")), base.get("text"), ops,
+                    TextFormat(*fmt) if fmt else None)
+
+
+def find_recoveries(folder=RECOVERY_DIR):
+    """
+    Journals left by a session that did not exit cleanly, one per document
+    Diarios de una sesión que no terminó limpiamente, uno por documento
+    
+    Each open document journals into its own "<pid>-<doc id>" subfolder of
+    folder; a journal in folder itself comes from versions without tabs.
+    Folders of processes still running (another editor instance, or this
+    one) are live journals and are skipped.
+    
+    Returns:
+        list of (journal folder, Recovery or None if nothing to replay)
+    """
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return []
+    folders = [folder] + [os.path.join(folder, n) for n in names
+                          if os.path.isdir(os.path.join(folder, n)) and not _owner_alive(n)]
+    return [(path, load_recovery(path)) for path in folders]
+
+
+def _owner_alive(name):
+    """Is the process that named a "<pid>-<doc id>" folder running? / ¿Sigue vivo su proceso?"""
+    try:
+        pid = int(name.split("-", 1)[0])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return True
+    return _pid_alive(pid)
+
+
+def _pid_alive(pid):
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Access denied still means the process exists
+            return ctypes.GetLastError() == 5
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True     # Exists, owned by another user / Existe, de otro usuario
+    except OSError:
+        return False
+    return True
+
+
+def discard_recovery(folder=RECOVERY_DIR):
+    """Delete a leftover journal (and its folder if empty) / Borra un diario sobrante"""
+    for name in (JOURNAL_NAME, SNAPSHOT_NAME):
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+    try:
+        os.rmdir(folder)
+    except OSError:
+        pass
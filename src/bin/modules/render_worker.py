@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Background preview rendering
+Renderizado del preview en segundo plano
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import time
+import threading
+
+from .renderer import render_full_html
+
+
+class RenderWorker:
+    """
+    Renders preview HTML on a worker thread, dropping superseded snapshots
+    Renderiza el HTML del preview en un hilo, descartando snapshots obsoletos
+    
+    Every submit() bumps a generation number. The worker only renders the
+    newest pending snapshot, and results whose generation is no longer the
+    current one are discarded. Results are handed to on_result on the Tk
+    thread by polling with after(), never from the worker itself.
+    Cada submit() incrementa la generación; solo la última llega a on_result,
+    siempre en el hilo de Tk.
+    """
+    
+    POLL_MS = 20
+    
+    def __init__(self, root, on_result, on_timing=None):
+        """
+        Args:
+            root: Tk widget used for after() polling / Widget Tk para after()
+            on_result: Callback(html, context) on the Tk thread / Callback en el hilo de Tk
+            on_timing: Callback(seconds) per finished render, on the Tk thread
+                       Callback(segundos) por render terminado, en el hilo de Tk
+        """
+        self.root = root
+        self.on_result = on_result
+        self.on_timing = on_timing
+        self.generation = 0
+        self._delivered = 0
+        self.rendered = 0
+        self.dropped = 0
+        
+        self._cond = threading.Condition()
+        self._pending = None
+        self._result = None
+        self._timings = []
+        self._poll_job = None
+        self._stopped = False
+        
+        self._thread = threading.Thread(target=self._run, name="preview-render", daemon=True)
+        self._thread.start()
+    
+    def submit(self, md_text, style_data, extra_css="", context=None):
+        """
+        Queue a snapshot of the buffer for rendering (Tk thread)
+        Encola un snapshot del buffer para renderizar (hilo Tk)
+        
+        Args:
+            md_text: Markdown snapshot / Snapshot del Markdown
+            style_data: Style dict / Dict de estilo
+            extra_css: Additional CSS (e.g. zoom) / CSS adicional (ej: zoom)
+            context: Passed back to on_result unchanged / Se devuelve tal cual
+        
+        Returns:
+            int: Generation number of the snapshot
+        """
+        with self._cond:
+            self.generation += 1
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (self.generation, md_text, style_data, extra_css, context)
+            self._cond.notify()
+        self._schedule_poll()
+        return self.generation
+    
+    def stop(self):
+        """Stop the worker thread / Detiene el hilo"""
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+        if self._poll_job:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+    
+    # =========================================================================
+    # WORKER THREAD / HILO DE TRABAJO
+    # =========================================================================
+    
+    def _run(self):
+        """Render loop / Bucle de renderizado"""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                generation, md_text, style_data, extra_css, context = self._pending
+                self._pending = None
+            
+            start = time.perf_counter()
+            try:
+                html = render_full_html(md_text, style_data, extra_css, incremental=True)
+            except Exception as e:
+                print(f"Error preview: {e}")
+                html = None
+            elapsed = time.perf_counter() - start
+            
+            with self._cond:
+                self._timings.append(elapsed)
+                if generation != self.generation:
+                    self.dropped += 1
+                    continue
+                self._result = (generation, html, context)
+    
+    # =========================================================================
+    # TK THREAD / HILO TK
+    # =========================================================================
+    
+    def _schedule_poll(self):
+        if self._poll_job is None and not self._stopped:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+    
+    def _poll(self):
+        """Deliver the latest result, if still current / Entrega el último resultado vigente"""
+        self._poll_job = None
+        with self._cond:
+            result = self._result
+            self._result = None
+            timings = self._timings
+            self._timings = []
+        
+        if self.on_timing:
+            for seconds in timings:
+                self.on_timing(seconds)
+        
+        if result is not None:
+            generation, html, context = result
+            self._delivered = generation
+            if generation != self.generation:
+                self.dropped += 1
+            elif html is not None:
+                self.rendered += 1
+                self.on_result(html, context)
+        
+        if self._delivered != self.generation:
+            self._schedule_poll()
@@ -11,18 +11,314 @@ Copyright (c) 2025 Fernando Ruiz Casas
 Licensed under MIT License
 """
 
-import markdown
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'codehilite', 'nl2br', 'sane_lists']
 
-def markdown_to_html(md_text):
+
+# =============================================================================
+# CONVERTER POOL / POOL DE CONVERSORES
+# =============================================================================
+
+class ConverterPool:
+    """
+    Thread-safe pool of pre-built Markdown converters keyed by extension set
+    Pool thread-safe de conversores Markdown ya construidos, por extensiones
+    
+    Building markdown.Markdown registers every extension's processors, which
+    costs more than converting a short document. Converters are reset()
+    and handed out again instead.
+    Construir un conversor cuesta más que convertir un documento corto.
+    """
+    
+    def __init__(self, max_idle=4):
+        """
+        Args:
+            max_idle: Idle converters kept per extension set
+                      Conversores libres guardados por conjunto de extensiones
+        """
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+    
+    @contextmanager
+    def converter(self, extensions=None):
+        """
+        Borrow a converter / Toma prestado un conversor
+        
+        Example:
+            with converter_pool.converter() as md:
+                html = md.convert(text)
+        """
+        key = tuple(extensions or MARKDOWN_EXTENSIONS)
+        md = None
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                md = idle.pop()
+                self.reused += 1
+            else:
+                self.created += 1
+        if md is None:
+            # Imported by the first render (with Pygments, via codehilite),
+            # normally on the render thread, not at startup
+            import markdown
+            md = markdown.Markdown(extensions=list(key))
+        
+        try:
+            yield md
+        finally:
+            md.reset()
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(md)
+    
+    def convert(self, md_text, extensions=None):
+        """Convert with a pooled converter / Convierte con un conversor del pool"""
+        with self.converter(extensions) as md:
+            return md.convert(md_text)
+    
+    def clear(self):
+        """Drop idle converters / Descarta conversores libres"""
+        with self._lock:
+            self._idle = {}
+
+
+converter_pool = ConverterPool()
+
+
+def markdown_to_html(md_text, incremental=False):
     """
     Convert Markdown to HTML (body only)
     Convierte Markdown a HTML (solo body)
+    
+    Args:
+        md_text: Markdown source text / Texto fuente Markdown
+        incremental: Reuse cached HTML of unchanged blocks (same output)
+                     Reutiliza HTML cacheado de bloques sin cambios (misma salida)
+    """
+    if incremental:
+        return _incremental_renderer.render(md_text)
+    return converter_pool.convert(md_text)
+
+
+# =============================================================================
+# INCREMENTAL RENDERING / RENDERIZADO INCREMENTAL
+# =============================================================================
+
+# Same opening line the fenced_code extension accepts
+# Misma línea de apertura que acepta la extensión fenced_code
+_FENCE_RE = re.compile(
+    r'^(`{3,}|~{3,})[ ]*'
+    r'(?:\{[^\n]*\}|(?:\.?[\w#.+-]*[ ]*)?(?:hl_lines=(["\']).*?\2[ ]*)?)$'
+)
+_LIST_RE = re.compile(r'^ {0,3}(?:[*+-]|\d+[.)])[ \t]')
+_QUOTE_RE = re.compile(r'^ {0,3}>')
+_REFERENCE_RE = re.compile(r'^ {0,3}\[[^\[\]]*\]:')
+_TAG_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*?(/?)>')
+_block_tags = None      # Loaded with markdown / Se carga con markdown
+_VOID_TAGS = frozenset(['hr'])
+
+# Paragraph appended to each block to learn the separator that follows it
+# Párrafo añadido a cada bloque para conocer el separador que le sigue
+_SENTINEL = "mdeditorblocksentinel"
+_SENTINEL_HTML = f"<p>{_SENTINEL}</p>"
+
+
+def _block_level_tags():
+    global _block_tags
+    if _block_tags is None:
+        import markdown
+        _block_tags = frozenset(markdown.Markdown().block_level_elements)
+    return _block_tags
+
+
+def _html_depth_delta(line, in_comment):
+    """
+    Net open block-level HTML tags in a line, and comment state after it
+    Balance de tags HTML de bloque en una línea, y estado de comentario
+    """
+    block_tags = _block_tags or _block_level_tags()
+    delta = 0
+    while line:
+        if in_comment:
+            end = line.find("-->")
+            if end == -1:
+                return delta, True
+            line = line[end + 3:]
+            in_comment = False
+        start = line.find("<!--")
+        outside = line if start == -1 else line[:start]
+        for closing, tag, self_closing in _TAG_RE.findall(outside):
+            tag = tag.lower()
+            if tag not in block_tags or tag in _VOID_TAGS or self_closing:
+                continue
+            delta += -1 if closing else 1
+        if start == -1:
+            break
+        line = line[start + 4:]
+        in_comment = True
+    return delta, in_comment
+
+
+def split_blocks(md_text):
+    """
+    Split Markdown into top-level blocks that render independently
+    Divide Markdown en bloques de primer nivel que se renderizan por separado
+    
+    Blocks are separated by blank lines, except inside fenced code, raw HTML
+    or comments. Indented blocks, lists and quotes that may continue the
+    previous block are merged with it.
+    Los bloques se separan por líneas vacías, salvo dentro de código o HTML.
+    
+    Returns:
+        list of block strings, or None if the document needs a full render
+        (reference-style links resolve across the whole document)
+    """
+    first_line = md_text.split("\n", 1)[0]
+    if "\r" in md_text or (first_line and not first_line.strip(" \t")):
+        return None
+    
+    groups = []     # [lines, may_end_in_list, may_end_in_quote]
+    current = None
+    fence = None
+    html_depth = 0
+    in_comment = False
+    blanks = 0
+    
+    for line in md_text.split("\n"):
+        if fence is None and not line.strip(" \t"):
+            blanks += 1
+            continue
+        
+        if fence is None and _REFERENCE_RE.match(line):
+            return None
+        
+        if current is None or (blanks and html_depth <= 0 and not in_comment
+                               and not _continues_previous(line, current)):
+            current = [[], False, False]
+            groups.append(current)
+        else:
+            current[0].extend([""] * blanks)
+        blanks = 0
+        current[0].append(line)
+        
+        if fence is not None:
+            if line.rstrip(" ") == fence:
+                fence = None
+            continue
+        
+        m = _FENCE_RE.match(line)
+        if m:
+            fence = m.group(1)
+            continue
+        
+        delta, in_comment = _html_depth_delta(line, in_comment)
+        html_depth = max(0, html_depth + delta)
+        # Raw HTML may be followed by anything on the same line
+        # El HTML crudo puede ir seguido de cualquier cosa en la misma línea
+        raw_html = line.lstrip(" ").startswith("<")
+        if raw_html or _LIST_RE.match(line):
+            current[1] = True
+        if raw_html or _QUOTE_RE.match(line):
+            current[2] = True
+    
+    return ["\n".join(lines) for lines, _, _ in groups]
+
+
+def _continues_previous(line, group):
+    """Can a block starting with line extend the previous one? / ¿Continúa el bloque anterior?"""
+    if line.startswith((" " * 4, "\t")):
+        return True
+    if group[1] and _LIST_RE.match(line):
+        return True
+    if group[2] and _QUOTE_RE.match(line):
+        return True
+    return False
+
+
+class IncrementalRenderer:
+    """
+    Renders Markdown reusing the HTML of blocks that did not change
+    Renderiza Markdown reutilizando el HTML de bloques sin cambios
+    
+    Each block is keyed by a hash of its source. Only blocks from the last
+    render are kept, so the cache never outgrows the current document.
+    Cada bloque se indexa por hash de su fuente; solo se guardan los del último render.
     """
-    md = markdown.Markdown(extensions=[
-        'tables', 'fenced_code', 'codehilite', 'nl2br', 'sane_lists'
-    ])
-    return md.convert(md_text)
+    
+    def __init__(self):
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, md_text):
+        """
+        Render Markdown, byte-identical to a full markdown_to_html()
+        Renderiza Markdown, idéntico byte a byte a markdown_to_html()
+        """
+        with self._lock:
+            return self._render(md_text)
+    
+    def _render(self, md_text):
+        groups = split_blocks(md_text)
+        if groups is None:
+            self._blocks = {}
+            return converter_pool.convert(md_text)
+        
+        blocks = {}
+        parts = []
+        with converter_pool.converter() as md:
+            for group in groups:
+                key = hashlib.sha1(group.encode("utf-8")).hexdigest()
+                entry = blocks.get(key) or self._blocks.get(key)
+                if entry is None:
+                    entry = self._convert_block(md, group)
+                    if entry is None:
+                        md.reset()
+                        self._blocks = {}
+                        return md.convert(md_text)
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                blocks[key] = entry
+                if entry[0]:
+                    parts.append(entry)
+        
+        self._blocks = blocks
+        if not parts:
+            return ""
+        html = [fragment + separator for fragment, separator in parts[:-1]]
+        html.append(parts[-1][0])
+        return "".join(html)
+    
+    def _convert_block(self, md, block):
+        """
+        Convert one block, returning (html, separator that follows it)
+        Convierte un bloque, devolviendo (html, separador que le sigue)
+        """
+        md.reset()
+        html = md.convert(f"{block}\n\n{_SENTINEL}")
+        if not html.endswith(_SENTINEL_HTML):
+            return None
+        html = html[:-len(_SENTINEL_HTML)]
+        fragment = html.rstrip()
+        return fragment, html[len(fragment):]
+    
+    def clear(self):
+        """Drop cached blocks / Descarta bloques cacheados"""
+        self._blocks = {}
+
+
+_incremental_renderer = IncrementalRenderer()
 
 
 def style_to_css(style_data):
@@ -40,7 +336,103 @@ def style_to_css(style_data):
     return "\n\n".join(rules)
 
 
-def render_full_html(md_text, style_data, extra_css=""):
+def _digest(text):
+    """SHA-1 of a text / SHA-1 de un texto"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# RENDER CACHE / CACHÉ DE RENDERIZADO
+# =============================================================================
+
+class RenderCache:
+    """
+    Bounded LRU cache of rendered HTML bodies and full documents
+    Caché LRU acotada de bodies HTML y documentos completos renderizados
+    
+    Bodies are keyed by the Markdown digest, so exports can reuse what the
+    preview already rendered whatever the zoom. Full documents are keyed by
+    (Markdown digest, style fingerprint, extra CSS).
+    Los bodies se indexan por digest del Markdown; los documentos además
+    por estilo y CSS extra.
+    """
+    
+    def __init__(self, max_chars=8 * 1024 * 1024):
+        """
+        Args:
+            max_chars: Memory cap, in cached characters / Límite en caracteres
+        """
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Cached value or None / Valor cacheado o None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        """Store a value, evicting least recently used / Guarda, expulsando el menos usado"""
+        if len(value) > self.max_chars:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+    
+    def clear(self):
+        """Drop all entries / Descarta todas las entradas"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+    
+    def stats(self):
+        """
+        Counters for tuning / Contadores para ajuste
+        
+        Returns:
+            dict: {hits, misses, entries, size}
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size": self._size
+            }
+
+
+render_cache = RenderCache()
+
+
+def render_body(md_text, incremental=False, md_digest=None):
+    """
+    Markdown to HTML body, reusing a cached render of the same text
+    Markdown a body HTML, reutilizando un render cacheado del mismo texto
+    """
+    key = ("body", md_digest or _digest(md_text))
+    body = render_cache.get(key)
+    if body is None:
+        body = markdown_to_html(md_text, incremental=incremental)
+        render_cache.put(key, body)
+    return body
+
+
+def render_full_html(md_text, style_data, extra_css="", incremental=False):
     """
     Render Markdown to complete HTML with styles
     Renderiza Markdown a HTML completo con estilos
@@ -49,18 +441,27 @@ def render_full_html(md_text, style_data, extra_css=""):
         md_text: Markdown source text / Texto fuente Markdown
         style_data: Style dict with CSS rules / Dict de estilo con reglas CSS
         extra_css: Additional CSS (e.g. zoom) / CSS adicional (ej: zoom)
+        incremental: Use the incremental block renderer / Usa el renderizador incremental
     
     Returns:
         Complete HTML document / Documento HTML completo
     """
-    body = markdown_to_html(md_text)
     css = style_to_css(style_data)
+    md_digest = _digest(md_text)
+    # The style fingerprint is the digest of the CSS it produces
+    # La huella del estilo es el digest del CSS que produce
+    key = ("html", md_digest, _digest(css), extra_css)
+    html = render_cache.get(key)
+    if html is not None:
+        return html
+    
+    body = render_body(md_text, incremental, md_digest)
     
     # Add extra CSS (e.g. zoom) / Añadir CSS extra (ej: zoom)
     if extra_css:
         css = extra_css + "\n\n" + css
     
-    return f"""<!DOCTYPE html>
+    html = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -72,3 +473,5 @@ def render_full_html(md_text, style_data, extra_css=""):
 {body}
 </body>
 </html>"""
+    render_cache.put(key, html)
+    return html
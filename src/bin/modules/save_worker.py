@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Atomic background saving
+Guardado atómico en segundo plano
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import time
+import threading
+
+from .config import add_recent_files
+from .config_store import atomic_write
+
+
+class SaveWorker:
+    """
+    Writes files and the recent files list on an I/O thread
+    Escribe archivos y la lista de recientes en un hilo de E/S
+    
+    save() only queues the bytes. A save of a path that is still waiting is
+    replaced by the newer one (only the newest callback runs), so repeated
+    Ctrl+S on a slow share costs one write. Recent files queued meanwhile
+    are written to config.json in a single batch after the pending saves.
+    Completion callbacks run on the Tk thread, by polling with after().
+    Los guardados pendientes del mismo archivo se fusionan; los recientes se
+    escriben en lote. Los callbacks se ejecutan en el hilo de Tk.
+    """
+    
+    POLL_MS = 30
+    
+    def __init__(self, root, on_recent_change=None):
+        """
+        Args:
+            root: Tk widget used for after() polling / Widget Tk para after()
+            on_recent_change: Callback() after the recent files list is written
+        """
+        self.root = root
+        self.on_recent_change = on_recent_change
+        self.requested = 0
+        self.written = 0
+        self.coalesced = 0
+        self.recent_writes = 0
+        
+        self._cond = threading.Condition()
+        self._pending = {}          # key -> (path, data, on_done), in request order
+        self._recent = []
+        self._busy = False
+        self._results = []
+        self._recent_written = False
+        self._poll_job = None
+        self._stopped = False
+        
+        self._thread = threading.Thread(target=self._run, name="file-save", daemon=True)
+        self._thread.start()
+    
+    def save(self, filepath, data, on_done=None):
+        """
+        Queue bytes to be written atomically to filepath (Tk thread)
+        Encola bytes para escribirlos de forma atómica (hilo Tk)
+        
+        Args:
+            filepath: Target file / Archivo destino
+            data: Encoded content / Contenido codificado
+            on_done: Callback(error, seconds, stat) on the Tk thread; error is None
+                     and stat the os.stat_result of the file on success
+        """
+        key = os.path.normcase(os.path.abspath(filepath))
+        with self._cond:
+            self.requested += 1
+            if key in self._pending:
+                self.coalesced += 1
+                del self._pending[key]
+            self._pending[key] = (filepath, data, on_done)
+            self._cond.notify()
+        self._schedule_poll()
+    
+    def add_recent(self, filepath):
+        """Queue a recent files update / Encola una actualización de recientes"""
+        with self._cond:
+            self._recent.append(filepath)
+            self._cond.notify()
+        self._schedule_poll()
+    
+    def is_idle(self):
+        """
+        Nothing queued, being written or waiting for its callback
+        Nada pendiente, escribiéndose o esperando su callback
+        """
+        with self._cond:
+            return self._idle() and not self._results
+    
+    def _idle(self):
+        return not self._pending and not self._recent and not self._busy
+    
+    def flush(self, timeout=None):
+        """
+        Wait for every queued write and run the callbacks (Tk thread)
+        Espera a todas las escrituras pendientes y ejecuta los callbacks
+        
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self._cond:
+            idle = self._cond.wait_for(self._idle, timeout)
+        self._poll()
+        return idle
+    
+    def stop(self):
+        """Write what is queued, then stop the thread / Escribe lo pendiente y detiene el hilo"""
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._poll_job:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+    
+    # =========================================================================
+    # WORKER THREAD / HILO DE TRABAJO
+    # =========================================================================
+    
+    def _run(self):
+        """Write loop / Bucle de escritura"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._recent and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                if self._pending:
+                    key = next(iter(self._pending))
+                    job = self._pending.pop(key)
+                    recent = None
+                else:
+                    job = None
+                    recent, self._recent = self._recent, []
+                self._busy = True
+            
+            if job is not None:
+                result = self._write(*job)
+            else:
+                result = None
+                try:
+                    add_recent_files(recent)
+                except Exception as e:
+                    print(f"Error recent files: {e}")
+            
+            with self._cond:
+                self._busy = False
+                if result is not None:
+                    self.written += 1
+                    self._results.append(result)
+                elif recent is not None:
+                    self.recent_writes += 1
+                    self._recent_written = True
+                self._cond.notify_all()
+    
+    def _write(self, filepath, data, on_done):
+        start = time.perf_counter()
+        stat = None
+        try:
+            stat = atomic_write(filepath, data)
+            error = None
+        except Exception as e:
+            error = e
+        return on_done, error, time.perf_counter() - start, stat
+    
+    # =========================================================================
+    # TK THREAD / HILO TK
+    # =========================================================================
+    
+    def _schedule_poll(self):
+        if self._poll_job is None and not self._stopped:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+    
+    def _poll(self):
+        """Run finished callbacks / Ejecuta los callbacks terminados"""
+        if self._poll_job:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+        self._poll_job = None
+        with self._cond:
+            results, self._results = self._results, []
+            recent_written, self._recent_written = self._recent_written, False
+        
+        for on_done, error, seconds, stat in results:
+            if on_done:
+                on_done(error, seconds, stat)
+        if recent_written and self.on_recent_change:
+            self.on_recent_change()
+        
+        with self._cond:
+            more = not self._idle() or self._results or self._recent_written
+        if more:
+            self._schedule_poll()
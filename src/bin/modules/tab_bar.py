@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Document tab bar
+Barra de pestañas de documentos
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import customtkinter as ctk
+
+from .config import UI_FONT_FAMILY, UI_FONT_SIZE
+
+
+class TabBar(ctk.CTkFrame):
+    """
+    One button per open document, with a close button
+    Un botón por documento abierto, con botón de cerrar
+    
+    Tabs are identified by the document id; the bar holds no document
+    state, it only reports clicks through on_select(id) and on_close(id).
+    """
+    
+    SELECTED = ("gray75", "gray30")
+    
+    def __init__(self, parent, on_select, on_close):
+        """
+        Args:
+            parent: Editor panel / Panel del editor
+            on_select: Callback(tab_id) when a tab is clicked
+            on_close: Callback(tab_id) for the close button or a middle click
+        """
+        super().__init__(parent, height=30, fg_color="transparent")
+        self.on_select = on_select
+        self.on_close = on_close
+        self.ui_font = (UI_FONT_FAMILY, UI_FONT_SIZE)
+        self._tabs = {}         # id -> (frame, label button)
+        self._selected = None
+    
+    def add(self, tab_id, text, after=None):
+        """Add a tab (after tab id after, else at the end) / Añade una pestaña"""
+        frame = ctk.CTkFrame(self, fg_color="transparent", corner_radius=6)
+        button = ctk.CTkButton(
+            frame, text=text, height=24, width=40, font=self.ui_font,
+            fg_color="transparent", hover_color=("gray70", "gray35"),
+            text_color=("gray10", "gray90"),
+            command=lambda: self.on_select(tab_id)
+        )
+        button.pack(side="left", padx=(2, 0))
+        close = ctk.CTkButton(
+            frame, text="×", height=24, width=20, font=self.ui_font,
+            fg_color="transparent", hover_color=("gray70", "gray35"),
+            text_color=("gray10", "gray90"),
+            command=lambda: self.on_close(tab_id)
+        )
+        close.pack(side="left", padx=(0, 2))
+        button.bind("<Button-2>", lambda e: self.on_close(tab_id))
+        
+        if after in self._tabs:
+            frame.pack(side="left", padx=1, after=self._tabs[after][0])
+        else:
+            frame.pack(side="left", padx=1)
+        self._tabs[tab_id] = (frame, button)
+    
+    def remove(self, tab_id):
+        """Remove a tab / Quita una pestaña"""
+        frame, _ = self._tabs.pop(tab_id)
+        frame.destroy()
+        if self._selected == tab_id:
+            self._selected = None
+    
+    def set_text(self, tab_id, text):
+        """Change a tab label (file name, unsaved mark) / Cambia el texto"""
+        frame, button = self._tabs[tab_id]
+        if button.cget("text") != text:
+            button.configure(text=text)
+    
+    def select(self, tab_id):
+        """Highlight the active tab / Resalta la pestaña activa"""
+        if self._selected in self._tabs:
+            self._tabs[self._selected][0].configure(fg_color="transparent")
+        self._selected = tab_id
+        self._tabs[tab_id][0].configure(fg_color=self.SELECTED)
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Text encoding and newline detection
+Detección de codificación y saltos de línea
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import codecs
+
+
+SAMPLE_BYTES = 64 * 1024    # Bytes the detector looks at / Bytes que mira el detector
+
+# Longest first: the UTF-32-LE BOM starts with the UTF-16-LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+_BOM_OF = {encoding: bom for bom, encoding in _BOMS}
+
+# Bytes cp1252 leaves undefined / Bytes sin definir en cp1252
+_CP1252_HOLES = frozenset(b"\x81\x8d\x8f\x90\x9d")
+_SINGLE_BYTE = ("cp1252", "latin-1")
+
+_NAMES = {"utf-8": "UTF-8", "utf-16-le": "UTF-16 LE", "utf-16-be": "UTF-16 BE",
+          "utf-32-le": "UTF-32 LE", "utf-32-be": "UTF-32 BE",
+          "cp1252": "Windows-1252", "latin-1": "ISO-8859-1"}
+_NEWLINE_NAMES = {"\n": "LF", "\r\n": "CRLF", "\r": "CR"}
+
+
+class TextFormat:
+    """
+    How a document is stored on disk: encoding, BOM and newline style
+    Cómo se guarda un documento: codificación, BOM y saltos de línea
+    
+    The editor always holds text with "\\n" newlines; encode() turns it
+    back into the bytes of the original file.
+    """
+    
+    __slots__ = ("encoding", "bom", "newline")
+    
+    def __init__(self, encoding="utf-8", bom=False, newline="\n"):
+        self.encoding = encoding
+        self.bom = bom
+        self.newline = newline
+    
+    def __eq__(self, other):
+        return (isinstance(other, TextFormat) and self.encoding == other.encoding
+                and self.bom == other.bom and self.newline == other.newline)
+    
+    def __repr__(self):
+        return f"TextFormat({self.encoding!r}, bom={self.bom}, newline={self.newline!r})"
+    
+    def is_plain(self):
+        """UTF-8, no BOM, LF: the bytes are text.encode("utf-8")"""
+        return self.encoding == "utf-8" and not self.bom and self.newline == "\n"
+    
+    def encode(self, text):
+        """
+        Bytes to write for text / Bytes a escribir para text
+        
+        Raises:
+            UnicodeEncodeError: text has characters the encoding lacks
+        """
+        if self.newline != "\n":
+            text = text.replace("\n", self.newline)
+        data = text.encode(self.encoding)
+        if self.bom:
+            data = _BOM_OF[self.encoding] + data
+        return data
+    
+    def with_encoding(self, encoding, bom=False):
+        """Same newlines, other encoding / Mismos saltos, otra codificación"""
+        return TextFormat(encoding, bom, self.newline)
+    
+    def label(self):
+        """Short description for the UI, e.g. "UTF-8 BOM, CRLF" """
+        name = _NAMES.get(self.encoding, self.encoding)
+        if self.bom:
+            name += " BOM"
+        return f"{name}, {_NEWLINE_NAMES.get(self.newline, '?')}"
+
+
+DEFAULT_FORMAT = TextFormat()
+
+
+class MixedEncodingError(ValueError):
+    """
+    Valid non-ASCII UTF-8 followed by bytes that are not UTF-8
+    UTF-8 válido no ASCII seguido de bytes que no son UTF-8
+    
+    No single encoding reads both parts, so the file is not opened rather
+    than shown half garbled. position is the offset of the first bad byte.
+    """
+    
+    def __init__(self, position):
+        super().__init__(f"Mixed encoding: UTF-8 text followed by a non-UTF-8 byte at offset {position}")
+        self.position = position
+
+
+# =============================================================================
+# DETECTION / DETECCIÓN
+# =============================================================================
+
+def detect_encoding(sample, final=True):
+    """
+    Encoding of a file from its first bytes
+    Codificación de un archivo a partir de sus primeros bytes
+    
+    A BOM decides at once. Otherwise NUL byte patterns reveal UTF-16
+    without BOM (checked first: ASCII-range UTF-16 is also valid UTF-8),
+    then the sample must be valid UTF-8 (a sequence cut at the end of a
+    partial sample is allowed); the rest is Windows-1252, or ISO-8859-1
+    when bytes cp1252 leaves undefined appear.
+    
+    Args:
+        sample: Up to SAMPLE_BYTES from the start of the file
+        final: The sample is the whole file / La muestra es todo el archivo
+    
+    Returns:
+        (encoding, has_bom)
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding, True
+    encoding = _detect_utf16(sample)
+    if encoding:
+        return encoding, False
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final)
+        return "utf-8", False
+    except UnicodeDecodeError:
+        pass
+    return _detect_fallback(sample), False
+
+
+def _detect_utf16(sample):
+    """UTF-16 without BOM from its NUL pattern, or None / UTF-16 sin BOM por sus NUL"""
+    sample = sample[:SAMPLE_BYTES]
+    pairs = len(sample) // 2
+    if pairs:
+        even_nul = sample[0:pairs * 2:2].count(0)
+        odd_nul = sample[1:pairs * 2:2].count(0)
+        # ASCII-range text in UTF-16 has a NUL in (almost) every pair
+        if odd_nul > pairs * 0.3 and even_nul < pairs * 0.05:
+            return "utf-16-le"
+        if even_nul > pairs * 0.3 and odd_nul < pairs * 0.05:
+            return "utf-16-be"
+    return None
+
+
+def _detect_fallback(sample):
+    """Non-UTF-8 sample: UTF-16 without BOM or a single-byte encoding"""
+    encoding = _detect_utf16(sample)
+    if encoding:
+        return encoding
+    if _CP1252_HOLES.intersection(sample[:SAMPLE_BYTES]):
+        return "latin-1"
+    return "cp1252"
+
+
+def _utf8_fallback(data, error):
+    """
+    Encoding for UTF-8 data that turned invalid at error.start
+    Codificación para datos UTF-8 que dejan de ser válidos en error.start
+    
+    Both decode_text() and StreamDecoder follow this rule: if every byte
+    before the bad one is ASCII, the fallback encoding reads them the same
+    and takes over; otherwise the file mixes encodings.
+    
+    Raises:
+        MixedEncodingError: non-ASCII UTF-8 came before the bad byte
+    """
+    if not data[:error.start].isascii():
+        raise MixedEncodingError(error.start)
+    return _detect_fallback(data[error.start:])
+
+
+def detect_newline(text, default="\n"):
+    """
+    Newline style of text: the kind of its first line break
+    Estilo de salto de línea: el del primer salto del texto
+    
+    Returns default when text has no line break (or, for a partial text,
+    when its only CR is the last character and a LF may follow).
+    """
+    cr = text.find("\r")
+    if cr == -1:
+        return "\n" if "\n" in text else default
+    if text.find("\n", 0, cr) != -1:
+        return "\n"
+    if cr == len(text) - 1:
+        return default
+    return "\r\n" if text[cr + 1] == "\n" else "\r"
+
+
+def normalize_newlines(text):
+    """CRLF and CR to LF (what Tk and the renderer expect) / CRLF y CR a LF"""
+    if "\r" not in text:
+        return text
+    text = text.replace("\r\n", "\n")
+    if "\r" in text:   # Lone CR (old Mac files, mixed endings)
+        text = text.replace("\r", "\n")
+    return text
+
+
+def decode_text(data):
+    """
+    Decode a whole file / Decodifica un archivo completo
+    
+    The detector only reads the first SAMPLE_BYTES, so the file is decoded
+    once. Only an ASCII start followed by invalid UTF-8 later on costs a
+    second decode with the fallback encoding (see _utf8_fallback).
+    Single-byte encodings fix newlines on the bytes, before decoding
+    (cheaper than on wide strings).
+    
+    Returns:
+        (text with "\\n" newlines, TextFormat)
+    
+    Raises:
+        MixedEncodingError: non-ASCII UTF-8 followed by invalid bytes
+    """
+    encoding, bom = detect_encoding(data[:SAMPLE_BYTES], final=len(data) <= SAMPLE_BYTES)
+    text = None
+    if encoding == "utf-8" and not bom:
+        try:
+            text = str(data, "utf-8")
+        except UnicodeDecodeError as e:
+            encoding = _utf8_fallback(data, e)
+    if encoding in _SINGLE_BYTE:
+        return _decode_single_byte(data, encoding)
+    if text is None:
+        text = str(memoryview(data)[len(_BOM_OF[encoding]) if bom else 0:], encoding)
+    newline = detect_newline(text)
+    return normalize_newlines(text), TextFormat(encoding, bom, newline)
+
+
+def _decode_single_byte(data, encoding):
+    lf = data.find(b"\n")
+    cr = data.find(b"\r", 0, lf if lf != -1 else len(data))
+    newline = "\n"
+    if cr != -1:
+        newline = "\r\n" if data[cr + 1:cr + 2] == b"\n" else "\r"
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n")
+        if b"\r" in data:
+            data = data.replace(b"\r", b"\n")
+    return data.decode(encoding), TextFormat(encoding, False, newline)
+
+
+def read_text(filepath):
+    """Read and decode a file / Lee y decodifica un archivo -> (text, TextFormat)"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return decode_text(data)
+
+
+class StreamDecoder:
+    """
+    Incremental decoding of a file read in chunks
+    Decodificación incremental de un archivo leído por bloques
+    
+    The encoding is detected on the first SAMPLE_BYTES and the newline
+    style on the first line break; the output has "\\n" newlines, even when
+    a CRLF pair is split between chunks. Invalid UTF-8 after the sample
+    follows the same rule as decode_text(): after a pure ASCII start
+    decoding goes on with the fallback encoding (ASCII reads the same in
+    both), after non-ASCII text it raises MixedEncodingError. format is
+    final after the last chunk.
+    """
+    
+    def __init__(self):
+        self.format = None
+        self._decoder = None
+        self._head = b""
+        self._ascii = True      # All UTF-8 output so far was ASCII
+        self._offset = 0        # Bytes given to the UTF-8 decoder
+        self._newline = None
+        self._pending_cr = False
+    
+    def decode(self, chunk, final=False):
+        if self._decoder is None:
+            # Detect on a full sample, however small the chunks
+            chunk = self._head + chunk
+            if len(chunk) < SAMPLE_BYTES and not final:
+                self._head = chunk
+                return ""
+            self._head = b""
+            encoding, bom = detect_encoding(chunk[:SAMPLE_BYTES], final=final)
+            self.format = TextFormat(encoding, bom)
+            self._decoder = codecs.getincrementaldecoder(encoding)()
+            if bom:
+                chunk = chunk[len(_BOM_OF[encoding]):]
+        text = self._decode(chunk, final)
+        if self._pending_cr:
+            text = "\r" + text
+            self._pending_cr = False
+        if self._newline is None:
+            self._newline = detect_newline(text, default=None)
+            if self._newline is not None or final:
+                self.format.newline = self._newline or "\n"
+        if text.endswith("\r") and not final:
+            text = text[:-1]    # May be the first half of a CRLF
+            self._pending_cr = True
+        return normalize_newlines(text)
+    
+    def _decode(self, chunk, final):
+        if self.format.encoding != "utf-8" or self.format.bom:
+            return self._decoder.decode(chunk, final)
+        buffered = self._decoder.getstate()[0]
+        try:
+            text = self._decoder.decode(chunk, final)
+        except UnicodeDecodeError as e:
+            data = buffered + chunk
+            start = self._offset - len(buffered)
+            if not self._ascii:
+                raise MixedEncodingError(start + e.start) from None
+            try:
+                self.format.encoding = _utf8_fallback(data, e)
+            except MixedEncodingError as mixed:
+                raise MixedEncodingError(start + mixed.position) from None
+            self._decoder = codecs.getincrementaldecoder(self.format.encoding)()
+            return self._decoder.decode(data, final)
+        self._offset += len(chunk)
+        if self._ascii:
+            self._ascii = text.isascii()
+        return text
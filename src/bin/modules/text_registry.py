@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Translated texts of widgets and menu entries
+Textos traducidos de widgets y entradas de menú
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import time
+
+from .i18n import t
+
+
+def _text_source(key):
+    """i18n key or callable returning the text / Clave i18n o callable"""
+    return key if callable(key) else (lambda: t(key))
+
+
+class TextRegistry:
+    """
+    Remembers which i18n key each widget or menu entry shows
+    Recuerda qué clave i18n muestra cada widget o entrada de menú
+    
+    Widgets and menu entries register their key when they are created;
+    on a language change retranslate() reconfigures, in one pass, only the
+    items whose text actually changed, so nothing is destroyed or rebuilt.
+    A key may also be a callable returning the text (e.g. a flag plus a
+    translation). Tooltips need no entry: they translate when shown.
+    
+    Menus whose entries are rebuilt (styles) call forget(menu) first.
+    Counters of the last pass: checked, updated and ms.
+    """
+    
+    def __init__(self):
+        self._widgets = []      # (widget, option, text source)
+        self._entries = []      # (menu, index, text source)
+        self.checked = 0
+        self.updated = 0
+        self.ms = 0.0
+    
+    def widget(self, widget, key, option="text"):
+        """
+        Register a widget already showing t(key); returns the widget
+        Registra un widget que ya muestra t(key); devuelve el widget
+        """
+        self._widgets.append((widget, option, _text_source(key)))
+        return widget
+    
+    def add(self, menu, kind, key, **options):
+        """
+        menu.add(kind, label=t(key), **options) and register the entry
+        Añade una entrada de menú traducida y la registra
+        
+        Args:
+            kind: "command", "cascade", "checkbutton", "radiobutton"
+        """
+        source = _text_source(key)
+        menu.add(kind, label=source(), **options)
+        self._entries.append((menu, menu.index("end"), source))
+    
+    def forget(self, menu):
+        """Drop the entries of a menu about to be rebuilt / Olvida las entradas de un menú"""
+        self._entries = [e for e in self._entries if e[0] is not menu]
+    
+    def retranslate(self):
+        """
+        Update every registered text that changed; destroyed widgets and
+        menus are dropped
+        Actualiza los textos registrados que cambiaron
+        """
+        start = time.perf_counter()
+        checked = updated = 0
+        
+        alive = []
+        for item in self._widgets:
+            widget, option, source = item
+            if not widget.winfo_exists():
+                continue
+            alive.append(item)
+            checked += 1
+            text = source()
+            if widget.cget(option) != text:
+                widget.configure(**{option: text})
+                updated += 1
+        self._widgets = alive
+        
+        alive = []
+        for item in self._entries:
+            menu, index, source = item
+            if not menu.winfo_exists():
+                continue
+            alive.append(item)
+            checked += 1
+            text = source()
+            if menu.entrycget(index, "label") != text:
+                menu.entryconfigure(index, label=text)
+                updated += 1
+        self._entries = alive
+        
+        self.checked, self.updated = checked, updated
+        self.ms = (time.perf_counter() - start) * 1000
+        return updated
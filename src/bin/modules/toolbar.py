@@ -57,6 +57,7 @@ def create_toolbar(app):
         command=app._save_as
     )
     app.btn_saveas.pack(side="left", padx=1)
+    app.texts.widget(app.btn_saveas, "label.save_as_btn")
     app.tooltip_mgr.add_tooltip(app.btn_saveas, "tooltip.save_as")
     
     # Separator
@@ -94,6 +95,7 @@ def create_toolbar(app):
     # Style selector
     app.style_label = ctk.CTkLabel(sf, text=t("label.style"), font=ui_font)
     app.style_label.pack(side="left", padx=5)
+    app.texts.widget(app.style_label, "label.style")
     
     app.style_combo = ctk.CTkComboBox(
         sf, width=180, font=ui_font, height=32,
@@ -115,6 +117,7 @@ def create_toolbar(app):
         command=app._show_language_menu
     )
     app.lang_btn.pack(side="left", padx=(10, 2))
+    app.texts.widget(app.lang_btn, i18n.get_current_flag)
     app.tooltip_mgr.add_tooltip(app.lang_btn, "tooltip.change_language")
     
     # Theme button
@@ -138,13 +141,3 @@ def _create_icon_btn(app, parent, icon_name, command, tooltip, btn_cfg, side="le
     app.tooltip_mgr.add_tooltip(btn, tooltip)
     return btn
 
-
-def update_toolbar_texts(app):
-    """
-    Update toolbar button texts/tooltips on language change
-    Actualiza textos/tooltips de la toolbar al cambiar idioma
-    """
-    if hasattr(app, 'btn_saveas'):
-        app.btn_saveas.configure(text=t("label.save_as_btn"))
-    if hasattr(app, 'style_label'):
-        app.style_label.configure(text=t("label.style"))
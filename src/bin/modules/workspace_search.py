@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - Find and replace across a folder of Markdown files
+Buscar y reemplazar en una carpeta de archivos Markdown
+
+Copyright (c) 2025 Fernando Ruiz Casas
+Licensed under MIT License
+"""
+
+import os
+import gzip
+import json
+import queue
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import CACHE_DIR
+from .file_ops import FileManager
+from .config_store import atomic_write
+from .find_replace import LineIndex
+from .text_encoding import read_text
+
+
+def trigrams(text):
+    """Set of lowercase trigrams of a text / Trigramas en minúsculas de un texto"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def iter_files(folder):
+    """
+    Markdown/text files under a folder (hidden folders skipped)
+    Archivos Markdown/texto bajo una carpeta (se omiten carpetas ocultas)
+    """
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if name.lower().endswith(FileManager.VALID_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+# =============================================================================
+# TRIGRAM INDEX / ÍNDICE DE TRIGRAMAS
+# =============================================================================
+
+class TrigramIndex:
+    """
+    On-disk trigram index of a folder, one entry per file
+    Índice de trigramas en disco de una carpeta, una entrada por archivo
+    
+    An entry is valid while the file keeps its mtime and size. A literal
+    query can only match files that contain all of its trigrams, so those
+    are the only files read. Stored as gzipped JSON in CACHE_DIR, with the
+    trigrams of each file concatenated in one string.
+    Una entrada vale mientras el archivo conserve mtime y tamaño.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, folder, path=None):
+        """
+        Args:
+            folder: Indexed folder / Carpeta indexada
+            path: Index file (default: CACHE_DIR/index-<hash>.json.gz)
+        """
+        self.folder = os.path.abspath(folder)
+        if path is None:
+            key = hashlib.sha1(os.path.normcase(self.folder).encode("utf-8")).hexdigest()[:16]
+            path = os.path.join(CACHE_DIR, f"index-{key}.json.gz")
+        self.path = path
+        self.dirty = False
+        self._files = {}        # relpath -> (mtime_ns, size, trigram set or str)
+        self._lock = threading.Lock()
+    
+    def load(self):
+        """Load the index file, if any / Carga el índice, si existe"""
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError, EOFError):
+            return
+        if data.get("version") != self.VERSION or data.get("folder") != self.folder:
+            return
+        with self._lock:
+            # Trigram strings are split lazily, on first lookup
+            self._files = {rel: tuple(entry) for rel, entry in data.get("files", {}).items()}
+    
+    def save(self):
+        """Write the index atomically if it changed / Guarda el índice si cambió"""
+        with self._lock:
+            if not self.dirty:
+                return
+            files = {}
+            for rel, (mtime, size, grams) in self._files.items():
+                if not isinstance(grams, str):
+                    grams = "".join(sorted(grams))
+                files[rel] = [mtime, size, grams]
+            self.dirty = False
+        
+        data = json.dumps({"version": self.VERSION, "folder": self.folder, "files": files},
+                          ensure_ascii=False)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            atomic_write(self.path, gzip.compress(data.encode("utf-8"), compresslevel=5))
+        except OSError as e:
+            print(f"Error saving search index: {e}")
+    
+    def lookup(self, rel, stat):
+        """Trigrams of a file, or None if missing or stale / Trigramas o None si no vale"""
+        with self._lock:
+            entry = self._files.get(rel)
+            if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                return None
+            grams = entry[2]
+            if isinstance(grams, str):
+                grams = {grams[i:i + 3] for i in range(0, len(grams), 3)}
+                self._files[rel] = (entry[0], entry[1], grams)
+            return grams
+    
+    def update(self, rel, stat, content):
+        """Index the content of a file / Indexa el contenido de un archivo"""
+        grams = trigrams(content)
+        with self._lock:
+            self._files[rel] = (stat.st_mtime_ns, stat.st_size, grams)
+            self.dirty = True
+    
+    def prune(self, existing):
+        """Drop entries of files that no longer exist / Quita archivos que ya no existen"""
+        with self._lock:
+            for rel in set(self._files) - set(existing):
+                del self._files[rel]
+                self.dirty = True
+    
+    def __len__(self):
+        return len(self._files)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(folder):
+    """Shared, loaded TrigramIndex of a folder / TrigramIndex compartido de una carpeta"""
+    folder = os.path.abspath(folder)
+    with _indexes_lock:
+        index = _indexes.get(folder)
+        if index is None:
+            index = TrigramIndex(folder)
+            index.load()
+            _indexes[folder] = index
+        return index
+
+
+# =============================================================================
+# SEARCH / BÚSQUEDA
+# =============================================================================
+
+class FolderSearch:
+    """
+    Searches a folder with a pool of worker threads
+    Busca en una carpeta con un pool de hilos
+    
+    Results are streamed as events on a queue.Queue, so the Tk side can
+    drain them with after() while the scan is still running:
+        ("hits", path, [(line, col, length, line_text), ...], match count)
+        ("progress", done, total)
+        ("done", stats)
+    Los resultados llegan como eventos en una cola, mientras se busca.
+    
+    Every match is counted (the count is what a replace rewrites), but
+    only the first MAX_HITS_PER_FILE of a file are listed.
+    """
+    
+    WORKERS = min(8, (os.cpu_count() or 2) + 2)
+    MAX_FILE_SIZE = 20 * 1024 * 1024
+    MAX_HITS_PER_FILE = 1000
+    
+    def __init__(self, folder, pattern, literal=None, regex=False):
+        """
+        Args:
+            folder: Folder to search / Carpeta donde buscar
+            pattern: Compiled pattern (see find_replace.compile_search)
+            literal: Searched text when the query is literal (enables the
+                     trigram index) / Texto buscado si la consulta es literal
+            regex: pattern comes from a regular expression, so replace
+                   templates may use groups / El patrón viene de una regex
+        """
+        self.folder = os.path.abspath(folder)
+        self.pattern = pattern
+        self.regex = regex
+        self.needle_trigrams = trigrams(literal) if literal and len(literal) >= 3 else None
+        self.events = queue.Queue()
+        self.index = get_index(self.folder)
+        self.stats = {"files": 0, "scanned": 0, "skipped": 0, "errors": 0,
+                      "matched_files": 0, "matches": 0, "seconds": 0.0}
+        self.matched = {}       # path -> (mtime_ns, size) when searched
+        
+        self._cancel = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+    
+    def start(self):
+        """Start searching in the background / Empieza a buscar en segundo plano"""
+        self._thread = threading.Thread(target=self._run, name="find-in-files", daemon=True)
+        self._thread.start()
+    
+    def cancel(self):
+        """Stop the search / Detiene la búsqueda"""
+        self._cancel.set()
+    
+    def substitution(self, template):
+        """
+        Function(match) -> replacement text for FolderReplace, using the
+        options of this search, not the ones shown now
+        Función de sustitución con las opciones de esta búsqueda
+        """
+        if self.regex:
+            return lambda match: match.expand(template)
+        return lambda match: template
+    
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self):
+        started = time.perf_counter()
+        paths = list(iter_files(self.folder))
+        self.stats["files"] = len(paths)
+        done = 0
+        
+        with ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="find-in-files") as pool:
+            for _ in pool.map(self._search_file, paths):
+                done += 1
+                if done % 20 == 0 or done == len(paths):
+                    self.events.put(("progress", done, len(paths)))
+                if self._cancel.is_set():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+        
+        if not self._cancel.is_set():
+            self.index.prune(os.path.relpath(p, self.folder) for p in paths)
+        self.index.save()
+        self.stats["seconds"] = time.perf_counter() - started
+        self.events.put(("done", dict(self.stats)))
+    
+    def _search_file(self, path):
+        if self._cancel.is_set():
+            return
+        rel = os.path.relpath(path, self.folder)
+        try:
+            stat = os.stat(path)
+            if stat.st_size > self.MAX_FILE_SIZE:
+                return
+            grams = self.index.lookup(rel, stat)
+            if grams is not None and self.needle_trigrams is not None \
+                    and not self.needle_trigrams <= grams:
+                self._count("skipped")
+                return
+            
+            content, _ = read_text(path)
+            if grams is None:
+                self.index.update(rel, stat, content)
+        except (OSError, ValueError):     # ValueError: undecodable / no decodificable
+            self._count("errors")
+            return
+        
+        self._count("scanned")
+        hits = []
+        count = 0
+        line_index = None
+        for match in self.pattern.finditer(content):
+            start, end = match.span()
+            if start == end:
+                continue
+            count += 1
+            if len(hits) >= self.MAX_HITS_PER_FILE:
+                continue
+            if line_index is None:
+                line_index = LineIndex(content)
+            line, col = map(int, line_index.index(start).split("."))
+            line_end = content.find("\n", start)
+            line_text = content[start - col:line_end if line_end != -1 else len(content)]
+            hits.append((line, col, end - start, line_text))
+        
+        if hits:
+            with self._stats_lock:
+                self.stats["matched_files"] += 1
+                self.stats["matches"] += count
+                self.matched[path] = (stat.st_mtime_ns, stat.st_size)
+            self.events.put(("hits", path, hits, count))
+    
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+# =============================================================================
+# REPLACE / REEMPLAZO
+# =============================================================================
+
+class FolderReplace:
+    """
+    Rewrites the files of a search in the background, in batches
+    Reescribe en segundo plano, por lotes, los archivos de una búsqueda
+    
+    Each file is written atomically (temp file + os.replace) in its own
+    encoding, BOM and newline style (see text_encoding.TextFormat), and
+    skipped if it changed on disk since it was searched.
+    Events on self.events:
+        ("replaced", path, count) / ("conflict", path) / ("error", path, message)
+        ("progress", done, total)
+        ("done", stats)
+    """
+    
+    BATCH = 16
+    
+    def __init__(self, search, substitute):
+        """
+        Args:
+            search: Finished FolderSearch whose matched files are rewritten
+            substitute: Function(match) -> replacement text
+        """
+        self.search = search
+        self.substitute = substitute
+        self.events = queue.Queue()
+        self.stats = {"files": 0, "replacements": 0, "conflicts": 0, "errors": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def start(self, skip=()):
+        """
+        Start replacing / Empieza a reemplazar
+        
+        Args:
+            skip: Paths left untouched (e.g. the open file with unsaved changes)
+        """
+        skip = {os.path.normcase(os.path.abspath(p)) for p in skip if p}
+        targets = [(path, state) for path, state in sorted(self.search.matched.items())
+                   if os.path.normcase(path) not in skip]
+        self._thread = threading.Thread(target=self._run, args=(targets,),
+                                        name="replace-in-files", daemon=True)
+        self._thread.start()
+    
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self, targets):
+        started = time.perf_counter()
+        batches = [targets[i:i + self.BATCH] for i in range(0, len(targets), self.BATCH)]
+        done = 0
+        with ThreadPoolExecutor(max_workers=FolderSearch.WORKERS,
+                                thread_name_prefix="replace-in-files") as pool:
+            for count in pool.map(self._replace_batch, batches):
+                done += count
+                self.events.put(("progress", done, len(targets)))
+        
+        self.search.index.save()
+        self.stats["seconds"] = time.perf_counter() - started
+        self.events.put(("done", dict(self.stats)))
+    
+    def _replace_batch(self, batch):
+        for path, state in batch:
+            self._replace_file(path, state)
+        return len(batch)
+    
+    def _replace_file(self, path, state):
+        try:
+            stat = os.stat(path)
+            if (stat.st_mtime_ns, stat.st_size) != state:
+                self._count("conflicts")
+                self.events.put(("conflict", path))
+                return
+            
+            content, text_format = read_text(path)
+            
+            count = 0
+            
+            def substitute(match):
+                nonlocal count
+                if match.end() == match.start():
+                    return match.group(0)
+                count += 1
+                return self.substitute(match)
+            
+            new_content = self.search.pattern.sub(substitute, content)
+            if new_content == content:
+                return
+            atomic_write(path, text_format.encode(new_content))
+            
+            self.search.index.update(os.path.relpath(path, self.search.folder),
+                                     os.stat(path), new_content)
+        except Exception as e:
+            self._count("errors")
+            self.events.put(("error", path, str(e)))
+            return
+        
+        with self._lock:
+            self.stats["files"] += 1
+            self.stats["replacements"] += count
+        self.events.put(("replaced", path, count))
+    
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
@@ -33,7 +33,8 @@ class ZoomManager:
         Inicializa gestor de zoom
         
         Args:
-            editor_widget: Text widget to zoom / Widget de texto a hacer zoom
+            editor_widget: Text widget to zoom, or None until attach()
+                           Widget de texto a hacer zoom, o None hasta attach()
             status_callback: Callback(message) for status updates / Callback para actualizar estado
         """
         self.editor = editor_widget
@@ -45,7 +46,16 @@ class ZoomManager:
         self.preview_size = ui_config.get("preview_font_size", 16)
         
         # Apply initial editor size / Aplicar tamaño inicial del editor
-        self._apply_editor_font(save=False)
+        if editor_widget is not None:
+            self._apply_editor_font(save=False)
+    
+    def attach(self, editor_widget):
+        """
+        Zoom another editor (tab switch), applying the current size
+        Hace zoom en otro editor (cambio de pestaña), con el tamaño actual
+        """
+        self.editor = editor_widget
+        self.editor.configure(font=("Consolas", self.editor_size))
     
     # =========================================================================
     # EDITOR ZOOM
@@ -70,7 +80,8 @@ class ZoomManager:
     
     def _apply_editor_font(self, save=True):
         """Apply font size to editor / Aplica tamaño de fuente al editor"""
-        self.editor.configure(font=("Consolas", self.editor_size))
+        if self.editor is not None:
+            self.editor.configure(font=("Consolas", self.editor_size))
         if save:
             update_ui_config(editor_font_size=self.editor_size)
         if self.status_callback:
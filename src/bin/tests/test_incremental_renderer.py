@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown Editor - IncrementalRenderer must match a full render byte for byte
+IncrementalRenderer debe coincidir byte a byte con un render completo
+
+Run from src/bin / Ejecutar desde src/bin:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.renderer import IncrementalRenderer, markdown_to_html
+
+
+DOCUMENT = """# Title
+
+Intro paragraph with **bold** and a [link](https://example.com).
+Second line of the same paragraph.
+
+Setext heading
+==============
+
+Another setext
+--------------
+
+- item one
+- item two
+    - nested item
+
+1. first
+2. second
+
+| Name | Value |
+|------|-------|
+| a    | 1     |
+| b    | 2     |
+
+```python
+def f():
+
+    return 1
+```
+
+~~~
+tilde fence
+~~~
+
+<div class="note">
+
+Raw *HTML* block
+
+</div>
+
+<!-- a comment
+
+spanning blocks -->
+
+> quote line
+> another
+
+    indented code
+
+Closing paragraph uses [ref].
+"""
+
+
+def edit_sequence(text):
+    """(label, text) after each edit, applied cumulatively"""
+    edits = [
+        ("type in paragraph", lambda s: s.replace("Intro paragraph", "Intro edited paragraph")),
+        ("split paragraph", lambda s: s.replace("\nSecond line", "\n\nSecond line")),
+        ("merge paragraphs", lambda s: s.replace("paragraph.\n\nSecond", "paragraph.\nSecond")),
+        ("paragraph becomes setext", lambda s: s.replace("Closing paragraph uses [ref].", "Closing paragraph uses [ref].\n---")),
+        ("setext becomes paragraph", lambda s: s.replace("Setext heading\n==============", "Setext heading")),
+        ("unclosed fence swallows the rest", lambda s: s.replace("~~~\ntilde fence\n~~~", "~~~\ntilde fence")),
+        ("fence closed again", lambda s: s.replace("~~~\ntilde fence", "~~~\ntilde fence\n~~~")),
+        ("blank line in list", lambda s: s.replace("- item one\n", "- item one\n\n")),
+        ("list joined to paragraph", lambda s: s.replace("2. second\n\n", "2. second\nlazy line\n\n")),
+        ("table row added", lambda s: s.replace("| b    | 2     |", "| b    | 2     |\n| c    | 3     |")),
+        ("table split", lambda s: s.replace("| a    | 1     |\n", "| a    | 1     |\n\n")),
+        ("raw html closed early", lambda s: s.replace("Raw *HTML* block\n\n</div>", "</div>\n\nRaw *HTML* block")),
+        ("comment opened", lambda s: s.replace("# Title", "<!-- open\n\n# Title")),
+        ("comment closed", lambda s: s.replace("<!-- open\n\n# Title", "<!-- open -->\n\n# Title")),
+        ("reference definition added", lambda s: s + "\n[ref]: https://example.com/ref\n"),
+        ("reference definition removed", lambda s: s.replace("\n[ref]: https://example.com/ref\n", "")),
+        ("delete a middle block", lambda s: s.replace("> quote line\n> another\n\n", "")),
+        ("append at the end", lambda s: s + "\nNew last paragraph\n"),
+        ("empty document", lambda s: ""),
+        ("retype the document", lambda s: text),
+    ]
+    current = text
+    for label, edit in edits:
+        current = edit(current)
+        yield label, current
+
+
+class IncrementalRendererTest(unittest.TestCase):
+
+    def assertSameHtml(self, renderer, text, label):
+        self.assertEqual(renderer.render(text), markdown_to_html(text), label)
+
+    def test_document(self):
+        self.assertSameHtml(IncrementalRenderer(), DOCUMENT, "first render")
+
+    def test_edit_sequence(self):
+        renderer = IncrementalRenderer()
+        renderer.render(DOCUMENT)
+        for label, text in edit_sequence(DOCUMENT):
+            self.assertSameHtml(renderer, text, label)
+
+    def test_reuses_unchanged_blocks(self):
+        renderer = IncrementalRenderer()
+        renderer.render(DOCUMENT)
+        misses = renderer.misses
+        self.assertSameHtml(renderer, DOCUMENT.replace("Intro paragraph", "Intro edited paragraph"), "one block")
+        self.assertEqual(renderer.misses - misses, 1)
+        self.assertGreater(renderer.hits, 0)
+
+    def test_random_line_edits(self):
+        """Insert, delete and duplicate random lines, seeded / Ediciones aleatorias con semilla"""
+        rng = random.Random(1234)
+        snippets = ["", "```", "~~~", "- item", "1. item", "===", "---", "| x | y |",
+                    "|---|---|", "<div>", "</div>", "<!--", "-->", "> quote", "    code",
+                    "text *em*", "# heading"]
+        renderer = IncrementalRenderer()
+        lines = DOCUMENT.split("\n")
+        for step in range(300):
+            action = rng.random()
+            index = rng.randrange(len(lines) + 1)
+            if action < 0.45:
+                lines.insert(index, rng.choice(snippets))
+            elif action < 0.8 and len(lines) > 1:
+                del lines[min(index, len(lines) - 1)]
+            else:
+                lines.insert(index, lines[rng.randrange(len(lines))])
+            self.assertSameHtml(renderer, "\n".join(lines), f"random edit {step}")
+
+
+if __name__ == "__main__":
+    unittest.main()